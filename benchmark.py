@@ -0,0 +1,255 @@
+"""A benchmark harness for LLEngine, which plays a level of Lost Levels for a fixed
+number of frames and reports how long each phase of the main loop took as JSON.
+
+Levels are loaded through their LevelGenerator as per usual, and driven by scripted
+input (or a recorded replay) at maximum speed. The "stress" scenario generates a
+synthetic level instead, in order to find where the engine stops scaling. Run each
+scenario separately, e.g.:
+
+    python benchmark.py --scenario 1-1 --frames 1800 --output 1-1.json
+    python benchmark.py --scenario stress --tiles 10000 --goombas 500"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import tempfile
+import platform
+import tracemalloc
+
+# Parse the benchmark's arguments. Anything unknown (e.g. --modify) is left for the engine.
+parser = argparse.ArgumentParser(prog="benchmark", description="LLEngine benchmark harness.")
+parser.add_argument("--scenario", default="1-1", help="1-1, 1-2 or stress")
+parser.add_argument("--section", default="main", help="section of the level to load")
+parser.add_argument("--frames", type=int, default=1200, help="number of frames to run")
+parser.add_argument("--replay", help="replay file to drive the player with, instead of scripted input")
+parser.add_argument("--tiles", type=int, default=10000, help="ground tiles in the stress scenario")
+parser.add_argument("--goombas", type=int, default=500, help="Goombas in the stress scenario")
+parser.add_argument("--headless", action="store_true", help="skip scaling and blitting the frame")
+parser.add_argument("--tracemalloc", action="store_true",
+                    help="track the peak Python heap (slows down the benchmark)")
+parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+args, sys.argv[1:] = parser.parse_known_args()
+
+# Always use the dummy video and audio drivers, so that frames are still scaled and blit
+# unless running headless. Hide Pygame's greeting, so that stdout is left for the report.
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import numpy
+import pygame
+import engine
+import lostlevels
+from lostlevels import savefile
+from lostlevels.worlds import levelgenerator
+
+# Scripted input: hold right and sprint, whilst jumping for 18 out of every 50 frames.
+SCRIPT_FRAMETIME = 1 / 60
+SCRIPT_JUMP_PERIOD = 50
+SCRIPT_JUMP_LENGTH = 18
+
+# A synthetic level module for stress testing, with a long floor of ground tiles and
+# Goombas spread out evenly across it.
+class StressLevel():
+    # Create a new stress level.
+    def __init__(self, tiles, goombas):
+        self.tiles = tiles
+        self.goombas = goombas
+
+    # Return a path to the image preview of this level.
+    def get_preview(self):
+        return "lostlevels/assets/levels/1_1_preview.png"
+
+    # Generate the level data for this level.
+    def load_leveldata(self, eng, level, section):
+        # Create the level generator and level data.
+        gen = levelgenerator.LevelGenerator(eng, level, "overground")
+        data = levelgenerator.LevelData(eng, level, pygame.math.Vector2(32, -358), "overground")
+
+        # Create the ground, stacking the tiles in rows of up to 1000 tiles.
+        length = min(self.tiles, 1000)
+        height = max(self.tiles // length, 1)
+        gen.generate_ground(pygame.math.Vector2(0, -416), length, height)
+        if self.tiles - length * height > 0:
+            gen.generate_ground(pygame.math.Vector2(0, -416 - height * 32), self.tiles - length * height)
+
+        # Spread the Goombas out across the ground, away from the player.
+        spacing = max((length * 32 - 512) / max(self.goombas, 1), 1)
+        for i in range(self.goombas):
+            gen.generate_goomba(pygame.math.Vector2(512 + i * spacing, -390))
+        return data
+
+# Lost Levels, but skipping straight to the benchmarked level, whilst recording the
+# number of entities, dynamic entities and grid cells.
+class Benchmark(lostlevels.LostLevels):
+    # Construct the benchmark.
+    def __init__(self, eng, levelmodule, world, level):
+        super().__init__(eng)
+        self.benchmark_levelmodule = levelmodule
+        self.benchmark_world = world
+        self.benchmark_level = level
+        self.max_entities = 0
+        self.max_dynamic = 0
+        self.max_cells = 0
+        self.sampling = dict()
+        self.script = None
+
+    # Load the benchmarked level instead of the start menu.
+    def init(self):
+        super().init()
+        self.save = savefile.LLSV("benchmark")
+        self.world = self.benchmark_world
+        self.level = self.benchmark_level
+        self.save.currentlevel = [1] * (self.world - 1) + [self.level]
+        self.levelmodule = self.benchmark_levelmodule
+        self.load_level(args.section)
+
+        # Keep every frame in the profiler.
+        self._engine.profile_frames.set(args.frames)
+
+        # Write the scripted input into a temporary replay, unless one was given.
+        if args.replay:
+            self._engine.replay.set(args.replay)
+        else:
+            self.script = write_script(args.frames)
+            self._engine.replay.set(self.script)
+
+    # Sample the entity counts each frame, timing how long it takes so that it can be
+    # taken back out of the game phase. Quit once the last frame has run.
+    def per_frame(self):
+        start = time.perf_counter()
+        self.sample()
+        self.sampling[self._engine.globals.frames] = time.perf_counter() - start
+        if self._engine.globals.frames == args.frames - 1:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        super().per_frame()
+
+    # Record the number of entities, dynamic entities and grid cells.
+    def sample(self):
+        self.max_entities = max(self.max_entities, self._engine.count_entities())
+        self.max_dynamic = max(self.max_dynamic, self._engine.count_dynamic_entities())
+        self.max_cells = max(self.max_cells, self._engine.count_grid_cells())
+
+    # Reload the benchmarked level when the player dies, rather than going through the
+    # loading level screen.
+    def load_world(self, world):
+        self.load_level(args.section)
+
+    # Don't write a save file.
+    def atexit(self, is_exception):
+        pass
+
+# Write scripted input for a number of frames into a temporary replay file.
+def write_script(frames):
+    handle, path = tempfile.mkstemp(suffix=".llr")
+    os.close(handle)
+    recorder = engine.replay.ReplayRecorder(path, len(pygame.key.get_pressed()))
+    for frame in range(frames):
+        held = {pygame.KSCAN_RIGHT, pygame.KSCAN_Z}
+        if frame % SCRIPT_JUMP_PERIOD < SCRIPT_JUMP_LENGTH:
+            held.add(pygame.KSCAN_X)
+        recorder.record_keys([scancode in held for scancode in range(max(held) + 1)])
+        recorder.end_frame(SCRIPT_FRAMETIME)
+    recorder.close()
+    return path
+
+# Summarize a list of samples (s) in milliseconds.
+def summarize(samples):
+    if not len(samples):
+        return {"total": 0, "mean": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
+    ordered = sorted(samples.tolist())
+    percentile = lambda p: ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000
+    return {
+        "total": round(sum(ordered) * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 4),
+        "p50": round(percentile(0.50), 4),
+        "p95": round(percentile(0.95), 4),
+        "p99": round(percentile(0.99), 4),
+        "max": round(ordered[-1] * 1000, 4)
+    }
+
+# Return the peak resident set size of this process in KiB, if it can be found.
+def peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+# Run the benchmark.
+def main():
+    # Select the level module to benchmark. The stress level stands in for 1-1.
+    if args.scenario == "stress":
+        levelmodule = StressLevel(args.tiles, args.goombas)
+        world, level = 1, 1
+    else:
+        world, level = map(int, args.scenario.split("-"))
+        levelmodule = __import__(f"lostlevels.worlds.{world}.{level}", fromlist="*")
+
+    # Instantiate the engine and the benchmark. Anything the engine or game prints is
+    # sent to stderr, so that stdout is left for the report.
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.tracemalloc:
+            tracemalloc.start()
+        eng = engine.LLEngine("Benchmark", args.headless)
+        game = Benchmark(eng, levelmodule, world, level)
+        eng.set_game(game)
+
+        # Run the benchmark, and sample the final frame.
+        start = time.perf_counter()
+        try:
+            eng.init()
+        finally:
+            if game.script:
+                os.remove(game.script)
+        wall = time.perf_counter() - start
+        game.sample()
+
+    # Take the time spent sampling the entity counts back out of the game phase.
+    samples, frames = eng.profiler.get_samples()
+    game_phase = engine.profiler.PHASES.index("game")
+    sampling = numpy.array([game.sampling.get(frame, 0.0) for frame in frames.tolist()])
+    samples[:, game_phase] = numpy.maximum(samples[:, game_phase] - sampling, 0.0)
+
+    # Write the report.
+    report = {
+        "scenario": args.scenario,
+        "section": args.section,
+        "frames": eng.globals.frames,
+        "input": args.replay if args.replay else "scripted",
+        "headless": args.headless,
+        "wall_seconds": round(wall, 3),
+        "sampling_ms": round(sampling.sum() * 1000, 3),
+        "frame_ms": summarize(samples.sum(axis=1)),
+        "phases_ms": {phase: summarize(samples[:, i])
+                      for i, phase in enumerate(engine.profiler.PHASES)},
+        "entities": eng.count_entities(),
+        "total_entities": eng.count_entities(False),
+        "dynamic_entities": eng.count_dynamic_entities(),
+        "grid_cells": eng.count_grid_cells(),
+        "max_entities": game.max_entities,
+        "max_dynamic_entities": game.max_dynamic,
+        "max_grid_cells": game.max_cells,
+        "peak_rss_kib": peak_rss(),
+        "peak_heap_kib": tracemalloc.get_traced_memory()[1] // 1024 if args.tracemalloc else None,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver
+    }
+    if args.scenario == "stress":
+        report["tiles"] = args.tiles
+        report["goombas"] = args.goombas
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+# Execute this file directly to run the benchmark.
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,6 +1,12 @@
 from .main import LLEngine
 from .game_interface import Game
-from .sound import Sound
+from .sound import Sound, Voice, WAVE_SINE, WAVE_SQUARE
 from .event import Event
 from . import entity
-from . import ui
\ No newline at end of file
+from . import ui
+from . import replay
+from . import profiler
+from . import timer
+from .timer import CLOCK_WALL, CLOCK_GAME
+from . import renderer
+from . import preload
\ No newline at end of file
@@ -1,5 +1,6 @@
 from .entity import *
 from .rect import Rectangle
-from .tile import Tile
+from .tile import Tile, load_tile
 from .sprite import Sprite
+from . import atlas
 from .physics import *
\ No newline at end of file
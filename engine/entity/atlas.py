@@ -0,0 +1,101 @@
+"""A shared atlas of the tiles cut out of tile sheets, used by map tiles and sprites.
+
+Each tile sheet is only loaded once, and each tile cut out of it is cached by the path
+of the sheet, the tile size and the tile's index, so that every entity using the same
+tile shares a single texture. Tiles lying entirely within their sheet are subsurfaces
+of it, and therefore must never be drawn onto.
+
+Flipped and rotated variants of these tiles are created lazily and shared as well,
+keeping only the most recently used variants up to the engine's texture_variants."""
+
+import os
+import collections
+import pygame
+
+# Macros.
+TILES_PER_ROW = 16
+
+# Cached tile sheets, and the tiles cut out of them.
+cached_sheets = dict()
+cached_tiles = dict()
+
+# Cached variants of tiles, from the least to the most recently used.
+cached_variants = collections.OrderedDict()
+
+# Load a tile sheet, or return None should the sheet provided be invalid.
+def load_sheet(path):
+    # Check whether the sheet is already cached.
+    abspath = os.path.abspath(path)
+    if abspath in cached_sheets:
+        return cached_sheets[abspath]
+
+    # Check if the path for the sheet exists.
+    if not os.path.isfile(path):
+        return None
+
+    # Attempt to load the image.
+    try:
+        sheet = cached_sheets[abspath] = pygame.image.load(path).convert_alpha()
+    except pygame.error:
+        return None
+    return sheet
+
+# Get a single tile out of a tile sheet, given its size and index. Should the sheet
+# provided be invalid, the missing texture is returned instead, stretched to the tile size.
+def get_tile(engine, path, res, index):
+    # Check whether the tile is already cached.
+    key = (os.path.abspath(path), tuple(res), index)
+    if key in cached_tiles:
+        return cached_tiles[key]
+
+    # Fall back to the missing texture, should the sheet provided be invalid.
+    sheet = load_sheet(path)
+    if not sheet:
+        engine.console.warn(f"tile sheet path \"{path}\" is invalid")
+        return pygame.transform.scale(engine.missing, res)
+
+    # Calculate the area of the tile with the index provided.
+    column = index % TILES_PER_ROW
+    row = index // TILES_PER_ROW
+    rect = pygame.Rect(column * res[0], row * res[1], *res)
+
+    # Share the sheet's pixels if the tile lies entirely within it. Otherwise, copy
+    # what there is of the tile into a new surface.
+    if sheet.get_rect().contains(rect):
+        texture = sheet.subsurface(rect)
+    else:
+        texture = pygame.Surface(res, pygame.SRCALPHA)
+        texture.blit(sheet, (0, 0), rect)
+    cached_tiles[key] = texture
+    return texture
+
+# Get a variant of a tile, flipped first and then rotated anti-clockwise by an angle in
+# degrees. Variants are only created once, and shared until they are evicted.
+def get_variant(engine, path, res, index, flip_x = False, flip_y = False, angle = 0):
+    # Rotations by multiples of 90 degrees are exact, so they can be wrapped around.
+    if angle % 90 == 0:
+        angle %= 360
+    if not flip_x and not flip_y and not angle:
+        return get_tile(engine, path, res, index)
+
+    # Check whether the variant is already cached, and mark it as the most recently used.
+    key = (os.path.abspath(path), tuple(res), index, flip_x, flip_y, angle)
+    if key in cached_variants:
+        cached_variants.move_to_end(key)
+        return cached_variants[key]
+
+    # Transform the tile into a new variant.
+    texture = get_tile(engine, path, res, index)
+    if flip_x or flip_y:
+        texture = pygame.transform.flip(texture, flip_x, flip_y)
+    if angle:
+        texture = pygame.transform.rotate(texture, angle)
+
+    # Cache the variant, evicting the least recently used variants beyond the limit.
+    cached_variants[key] = texture
+    while len(cached_variants) > engine.texture_variants.get():
+        cached_variants.popitem(last = False)
+    return texture
+
+# Define what should be imported from this module.
+__all__ = ["load_sheet", "get_tile", "get_variant", "TILES_PER_ROW"]
\ No newline at end of file
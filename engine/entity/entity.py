@@ -4,7 +4,7 @@ These are the moving objects in a game, using this engine."""
 
 import pygame
 from ..event import Event
-from .physics import CELL_SIZE
+from .physics import CELL_SIZE, unpack_hash
 
 # Move types.
 MOVETYPE_NONE       = 0 # This entity is not recognised by the physics engine.
@@ -26,6 +26,7 @@ class Entity():
         self.active = False
         self.draw = True
         self.can_use = False
+        self._revision = 0 # Bumped whenever the appearance of this entity changes.
 
         # Entity motion.
         self.velocity = pygame.math.Vector2()       # The entity velocity as described by itself.
@@ -33,9 +34,14 @@ class Entity():
         self.__origindisp = pygame.math.Vector2()   # Displacement to add onto the base origin.
         self.__hitbox = pygame.math.Vector2()       # The size of the hitbox of the entity.
 
+        # The edges of the hitbox as described by the base origin. These are cached so
+        # that the physics engine doesn't need to allocate a new vector for each corner.
+        self._left = self._right = 0.00
+        self._top = self._bottom = 0.00
+
         # Physics engine properties.
         self.groundentity = None                    # The entity that this entity is grounded on.
-        self.movetype = MOVETYPE_NONE               # The default movetype of this entity.
+        self.__movetype = MOVETYPE_NONE             # The default movetype of this entity.
         self.move = 0.00                            # Scalar quantity representing horizontal movement, bound to friction.
         self.friction = 1.00                        # Friction multiplier.
         self.acceleration = 4.5                     # Acceleration multiplier.
@@ -56,14 +62,37 @@ class Entity():
         self.prev = None
         self.next = None
         self.deleted = False # Set to True after this entity is unlinked.
+        self.order = 0.0 # Increases along the entity linked list.
+
+        # Physics engine linked list implementation, only used by entities that are
+        # being moved by the physics engine.
+        self.dynamic = False # Set to True while this entity is in the dynamic list.
+        self.dynprev = None
+        self.dynnext = None
 
         # Reference hashes for the scene grid.
-        self.gridhashes = dict()
+        self.gridhashes = []
         self.drawgrid = False
 
     # Get the class name of this entity.
     def get_class(self):
         return self.__classname
+
+    # Get the movetype of this entity.
+    @property
+    def movetype(self):
+        return self.__movetype
+
+    # Set the movetype of this entity. If this entity is active, the engine is
+    # notified so that the entity can be woken up or put to sleep by the physics
+    # engine.
+    @movetype.setter
+    def movetype(self, movetype):
+        if movetype == self.__movetype:
+            return
+        self.__movetype = movetype
+        if self.active:
+            self._engine.entity_movetype_changed(self)
     
     # Get the absolute origin of this entity.
     def get_absorigin(self):
@@ -130,8 +159,14 @@ class Entity():
     # Set the base origin of this entity.
     def set_baseorigin(self, vec):
         if vec != self.__baseorigin:
+            # Static entities are not walked through by the physics engine, so
+            # they must be queued for a grid update instead.
+            if not self.dirty and self.active and self.__movetype < MOVETYPE_PHYSICS:
+                self._engine.mark_entity_dirty(self)
             self.dirty = True
         self.__baseorigin = vec
+        self._left, self._right = vec.x, vec.x + self.__hitbox.x
+        self._top, self._bottom = vec.y, vec.y - self.__hitbox.y
         absorigin = self.get_absorigin()
         self._absrect.left = absorigin.x
         self._absrect.top = -absorigin.y
@@ -156,9 +191,16 @@ class Entity():
     # Set the hitbox of this entity.
     def set_hitbox(self, vec):
         self.__hitbox = vec
+        self._right = self.__baseorigin.x + vec.x
+        self._bottom = self.__baseorigin.y - vec.y
         self._absrect.w = self._baserect.w = vec.x
         self._absrect.h = self._baserect.h = vec.y
     
+    # Get the render state of this entity, which the dirty-rect renderer compares
+    # each frame to check whether this entity has to be redrawn.
+    def get_render_state(self):
+        return self._revision
+
     # Check if this entity collides with another entity on the x axis.
     def collides_x(self, other):
         return (self._baserect.left < other._baserect.right 
@@ -201,8 +243,8 @@ class Entity():
     def draw_grid(self, background):
         # Walk through each grid hash.
         for hash in self.gridhashes:
-            # Deserialize the cell indexes from the grid hash and retrieve the cell size.
-            xindex, yindex = map(int, hash.split(':'))
+            # Unpack the cell indexes from the grid hash and retrieve the cell size.
+            xindex, yindex = unpack_hash(hash)
             left, top = xindex * CELL_SIZE[0], -yindex * CELL_SIZE[1]
 
             # Draw the grid cell.
@@ -11,6 +11,7 @@
 that has been defined to be under the influence of this engine."""
 
 import pygame
+import numpy
 import math 
 from . import entity
 from .. import gvar
@@ -20,6 +21,9 @@ DEFAULT_GRAVITY = 1350
 DEFAULT_FRICTION = 800
 DEFAULT_MINHEIGHT = -1000
 CELL_SIZE = (75, 75)
+MAX_MOVED_ENTITIES = 32     # Past this many moved entities, the broadphase pairs are dropped.
+SOA_PROPERTIES = 6          # Properties of each physics entity in the structure of arrays.
+SOA_CAPACITY = 64           # Initial number of physics entities in the structure of arrays.
 
 # Flags for defining collision.
 COLTYPE_COLLIDING = 0   # This entity is colliding another entity.
@@ -61,80 +65,45 @@ def is_collision_rightwards(coltype, coldir):
         return True
     return False
 
+# Offset used for packing signed cell indexes into a single integer hash.
+HASH_OFFSET = 1 << 31
+HASH_MASK = (1 << 32) - 1
+
+# Pack a cell's indexes into a single integer hash. Each index is biased so
+# that negative indexes can be packed and unpacked without losing their sign.
+def pack_hash(x, y):
+    return ((x + HASH_OFFSET) << 32) | ((y + HASH_OFFSET) & HASH_MASK)
+
+# Unpack an integer hash back into the cell's indexes.
+def unpack_hash(hash):
+    return ((hash >> 32) - HASH_OFFSET, (hash & HASH_MASK) - HASH_OFFSET)
+
 # Spatial hash grid implementation, which will be responsible for organizing
 # entities.
 class SpatialHashGrid():
-    # A doubly-linked list for each cell, which will contain each grid node.
-    # Grid nodes consist of the actual entity value, alongside the previous/next
-    # node object references.
-    class List():
-        # Grid node class.
-        class GridNode():
-            def __init__(self, value):
-                # Store the entity itself.
-                self.value = value
-
-                # Store the previous/next nodes for the doubly-linked list.
-                self.prev = None
-                self.next = None
-
-        # Constructor for a new cells list.
-        def __init__(self):
-            self.head = None
-            self.tail = None
-
     # Construct a new spatial hash grid.
     def __init__(self, cellsize):
-        # Create a new hashmap (i.e. dictionary) to track all the cells. The
-        # origin cell will be initialized by default.
-        self.cells = {
-            "0:0": SpatialHashGrid.List()
-        }
+        # Create a new hashmap (i.e. dictionary) to track all the cells. Each cell
+        # is keyed by its packed integer hash and is itself a dictionary, which is
+        # used as an insertion-ordered set of the entities within the cell.
+        self.cells = dict()
 
         # Store the cell size as a separate vector.
         self.__cellsize = cellsize
 
     # Insert an entity into this grid.
     def insert(self, entity):
-        # Retrieve the minimum and maximum cell indexes for this entity.
-        min_indexes = self.__get_indexes(entity.get_baseorigin())   # Top-left corner
-        max_indexes = self.__get_indexes(pygame.math.Vector2(       # Bottom-right corner
-                                            entity.get_baseorigin().x + entity.get_hitbox().x,
-                                            entity.get_baseorigin().y - entity.get_hitbox().y
-                                        ))                          
-
-        # Loop through the x/y co-ordinates to generate a list of hashes for all the cells
-        # this entity is in, and thus adding the entity to each cell.
-        entity.gridhashes = dict()
-        y = min_indexes[1]
-        while y >= max_indexes[1]:
-            x = min_indexes[0]
-            while x <= max_indexes[0]:
-                # Create a new hash.
-                hash = self.__get_hash((x, y))
-
-                # Create a new cell for this hash if it doesn't exist.
-                if hash not in self.cells:
-                    self.cells[hash] = SpatialHashGrid.List()
-
-                # Insert this entity to the respective cell.
-                node = SpatialHashGrid.List.GridNode(entity)
-                node.prev = self.cells[hash].tail
-                if node.prev:
-                    node.prev.next = node
-                node.next = None
-                if not self.cells[hash].head:
-                    self.cells[hash].head = node
-                self.cells[hash].tail = node
-
-                # Update the entity's grid hashes dictionary.
-                entity.gridhashes[hash] = node
-
-                # Update the x co-ordinate.
-                x += 1
-            
-            # Update the y co-ordinate.
-            y -= 1
+        # Generate a list of hashes for all the cells this entity is in, and add the
+        # entity to each cell.
+        entity.gridhashes = self.__get_entity_hashes(entity)
+        for hash in entity.gridhashes:
+            # Create a new cell for this hash if it doesn't exist.
+            cell = self.cells.get(hash)
+            if cell is None:
+                cell = self.cells[hash] = dict()
+
+            # Insert this entity to the respective cell.
+            cell[entity] = None
 
         # Unmark the entity as dirty.
         entity.dirty = False
@@ -142,106 +111,132 @@ class SpatialHashGrid():
     # Remove an entity from this grid, on the assumption that it is 
     # either being updated or it is being deleted.
     def remove(self, entity):
-        # Loop through each grid node for this entity and update the linked list.
+        # Loop through each cell for this entity and remove the entity from it.
         invalid_hash_count = 0
         for hash in entity.gridhashes:
-            # Get the grid node for this hash.
-            if hash not in self.cells:
+            # Get the cell for this hash.
+            cell = self.cells.get(hash)
+            if cell is None:
                 invalid_hash_count += 1
                 continue
-            node = entity.gridhashes[hash]
 
-            # Update the grid node's linked list.
-            if node.prev:
-                node.prev.next = node.next
-            else:
-                self.cells[hash].head = node.next
-            if node.next:
-                node.next.prev = node.prev
-            else:
-                self.cells[hash].tail = node.prev
-            
-            # Delete the node.
-            del node
+            # Remove the entity from the cell.
+            cell.pop(entity, None)
 
         # If any invalid hashes were found, write a warning to the console logfile.
         if invalid_hash_count > 0:
             entity._engine.console.warn(f"[Lost Levels]: entity {id(entity)} had {invalid_hash_count}" \
                                        f" invalid grid hash entries out of {len(entity.gridhashes)}")
 
-        # Nullify the entity's grid hashes dictionary.
-        entity.gridhashes = dict()
+        # Nullify the entity's grid hashes list.
+        entity.gridhashes = []
 
     # For a given set of start/end points forming a rectangle, return all the 
     # entities within the grid cells that are found within said rectangle.
-    def query_entities(self, start, end, include_nocollide = False):
+    # Entities can optionally be filtered by a collection of movetypes, or by
+    # whether they can be used.
+    def query_entities(self, start, end, include_nocollide = False, movetypes = None,
+                       usable_only = False):
         # Acquire the minimum/maximum cell indexes for the given start/end points.
-        hashes = []
-        min_indexes = self.__get_indexes(start)
-        max_indexes = self.__get_indexes(end)
-
-        # Loop through the indexes and generate hashes for all the cells included
-        # or inbetween.
-        y, y_hit = min_indexes[1], False
-        while not y_hit:
-            # Confirm whether the y-index is the max index.
-            if y == max_indexes[1]:
-                y_hit = True
-            
-            # Loop through each x-index.
-            x, x_hit = min_indexes[0], False
-            while not x_hit:
-                # Confirm whether the x-index is the max index.
-                if x == max_indexes[0]:
-                    x_hit = True
-
-                # Generate a hash and insert it.
-                hash = self.__get_hash((x, y))
-                hashes.append(hash)
-                
-                # Update the x co-ordinate.
-                x = x + 1 if max_indexes[0] > min_indexes[0] else x - 1
-
-            # Update the y co-ordinate.
-            y = y + 1 if max_indexes[1] > min_indexes[1] else y - 1
-
-        # Now, loop through each cell and profile a list of all the entities in each cell.
-        entities = []
-        for hash in hashes:
-            if hash not in self.cells:
-                continue
-            node = self.cells[hash].head
-            while node:
-                if (node.value not in entities
-                    and ((not include_nocollide and node.value.movetype != entity.MOVETYPE_NONE)
-                         or include_nocollide)):
-                    entities.append(node.value)
-                node = node.next
+        min_x, min_y = self.__get_indexes(start)
+        max_x, max_y = self.__get_indexes(end)
+        x_step = 1 if max_x >= min_x else -1
+        y_step = 1 if max_y >= min_y else -1
+
+        # Now, loop through each cell included or inbetween and profile all the entities
+        # in each cell. A dictionary is used as an insertion-ordered set, so that each
+        # entity is only checked and inserted once.
+        entities = dict()
+        cells = self.cells
+        for y in range(min_y, max_y + y_step, y_step):
+            for x in range(min_x, max_x + x_step, x_step):
+                cell = cells.get(pack_hash(x, y))
+                if not cell:
+                    continue
+                for ent in cell:
+                    if ent in entities:
+                        continue
+                    if not include_nocollide and ent.movetype == entity.MOVETYPE_NONE:
+                        continue
+                    if movetypes is not None and ent.movetype not in movetypes:
+                        continue
+                    if usable_only and not ent.can_use:
+                        continue
+                    entities[ent] = None
 
         # Return all the queried entities.
-        return entities
+        return list(entities)
+
+    # Order a collection of entities the same way that query_entities() would return them
+    # for the given start/end points, leaving out any entity that isn't within the cells
+    # between them. This allows the result of a larger query to be reused for a smaller
+    # area, whilst still checking the entities in the same order.
+    def order_entities(self, entities, start, end):
+        # Acquire the cell indexes for the given start/end points, and the direction in
+        # which query_entities() would loop through them.
+        min_x, min_y = self.__get_indexes(start)
+        max_x, max_y = self.__get_indexes(end)
+        x_step = 1 if max_x >= min_x else -1
+        y_step = 1 if max_y >= min_y else -1
+        columns = (max_x - min_x) * x_step + 1
+        rows = (max_y - min_y) * y_step + 1
+
+        # Find the first cell that each entity would be found in by the loop, and order
+        # the entities by that cell, and then by their position within it.
+        keys = dict()
+        for ent in entities:
+            first = None
+            for hash in ent.gridhashes:
+                x, y = unpack_hash(hash)
+                column, row = (x - min_x) * x_step, (y - min_y) * y_step
+                if 0 <= column < columns and 0 <= row < rows:
+                    index = row * columns + column
+                    if first is None or index < first[0]:
+                        first = (index, hash)
+            if first is not None:
+                keys[ent] = (first[0], list(self.cells[first[1]]).index(ent))
+        return sorted(keys, key = keys.__getitem__)
 
     # Update an entity.
     def update(self, entity):
+        # Skip re-inserting the entity if it still occupies the exact same cells.
+        hashes = self.__get_entity_hashes(entity)
+        if hashes == entity.gridhashes:
+            entity.dirty = False
+            return
         self.remove(entity)
         self.insert(entity)
 
     # Reset this grid, thus removing all entities from it.
     def reset(self):
-        self.cells = {
-            "0:0": SpatialHashGrid.List()
-        }
+        self.cells = dict()
+
+    # Count the number of cells that have entities within them.
+    def count_cells(self):
+        return sum(1 for cell in self.cells.values() if cell)
 
-    # Return the indexes of the cell a given point is located in.
+    # Return the hashes of all the cells an entity is located in.
+    def __get_entity_hashes(self, entity):
+        # Retrieve the minimum and maximum cell indexes for this entity.
+        origin = entity.get_baseorigin()
+        hitbox = entity.get_hitbox()
+        min_x, min_y = self.__get_indexes(origin)                   # Top-left corner
+        max_x, max_y = self.__get_indexes(pygame.math.Vector2(      # Bottom-right corner
+                                            origin.x + hitbox.x,
+                                            origin.y - hitbox.y
+                                        ))
+
+        # Loop through the x/y co-ordinates to generate a list of hashes for all the cells.
+        return [pack_hash(x, y)
+                for y in range(min_y, max_y - 1, -1)
+                for x in range(min_x, max_x + 1)]
+
+    # Return the indexes of the cell a given point is located in. Indexes are
+    # truncated towards zero.
     def __get_indexes(self, point):
         return (int(math.copysign(abs(point.x) // self.__cellsize.x, point.x)), 
                 int(math.copysign(abs(point.y) // self.__cellsize.y, point.y)))
 
-    # Construct a hash for a cell's indexes.
-    def __get_hash(self, indexes):
-        # Return a hash based on the cell indexes the point is based in.
-        return f"{indexes[0]}:{indexes[1]}"
-
 # The physics engine, responsible for handling each entity's physics.
 class LLPhysics():
     # Construct an instance of the physics engine.
@@ -257,273 +252,631 @@ class LLPhysics():
         self.__minheight = self.__engine.create_gvar("minheight", -1000,
                                                      "Entities that fall below this height will be killed.",
                                                      gvar.GVAR_PROGRAMONLY)
+        self.__check_broadphase = self.__engine.create_gvar("physics_check_broadphase", 0,
+                                                            "Check that the candidates from the " \
+                                                            "broadphase match querying the grid, " \
+                                                            "in the same order.")
+        self.__vectorized = self.__engine.create_gvar("physics_vectorized", 0,
+                                                      "Integrate all physics entities at once using " \
+                                                      "NumPy, before any collision is resolved.")
         
         # Create a new spatial hash grid for organizing all entities.
         self.__grid = SpatialHashGrid(pygame.math.Vector2(CELL_SIZE))
 
-    # Insert an entity into the spatial hash grid.
-    def insert_entity(self, entity):
-        return self.__grid.insert(entity)
+        # Create a linked list of all the active entities that are moved by the physics
+        # engine, i.e. MOVETYPE_PHYSICS and MOVETYPE_CUSTOM entities. This list is kept
+        # in the same order as the engine's entity list. Static entities are never
+        # walked through; instead, they are queued for a grid update once they move.
+        self.__dynamic_head: entity.Entity = None
+        self.__dynamic_tail: entity.Entity = None
+        self.__dirty_queue = []
+
+        # Candidate pairs gathered by the broadphase for the current frame, keyed by each
+        # dynamic entity. Entities that are inserted or have left their swept AABB during
+        # the narrowphase are tracked, as they have to be checked by every remaining
+        # entity. If an entity is removed instead, or too many entities have moved, the
+        # pairs are marked as stale and each remaining entity queries the grid itself.
+        self.__pairs = dict()
+        self.__moved = dict()
+        self.__stale = False
+
+        # The base origin of each dynamic entity before the last step, which is used for
+        # interpolating between steps when the physics engine is stepped at a fixed rate.
+        self.__previous = dict()
+
+        # A structure of arrays for integrating every physics entity at once, with a row
+        # for each property and a column for each entity. Each physics entity in the
+        # dynamic list is given a slot as it is linked and loses it as it is unlinked,
+        # so the arrays are kept across frames and only grown once they run out of room.
+        # Physics entities that have already been integrated for the current frame are
+        # also tracked, so that they aren't integrated again on their own turn.
+        self.__soa = numpy.zeros((SOA_PROPERTIES, SOA_CAPACITY))
+        self.__slots = dict()
+        self.__slot_entities = []
+        self.__integrated = set()
+
+    # Insert an entity into the spatial hash grid, and wake it up if it is
+    # moved by the physics engine.
+    def insert_entity(self, ent):
+        self.__grid.insert(ent)
+        self.__moved[ent] = None
+        if ent.movetype >= entity.MOVETYPE_PHYSICS:
+            self.__link_dynamic(ent)
+            self.__update_slot(ent)
     
-    # Remove an entity from the spatial hash grid.
-    def remove_entity(self, entity):
-        self.__grid.remove(entity)
-
-    # Per-frame method which runs physics code on each entity.
-    def per_frame(self):
-        # Walk through each entity in the engine's entity list.
-        ent = self.__engine.entity_head()
+    # Remove an entity from the spatial hash grid and the dynamic list.
+    def remove_entity(self, ent):
+        self.__grid.remove(ent)
+        self.__stale = True
+        self.__unlink_dynamic(ent)
+        self.__update_slot(ent)
+
+    # Wake up or put an active entity to sleep based on its new movetype.
+    def update_movetype(self, ent):
+        if ent.movetype >= entity.MOVETYPE_PHYSICS:
+            self.__link_dynamic(ent)
+        else:
+            self.__unlink_dynamic(ent)
+            if ent.dirty:
+                self.mark_dirty(ent)
+        self.__update_slot(ent)
+
+    # Queue a static entity for a grid update.
+    def mark_dirty(self, ent):
+        self.__dirty_queue.append(ent)
+
+    # Per-frame method which runs physics code on each entity. This is done in two
+    # stages: the broadphase gathers the candidate pairs for every dynamic entity
+    # first, and then each entity is moved and resolved against its candidates in the
+    # narrowphase. The entities are stepped by the given time, or by the frame time.
+    def per_frame(self, frametime = None):
+        # Update all the static entities that have moved in the spatial hash grid.
+        self.__flush_dirty()
+        if frametime is None:
+            frametime = self.__engine.globals.frametime
+
+        # If enabled, integrate every physics entity at once before the broadphase.
+        if self.__vectorized.get():
+            self.__integrate_vectorized(frametime)
+
+        # Gather the candidate pairs for this frame.
+        self.__broadphase(frametime)
+
+        # Walk through each entity in the dynamic list.
+        ent = self.__dynamic_head
         while (ent):
-            # Skip if this entity is deactivated.
-            if not ent.active:
-                ent = ent.next
-                continue
-
-            # Skip if this entity is not defined to be manipulated, but make sure it is
-            # actually updated in the spatial hash grid if it is marked dirty.
-            if ent.movetype < entity.MOVETYPE_PHYSICS:
-                if ent.dirty:
-                    self.__grid.update(ent)
-                ent = ent.next
+            # Skip if this entity was put to sleep while the list was being walked.
+            if not ent.dynamic:
+                ent = ent.dynnext
                 continue
 
             # Only manipulate the velocity vector if the movetype of this entity is
-            # MOVETYPE_PHYSICS.
-            if ent.movetype == entity.MOVETYPE_PHYSICS:
-                # Inflict gravity upon this entity.
-                ent.velocity.y -= self.__gravity.get() * self.__engine.globals.frametime
-
-                # Handle friction. This is done through multiplication in order to handle
-                #  +/- numbers, mathematically.
-                if ent.groundentity:
-                    newspeed = max(0, abs(ent.velocity.x) - self.__friction.get() 
-                                   * ent.groundentity.friction * ent.friction 
-                                   * self.__engine.globals.frametime)
-                    if abs(ent.velocity.x) > 0:
-                        newspeed /= abs(ent.velocity.x)
-                    ent.velocity.x *= newspeed
-
-                # Accelerate the entity based on its move value.
-                # Inspired by:
-                # https://github.com/id-Software/Quake-III-Arena/blob/master/code/game/bg_pmove.c
-                difference = ent.move - ent.velocity.x
-                if math.copysign(ent.move, difference) != ent.move:
-                    difference = 0
-                acceleration = (ent.acceleration * self.__engine.globals.frametime * ent.move
-                                * ent.friction)
-                if ent.groundentity:
-                    acceleration *= ent.groundentity.friction
-                if abs(acceleration) > abs(difference):
-                    # Cap the acceleration speed if it means that the entity will move faster than
-                    # its maximum speed.
-                    acceleration = difference
-                ent.velocity.x += acceleration
-
-            # Before beginning collision detection, calculate the start and end points
-            # in order to acquire all the grid cells.
-            if ent.velocity.x >= 0 and ent.velocity.y >= 0:
-                start = ent.get_bottomleft()
-                end = ent.get_topright() + ent.velocity * self.__engine.globals.frametime
-            elif ent.velocity.x >= 0 and ent.velocity.y < 0:
-                start = ent.get_topleft()
-                end = ent.get_bottomright() + ent.velocity * self.__engine.globals.frametime
-            elif ent.velocity.x < 0 and ent.velocity.y >= 0:
-                start = ent.get_bottomright()
-                end = ent.get_topleft() + ent.velocity * self.__engine.globals.frametime
-            else:
-                start = ent.get_topright()
-                end = ent.get_bottomleft() + ent.velocity * self.__engine.globals.frametime
-            
-            # Calculate all the entities that the entity may have hit and walk through
-            # them.
-            entities = self.__grid.query_entities(start, end)
-            closest_x, x_diff = None, 0
-            closest_y, y_diff = None, 0
-            for collideent in entities:
-                # Check if the collision entity is the same as the current entity.
-                if collideent == ent:
-                    continue
+            # MOVETYPE_PHYSICS, and if it hasn't been integrated already.
+            if ent.movetype == entity.MOVETYPE_PHYSICS and ent not in self.__integrated:
+                self.__integrate(ent, frametime)
 
-                # Check if collision was made by moving right.
-                if (ent.velocity.x > 0 and end.x > collideent.get_topleft().x 
-                    and start.x < collideent.get_topleft().x):
-                    # Make sure that the two entities actually horizontally collide by performing
-                    # AABB collision checks.
-                    if ent.collides_y(collideent):
-                        # Call the collision event on both entities and only continue colliding
-                        # if both calls return True.
-                        if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_LEFT)
-                            or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_LEFT)):
-                            continue
-
-                        # Calculate the difference in position between the right of the entity
-                        # and the left of the collision entity.
-                        diff = abs(abs(collideent.get_topleft().x) - abs(ent.get_topright().x))
-
-                        # If the difference between the two entities are less than the previous
-                        # cached difference, or the final collided entity is not set, set the 
-                        # final collided entity to this collided entity.
-                        if not closest_x or diff < x_diff:
-                            closest_x = collideent
-                            x_diff = diff
-
-                        # If the other entity is a physics entity and this is a custom physics
-                        # entity, move it.
-                        if (ent.movetype == entity.MOVETYPE_CUSTOM 
-                            and collideent.movetype == entity.MOVETYPE_PHYSICS):
-                            collideent.set_baseorigin(collideent.get_baseorigin()
-                                + pygame.math.Vector2(ent.velocity.x * self.__engine.globals.frametime, 0))
-                
-                # Check if collision was made by moving left.
-                elif (ent.velocity.x < 0 and end.x < collideent.get_topright().x
-                      and start.x > collideent.get_topright().x):
-                    # Make sure that the two entities actually horizontally collide by performing
-                    # AABB collision checks.
-                    if ent.collides_y(collideent):
-                        # Call the collision event on both entities and only continue colliding
-                        # if both calls return True.
-                        if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_RIGHT)
-                            or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_RIGHT)):
-                            continue
-
-                        # Calculate the difference in position between the left of the entity
-                        # and the right of the collision entity.
-                        diff = abs(abs(collideent.get_topright().x) - abs(ent.get_topleft().x))
-
-                        # If the difference between the two entities are less than the previous
-                        # cached difference, or the final collided entity is not set, set the 
-                        # final collided entity to this collided entity.
-                        if not closest_x or diff < x_diff:
-                            closest_x = collideent
-                            x_diff = diff
-
-                        # If the other entity is a physics entity and this is a custom physics
-                        # entity, move it.
-                        if (ent.movetype == entity.MOVETYPE_CUSTOM 
-                            and collideent.movetype == entity.MOVETYPE_PHYSICS):
-                            collideent.set_baseorigin(collideent.get_baseorigin()
-                                + pygame.math.Vector2(ent.velocity.x * self.__engine.globals.frametime, 0))
-
-                # Check if collision was made by moving upwards.
-                if (ent.velocity.y > 0 and end.y > collideent.get_bottomleft().y
-                    and start.y < collideent.get_bottomleft().y):
-                    # Make sure that the two entities actually horizontally collide by performing
-                    # AABB collision checks.
-                    if ent.collides_x(collideent):
-                        # Call the collision event on both entities and only continue colliding
-                        # if both calls return True.
-                        if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_DOWN)
-                            or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_DOWN)):
-                            continue
-
-                        # Calculate the difference in position between the top of the entity
-                        # and the bottom of the collision entity.
-                        diff = abs(abs(collideent.get_bottomleft().y) - abs(ent.get_topleft().y))
-
-                        # If the difference between the two entities are less than the previous
-                        # cached difference, or the final collided entity is not set, set the 
-                        # final collided entity to this collided entity.
-                        if not closest_y or diff < y_diff:
-                            closest_y = collideent
-                            y_diff = diff
-
-                        # If the other entity is a physics entity and this is a custom physics
-                        # entity, move it.
-                        if (ent.movetype == entity.MOVETYPE_CUSTOM 
-                            and collideent.movetype == entity.MOVETYPE_PHYSICS):
-                            collideent.set_baseorigin(collideent.get_baseorigin()
-                                 + pygame.math.Vector2(0, ent.velocity.y * self.__engine.globals.frametime))
-                            collideent.groundentity = ent
-
-                # Check if collision was made by moving downwards.
-                elif (ent.velocity.y < 0 and end.y < collideent.get_topleft().y
-                      and start.y > collideent.get_topleft().y):
-                    # Make sure that the two entities actually horizontally collide by performing
-                    # AABB collision checks.
-                    if ent.collides_x(collideent):
-                        # Call the collision event on both entities and only continue colliding
-                        # if both calls return True.
-                        if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_UP)
-                            or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_UP)):
-                            continue
-
-                        # Calculate the difference in position between the bottom of the entity
-                        # and the top of the collision entity.
-                        diff = abs(abs(collideent.get_topleft().y) - abs(ent.get_bottomleft().y))
-
-                        # If the difference between the two entities are less than the previous
-                        # cached difference, or the final collided entity is not set, set the 
-                        # final collided entity to this collided entity.
-                        if not closest_y or diff < y_diff:
-                            closest_y = collideent
-                            y_diff = diff
-
-                        # If the other entity is a physics entity and this is a custom physics
-                        # entity, move it.
-                        if (ent.movetype == entity.MOVETYPE_CUSTOM 
-                            and collideent.movetype == entity.MOVETYPE_PHYSICS):
-                            collideent.set_baseorigin(collideent.get_baseorigin()
-                                + pygame.math.Vector2(0, ent.velocity.y * self.__engine.globals.frametime))
-                                
-            # Basic collision resolution if this entity's being manipulated by the physics engine.
-            origin = ent.get_baseorigin()
-            ent.groundentity = None
-
-            # Handle horizontal collision.
-            if ent.movetype > entity.MOVETYPE_ANCHORED:
-                if closest_x:
-                    # Call the collisionfinal event on both entities.
-                    coldir = COLDIR_LEFT if ent.velocity.x > 0 else COLDIR_RIGHT
-                    ent.invoke_event("collisionfinal", closest_x, COLTYPE_COLLIDING, coldir)
-                    closest_x.invoke_event("collisionfinal", ent, COLTYPE_COLLIDED, coldir)
-
-                    # Resolve this entity's velocity and origin.
-                    if ent.movetype == entity.MOVETYPE_PHYSICS:
-                        if coldir == COLDIR_LEFT:
-                            origin.x = closest_x.get_topleft().x - ent.get_hitbox().x
-                        else:
-                            origin.x = closest_x.get_topright().x
-                        ent.velocity.x = 0
-
-                # Handle vertical collision.
-                if closest_y:
-                    # Call the collisionfinal event on both entities.
-                    coldir = COLDIR_DOWN if ent.velocity.y > 0 else COLDIR_UP
-                    ent.invoke_event("collisionfinal", closest_y, COLTYPE_COLLIDING, coldir)
-                    closest_y.invoke_event("collisionfinal", ent, COLTYPE_COLLIDED, coldir)
-
-                    # Resolve this entity's velocity and origin.
-                    if ent.movetype == entity.MOVETYPE_PHYSICS:
-                        if coldir == COLDIR_DOWN:
-                            origin.y = closest_y.get_bottomleft().y
-                        else:
-                            origin.y = closest_y.get_topleft().y + ent.get_hitbox().y
-                            ent.groundentity = closest_y
-                        ent.velocity.y = 0
-
-            # Set the new origin of this entity and update it in the grid.
-            ent.set_baseorigin(origin + ent.velocity * self.__engine.globals.frametime)
-            if ent.dirty:
-                self.__grid.update(ent)
+            # Resolve collision for this entity and move it.
+            self.__narrowphase(ent, self.__pairs.get(ent), frametime)
 
             # Kill this entity if it falls below minheight:
             if ent.get_baseorigin().y < self.__minheight.get():
-                oldent, ent = ent, ent.next
+                oldent, ent = ent, ent.dynnext
                 self.__engine.delete_entity(oldent)
                 continue
 
             # Get the next entity.
-            ent = ent.next
+            ent = ent.dynnext
+
+        # Release the candidate pairs and update any static entities that have moved
+        # during collision resolution.
+        self.__pairs = dict()
+        self.__moved = dict()
+        self.__integrated = set()
+        self.__flush_dirty()
+
+    # Record the base origin of each dynamic entity before the next step.
+    def snapshot(self):
+        self.__previous = dict()
+        ent = self.__dynamic_head
+        while ent:
+            origin = ent.get_baseorigin()
+            self.__previous[ent] = (origin.x, origin.y)
+            ent = ent.dynnext
+
+    # Move the absolute rectangle of each dynamic entity between its base origin before
+    # the last step and its current base origin. An alpha of 1 restores the entities to
+    # their current positions. Entities that have moved further than a grid cell in a
+    # single step are assumed to have been teleported, and aren't interpolated.
+    def interpolate(self, alpha):
+        for ent, (previous_x, previous_y) in self.__previous.items():
+            if not ent.active:
+                continue
+            origin = ent.get_baseorigin()
+            if (abs(origin.x - previous_x) > CELL_SIZE[0]
+                or abs(origin.y - previous_y) > CELL_SIZE[1]):
+                continue
+            origindisp = ent.get_origindisp()
+            ent._absrect.left = previous_x + (origin.x - previous_x) * alpha + origindisp.x
+            ent._absrect.top = -(previous_y + (origin.y - previous_y) * alpha + origindisp.y)
 
-    # Remove all entities from the spatial hash grid.
+    # Remove all entities from the spatial hash grid and the dynamic list.
     def clear_entities(self):
+        ent = self.__dynamic_head
+        while ent:
+            ent.dynamic = False
+            ent = ent.dynnext
+        self.__dynamic_head = None
+        self.__dynamic_tail = None
+        self.__dirty_queue = []
+        self.__pairs = dict()
+        self.__moved = dict()
+        self.__previous = dict()
+        self.__slots = dict()
+        self.__slot_entities = []
+        self.__integrated = set()
+        self.__stale = True
         self.__grid.reset()
 
     # For a given set of start/end points forming a rectangle, return all the 
     # entities within the grid cells that are found within said rectangle.
-    def query_entities(self, start, end, include_nocollide = True):
-        return self.__grid.query_entities(start, end, include_nocollide)
+    def query_entities(self, start, end, include_nocollide = True, movetypes = None,
+                       usable_only = False):
+        return self.__grid.query_entities(start, end, include_nocollide, movetypes, usable_only)
+
+    # Count the number of occupied cells in the spatial hash grid.
+    def count_cells(self):
+        return self.__grid.count_cells()
+
+    # Update all the static entities that have moved in the spatial hash grid, so that it
+    # can be queried outside of a physics step.
+    def flush(self):
+        self.__flush_dirty()
+
+    # Count the number of entities in the dynamic list.
+    def count_dynamic(self):
+        count = 0
+        ent = self.__dynamic_head
+        while ent:
+            count += 1
+            ent = ent.dynnext
+        return count
+
+    # Inflict gravity, friction and acceleration upon a physics entity.
+    def __integrate(self, ent, frametime):
+        # Inflict gravity upon this entity.
+        ent.velocity.y -= self.__gravity.get() * frametime
+
+        # Handle friction. This is done through multiplication in order to handle
+        #  +/- numbers, mathematically.
+        if ent.groundentity:
+            newspeed = max(0, abs(ent.velocity.x) - self.__friction.get() 
+                           * ent.groundentity.friction * ent.friction * frametime)
+            if abs(ent.velocity.x) > 0:
+                newspeed /= abs(ent.velocity.x)
+            ent.velocity.x *= newspeed
+
+        # Accelerate the entity based on its move value.
+        # Inspired by:
+        # https://github.com/id-Software/Quake-III-Arena/blob/master/code/game/bg_pmove.c
+        difference = ent.move - ent.velocity.x
+        if math.copysign(ent.move, difference) != ent.move:
+            difference = 0
+        acceleration = ent.acceleration * frametime * ent.move * ent.friction
+        if ent.groundentity:
+            acceleration *= ent.groundentity.friction
+        if abs(acceleration) > abs(difference):
+            # Cap the acceleration speed if it means that the entity will move faster than
+            # its maximum speed.
+            acceleration = difference
+        ent.velocity.x += acceleration
+
+    # Inflict gravity, friction and acceleration upon every physics entity at once. The
+    # properties of each entity are gathered into their slots in the structure of arrays,
+    # integrated in a single vectorized step that mirrors __integrate(), and written back.
+    def __integrate_vectorized(self, frametime):
+        # Gather the properties of each entity into its column. Entities that aren't
+        # grounded are given a NaN ground friction.
+        ents = self.__slot_entities
+        count = len(ents)
+        if not count:
+            return
+        soa = self.__soa[:, :count]
+        soa.T[:] = [(ent.velocity.x, ent.velocity.y, ent.move, ent.friction, ent.acceleration,
+                     ent.groundentity.friction if ent.groundentity else numpy.nan) for ent in ents]
+        velocity_x, velocity_y, move, friction, acceleration, groundfriction = soa
+        grounded = ~numpy.isnan(groundfriction)
+
+        # Inflict gravity upon all the entities.
+        velocity_y -= self.__gravity.get() * frametime
+
+        # Handle friction for all the grounded entities.
+        speed = numpy.abs(velocity_x)
+        newspeed = numpy.maximum(0, speed - self.__friction.get() * groundfriction 
+                                 * friction * frametime)
+        newspeed = numpy.divide(newspeed, speed, out = newspeed, where = speed > 0)
+        numpy.multiply(velocity_x, newspeed, out = velocity_x, where = grounded)
+
+        # Accelerate all the entities based on their move values.
+        difference = move - velocity_x
+        difference[numpy.copysign(move, difference) != move] = 0
+        acceleration *= frametime
+        acceleration *= move
+        acceleration *= friction
+        numpy.multiply(acceleration, groundfriction, out = acceleration, where = grounded)
+        acceleration = numpy.where(numpy.abs(acceleration) > numpy.abs(difference),
+                                   difference, acceleration)
+        velocity_x += acceleration
+
+        # Write the new velocities back to each entity.
+        for ent, new_x, new_y in zip(ents, velocity_x.tolist(), velocity_y.tolist()):
+            ent.velocity.x = new_x
+            ent.velocity.y = new_y
+        self.__integrated = set(ents)
+
+    # Compute the swept AABB of every dynamic entity once, and gather the entities that
+    # each one may collide with. Static entities are taken from the spatial hash grid.
+    # As dynamic entities move before others are resolved, they are also paired with
+    # each other by sorting and sweeping their swept AABBs along the x axis.
+    def __broadphase(self, frametime):
+        self.__pairs = dict()
+        self.__moved = dict()
+        self.__stale = False
+        boxes = []
+
+        # Compute each swept AABB and query the grid with it. Physics entities are yet
+        # to be integrated, so their swept AABB has to cover any velocity that they may
+        # end up with: gravity is always inflicted, while friction and acceleration can
+        # only bring the horizontal velocity towards zero or the move value.
+        gravity = self.__gravity.get() * frametime
+        ent = self.__dynamic_head
+        while (ent):
+            velocity_x, velocity_y = ent.velocity.x, ent.velocity.y
+            if ent.movetype == entity.MOVETYPE_PHYSICS and ent not in self.__integrated:
+                min_velocity_x = min(velocity_x, ent.move, 0)
+                max_velocity_x = max(velocity_x, ent.move, 0)
+                velocity_y -= gravity
+            else:
+                min_velocity_x = max_velocity_x = velocity_x
+            min_x = ent._left + min(min_velocity_x, 0) * frametime
+            max_x = ent._right + max(max_velocity_x, 0) * frametime
+            min_y = ent._bottom + min(velocity_y, 0) * frametime
+            max_y = ent._top + max(velocity_y, 0) * frametime
+            candidates = dict.fromkeys(self.__grid.query_entities(
+                pygame.math.Vector2(min_x, max_y), pygame.math.Vector2(max_x, min_y), True))
+            box = (min_x, max_x, min_y, max_y, candidates)
+            self.__pairs[ent] = box
+            boxes.append(box + (ent,))
+            ent = ent.dynnext
+
+        # Pair up all the dynamic entities with overlapping swept AABBs. The overlap is
+        # padded by a pixel, as the narrowphase compares integer rectangles.
+        boxes.sort(key = lambda box: box[0])
+        count = len(boxes)
+        for index in range(count):
+            min_x, max_x, min_y, max_y, candidates, ent = boxes[index]
+            for otherindex in range(index + 1, count):
+                other = boxes[otherindex]
+                if other[0] > max_x + 1:
+                    break
+                if other[2] > max_y + 1 or other[3] < min_y - 1:
+                    continue
+                candidates.setdefault(other[5])
+                other[4].setdefault(ent)
+
+    # Has an entity left the swept AABB it was given in the broadphase?
+    def __escaped(self, ent):
+        if (record := self.__pairs.get(ent)) is None:
+            return True
+        return (ent._left < record[0] or ent._right > record[1]
+                or ent._bottom < record[2] or ent._top > record[3])
+
+    # Resolve collision for a dynamic entity against its candidates and move it.
+    def __narrowphase(self, ent, record, frametime):
+        # Calculate the start and end points of the area that this entity sweeps through,
+        # from its cached edges.
+        if ent.velocity.x >= 0:
+            start_x, end_x = ent._left, ent._right + ent.velocity.x * frametime
+        else:
+            start_x, end_x = ent._right, ent._left + ent.velocity.x * frametime
+        if ent.velocity.y >= 0:
+            start_y, end_y = ent._bottom, ent._top + ent.velocity.y * frametime
+        else:
+            start_y, end_y = ent._top, ent._bottom + ent.velocity.y * frametime
+
+        # Use the candidates from the broadphase, along with any entities that have moved
+        # since, if they still cover the swept area. They are put in the same order as
+        # querying the grid from the start to the end of the swept area, as that decides
+        # the order of the collision events and which entity is collided with on a tie.
+        # Otherwise, this entity was moved or an entity was removed from the grid, so
+        # query the grid again.
+        start = pygame.math.Vector2(start_x, start_y)
+        end = pygame.math.Vector2(end_x, end_y)
+        if (record is not None and not self.__stale
+            and min(start_x, end_x) >= record[0] and max(start_x, end_x) <= record[1]
+            and min(start_y, end_y) >= record[2] and max(start_y, end_y) <= record[3]):
+            candidates = record[4]
+            entities = [collideent for collideent in candidates
+                        if collideent.movetype != entity.MOVETYPE_NONE]
+            if self.__moved:
+                entities.extend(collideent for collideent in self.__moved
+                                if collideent not in candidates
+                                and collideent.movetype != entity.MOVETYPE_NONE)
+            entities = self.__grid.order_entities(entities, start, end)
+
+            # If enabled, check the candidates against querying the grid. Entities that
+            # share a cell with the swept area but don't overlap it can't be collided
+            # with, so the broadphase is allowed to leave them out.
+            if self.__check_broadphase.get():
+                left, right = min(start_x, end_x) - 1, max(start_x, end_x) + 1
+                bottom, top = min(start_y, end_y) - 1, max(start_y, end_y) + 1
+                found = set(entities)
+                expected = [collideent for collideent in self.__grid.query_entities(start, end)
+                            if collideent in found
+                            or (collideent._right >= left and collideent._left <= right
+                                and collideent._top >= bottom and collideent._bottom <= top)]
+                if entities != expected:
+                    self.__engine.console.warn(f"broadphase candidates for entity {id(ent)} " \
+                                               f"don't match the grid ({len(entities)} vs " \
+                                               f"{len(expected)} entities)")
+        else:
+            entities = self.__grid.query_entities(start, end)
+
+        # Walk through all the entities that the entity may have hit.
+        closest_x, x_diff = None, 0
+        closest_y, y_diff = None, 0
+        for collideent in entities:
+            # Check if the collision entity is the same as the current entity.
+            if collideent is ent:
+                continue
+
+            # Check if collision was made by moving right.
+            if (ent.velocity.x > 0 and end_x > collideent._left 
+                and start_x < collideent._left):
+                # Make sure that the two entities actually horizontally collide by performing
+                # AABB collision checks.
+                if ent.collides_y(collideent):
+                    # Call the collision event on both entities and only continue colliding
+                    # if both calls return True.
+                    if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_LEFT)
+                        or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_LEFT)):
+                        continue
+
+                    # Calculate the difference in position between the right of the entity
+                    # and the left of the collision entity.
+                    diff = abs(abs(collideent._left) - abs(ent._right))
+
+                    # If the difference between the two entities are less than the previous
+                    # cached difference, or the final collided entity is not set, set the 
+                    # final collided entity to this collided entity.
+                    if not closest_x or diff < x_diff:
+                        closest_x = collideent
+                        x_diff = diff
+
+                    # If the other entity is a physics entity and this is a custom physics
+                    # entity, move it.
+                    if (ent.movetype == entity.MOVETYPE_CUSTOM 
+                        and collideent.movetype == entity.MOVETYPE_PHYSICS):
+                        collideent.set_baseorigin(collideent.get_baseorigin()
+                            + pygame.math.Vector2(ent.velocity.x * frametime, 0))
+                        if self.__escaped(collideent):
+                            self.__moved[collideent] = None
+            
+            # Check if collision was made by moving left.
+            elif (ent.velocity.x < 0 and end_x < collideent._right
+                  and start_x > collideent._right):
+                # Make sure that the two entities actually horizontally collide by performing
+                # AABB collision checks.
+                if ent.collides_y(collideent):
+                    # Call the collision event on both entities and only continue colliding
+                    # if both calls return True.
+                    if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_RIGHT)
+                        or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_RIGHT)):
+                        continue
+
+                    # Calculate the difference in position between the left of the entity
+                    # and the right of the collision entity.
+                    diff = abs(abs(collideent._right) - abs(ent._left))
+
+                    # If the difference between the two entities are less than the previous
+                    # cached difference, or the final collided entity is not set, set the 
+                    # final collided entity to this collided entity.
+                    if not closest_x or diff < x_diff:
+                        closest_x = collideent
+                        x_diff = diff
+
+                    # If the other entity is a physics entity and this is a custom physics
+                    # entity, move it.
+                    if (ent.movetype == entity.MOVETYPE_CUSTOM 
+                        and collideent.movetype == entity.MOVETYPE_PHYSICS):
+                        collideent.set_baseorigin(collideent.get_baseorigin()
+                            + pygame.math.Vector2(ent.velocity.x * frametime, 0))
+                        if self.__escaped(collideent):
+                            self.__moved[collideent] = None
+
+            # Check if collision was made by moving upwards.
+            if (ent.velocity.y > 0 and end_y > collideent._bottom
+                and start_y < collideent._bottom):
+                # Make sure that the two entities actually horizontally collide by performing
+                # AABB collision checks.
+                if ent.collides_x(collideent):
+                    # Call the collision event on both entities and only continue colliding
+                    # if both calls return True.
+                    if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_DOWN)
+                        or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_DOWN)):
+                        continue
+
+                    # Calculate the difference in position between the top of the entity
+                    # and the bottom of the collision entity.
+                    diff = abs(abs(collideent._bottom) - abs(ent._top))
+
+                    # If the difference between the two entities are less than the previous
+                    # cached difference, or the final collided entity is not set, set the 
+                    # final collided entity to this collided entity.
+                    if not closest_y or diff < y_diff:
+                        closest_y = collideent
+                        y_diff = diff
+
+                    # If the other entity is a physics entity and this is a custom physics
+                    # entity, move it.
+                    if (ent.movetype == entity.MOVETYPE_CUSTOM 
+                        and collideent.movetype == entity.MOVETYPE_PHYSICS):
+                        collideent.set_baseorigin(collideent.get_baseorigin()
+                             + pygame.math.Vector2(0, ent.velocity.y * frametime))
+                        collideent.groundentity = ent
+                        if self.__escaped(collideent):
+                            self.__moved[collideent] = None
+
+            # Check if collision was made by moving downwards.
+            elif (ent.velocity.y < 0 and end_y < collideent._top
+                  and start_y > collideent._top):
+                # Make sure that the two entities actually horizontally collide by performing
+                # AABB collision checks.
+                if ent.collides_x(collideent):
+                    # Call the collision event on both entities and only continue colliding
+                    # if both calls return True.
+                    if (not ent.invoke_event("collision", collideent, COLTYPE_COLLIDING, COLDIR_UP)
+                        or not collideent.invoke_event("collision", ent, COLTYPE_COLLIDED, COLDIR_UP)):
+                        continue
+
+                    # Calculate the difference in position between the bottom of the entity
+                    # and the top of the collision entity.
+                    diff = abs(abs(collideent._top) - abs(ent._bottom))
+
+                    # If the difference between the two entities are less than the previous
+                    # cached difference, or the final collided entity is not set, set the 
+                    # final collided entity to this collided entity.
+                    if not closest_y or diff < y_diff:
+                        closest_y = collideent
+                        y_diff = diff
+
+                    # If the other entity is a physics entity and this is a custom physics
+                    # entity, move it.
+                    if (ent.movetype == entity.MOVETYPE_CUSTOM 
+                        and collideent.movetype == entity.MOVETYPE_PHYSICS):
+                        collideent.set_baseorigin(collideent.get_baseorigin()
+                            + pygame.math.Vector2(0, ent.velocity.y * frametime))
+                        if self.__escaped(collideent):
+                            self.__moved[collideent] = None
+                                
+        # Basic collision resolution if this entity's being manipulated by the physics engine.
+        origin = ent.get_baseorigin()
+        ent.groundentity = None
+
+        # Handle horizontal collision.
+        if ent.movetype > entity.MOVETYPE_ANCHORED:
+            if closest_x:
+                # Call the collisionfinal event on both entities.
+                coldir = COLDIR_LEFT if ent.velocity.x > 0 else COLDIR_RIGHT
+                ent.invoke_event("collisionfinal", closest_x, COLTYPE_COLLIDING, coldir)
+                closest_x.invoke_event("collisionfinal", ent, COLTYPE_COLLIDED, coldir)
+
+                # Resolve this entity's velocity and origin.
+                if ent.movetype == entity.MOVETYPE_PHYSICS:
+                    if coldir == COLDIR_LEFT:
+                        origin.x = closest_x._left - ent.get_hitbox().x
+                    else:
+                        origin.x = closest_x._right
+                    ent.velocity.x = 0
+
+            # Handle vertical collision.
+            if closest_y:
+                # Call the collisionfinal event on both entities.
+                coldir = COLDIR_DOWN if ent.velocity.y > 0 else COLDIR_UP
+                ent.invoke_event("collisionfinal", closest_y, COLTYPE_COLLIDING, coldir)
+                closest_y.invoke_event("collisionfinal", ent, COLTYPE_COLLIDED, coldir)
+
+                # Resolve this entity's velocity and origin.
+                if ent.movetype == entity.MOVETYPE_PHYSICS:
+                    if coldir == COLDIR_DOWN:
+                        origin.y = closest_y._bottom
+                    else:
+                        origin.y = closest_y._top + ent.get_hitbox().y
+                        ent.groundentity = closest_y
+                    ent.velocity.y = 0
+
+        # Set the new origin of this entity and update it in the grid.
+        ent.set_baseorigin(origin + ent.velocity * frametime)
+        if ent.dirty:
+            self.__grid.update(ent)
+
+        # Track this entity if it was moved out of its swept AABB.
+        if self.__escaped(ent):
+            self.__moved[ent] = None
+        if len(self.__moved) > MAX_MOVED_ENTITIES:
+            self.__stale = True
     
+    # Update each queued static entity in the spatial hash grid.
+    def __flush_dirty(self):
+        if not self.__dirty_queue:
+            return
+        queue, self.__dirty_queue = self.__dirty_queue, []
+        for ent in queue:
+            if ent.dirty and ent.active:
+                self.__grid.update(ent)
+
+    # Give an entity a slot in the structure of arrays if it is a physics entity in the
+    # dynamic list, or take its slot away otherwise. The last slot is moved into the
+    # slot that is freed up, so that the slots stay packed.
+    def __update_slot(self, ent):
+        slots, ents = self.__slots, self.__slot_entities
+        if ent.dynamic and ent.movetype == entity.MOVETYPE_PHYSICS:
+            if ent in slots:
+                return
+            slots[ent] = len(ents)
+            ents.append(ent)
+            if len(ents) > self.__soa.shape[1]:
+                self.__soa = numpy.zeros((SOA_PROPERTIES, self.__soa.shape[1] * 2))
+        elif ent in slots:
+            index = slots.pop(ent)
+            last = ents.pop()
+            if last is not ent:
+                ents[index] = last
+                slots[last] = index
+
+    # Link an entity to the dynamic list, just after the closest preceding dynamic
+    # entity in the engine's entity list.
+    def __link_dynamic(self, ent):
+        # Ignore if this entity is already in the dynamic list.
+        if ent.dynamic:
+            return
+
+        # Find the closest preceding dynamic entity by its order, walking back from the
+        # end of the dynamic list rather than through every static entity before it.
+        prev = self.__dynamic_tail
+        while prev and prev.order > ent.order:
+            prev = prev.dynprev
+
+        # Link the entity after it, or at the start of the list if there isn't one.
+        ent.dynprev = prev
+        ent.dynnext = prev.dynnext if prev else self.__dynamic_head
+        if ent.dynprev:
+            ent.dynprev.dynnext = ent
+        else:
+            self.__dynamic_head = ent
+        if ent.dynnext:
+            ent.dynnext.dynprev = ent
+        else:
+            self.__dynamic_tail = ent
+        ent.dynamic = True
+
+    # Unlink an entity from the dynamic list. The entity's own links are kept, so
+    # that the dynamic list can still be walked if it is unlinked mid-frame.
+    def __unlink_dynamic(self, ent):
+        # Ignore if this entity is not in the dynamic list.
+        if not ent.dynamic:
+            return
+
+        # Unlink the entity.
+        if ent.dynprev:
+            ent.dynprev.dynnext = ent.dynnext
+        else:
+            self.__dynamic_head = ent.dynnext
+        if ent.dynnext:
+            ent.dynnext.dynprev = ent.dynprev
+        else:
+            self.__dynamic_tail = ent.dynprev
+        ent.dynamic = False
+
 # Define what should be imported from this module.
 __all__ = ["LLPhysics", "COLTYPE_COLLIDING", "COLTYPE_COLLIDED", 
            "COLDIR_LEFT", "COLDIR_RIGHT", "COLDIR_UP", "COLDIR_DOWN",
@@ -16,6 +16,10 @@ class Rectangle(entity.Entity):
         # Rectangle properties.
         self.colour = pygame.Color(0, 0, 0)
 
+    # The colour is part of the render state of a rectangle.
+    def get_render_state(self):
+        return (self._revision, tuple(self.colour))
+
 # Draw this rectangle.
 def draw_rectangle(self, screen):
     pygame.draw.rect(screen, self.colour, self._absrect)
\ No newline at end of file
@@ -9,11 +9,9 @@ import os
 import pygame
 
 from . import entity
+from . import atlas
 
-# Macros.
-SPRITES_PER_ROW = 16
-
-# Cached sprite tiles.
+# Cached sprite tiles, for each sheet, tile size and tile count.
 cached_tiles = dict()
 
 # Sprite entity.
@@ -27,6 +25,7 @@ class Sprite(entity.Entity):
 
         # Texture information.
         self.__tiles = None
+        self.__sheet = None # The path and tile size of the sheet, if it is valid.
         self.__texture = None
         self.__flip_x = False
         self.__flip_y = False
@@ -39,60 +38,56 @@ class Sprite(entity.Entity):
     def load(self, path, res, count):
         # Set the size of this sprite's hitbox.
         self.set_hitbox(pygame.math.Vector2(*res))
+        self._revision += 1
+
+        # Check whether the tiles are already cached.
+        key = (os.path.abspath(path), tuple(res), count)
+        self.__sheet = (path, res)
+        if key in cached_tiles:
+            self.__tiles = cached_tiles[key]
+            return
 
-        # Fallback function, should the sheet provided be invalid.
-        def fallback():
-            nonlocal self, path
+        # Fall back to the missing texture, should the sheet provided be invalid.
+        if not atlas.load_sheet(path):
             self._engine.console.warn(f"tile sheet path \"{path}\" is invalid")
-            self.__tiles = cached_tiles[path] = [pygame.transform.scale(self._engine.missing, res)]
-
-        # Check whether the sheet is already cached.
-        abspath = os.path.abspath(path)
-        if abspath in cached_tiles:
-            self.__tiles = cached_tiles[abspath]
-        else:
-            # Check if the path for the sheet exists.
-            if not os.path.isfile(path):
-                fallback()
-                return
-            
-            # Attempt to load the image.
-            try:
-                sheet = pygame.image.load(path).convert_alpha()
-                self.__tiles = cached_tiles[abspath] = []
-            except pygame.error:
-                fallback()
-                return
-            
-            # Convert each tile into a separate surface object, and populate the
-            # cached tiles array for this sheet.
-            for i in range(0, count):
-                # Calculate the row and column numbers with the current index.
-                column = i % SPRITES_PER_ROW
-                row = i // SPRITES_PER_ROW
-
-                # Create a new surface for this tile specifically, and append it.
-                tile = pygame.Surface(res, pygame.SRCALPHA)
-                tile.blit(sheet, (0, 0), (column * res[0], row * res[1], *res))
-                cached_tiles[abspath].append(tile)
+            self.__tiles = [pygame.transform.scale(self._engine.missing, res)]
+            self.__sheet = None
+            return
+
+        # Populate the cached tiles array with the tiles shared through the atlas.
+        self.__tiles = cached_tiles[key] = [atlas.get_tile(self._engine, path, res, i) 
+                                            for i in range(0, count)]
 
     # Toggle which directions the sprite should flip in.
     def flip(self, flip_x = False, flip_y = False):
         if self.__flip_x != flip_x or self.__flip_y != flip_y:
             self.__texture = None
+            self._revision += 1
         self.__flip_x = flip_x
         self.__flip_y = flip_y
 
+    # The current tile index is part of the render state of a sprite.
+    def get_render_state(self):
+        return (self._revision, self.index)
+
     # Draw this map tile entity.
     def draw_sprite(self, screen):
-        # Re-render the texture if the index changed or if it is null.
+        # Re-render the texture if the index changed or if it is null. If the tile fits the
+        # hitbox exactly, the shared (and possibly flipped) variant of the tile is used.
         if not self.__texture or self.index != self.__oldindex:
             self.__oldindex = self.index
-            self.__texture = pygame.Surface((self._absrect.width, self._absrect.height),
-                                            pygame.SRCALPHA)
-            self.__texture.blit(self.__tiles[self.index % len(self.__tiles)], (0, 0))
-            if self.__flip_x or self.__flip_y:
-                self.__texture = pygame.transform.flip(self.__texture, self.__flip_x, self.__flip_y)
+            index = self.index % len(self.__tiles)
+            tile = self.__tiles[index]
+            if self.__sheet and tile.get_size() == self._absrect.size:
+                self.__texture = atlas.get_variant(self._engine, *self.__sheet, index, 
+                                                   self.__flip_x, self.__flip_y)
+            else:
+                self.__texture = pygame.Surface((self._absrect.width, self._absrect.height),
+                                                pygame.SRCALPHA)
+                self.__texture.blit(tile, (0, 0))
+                if self.__flip_x or self.__flip_y:
+                    self.__texture = pygame.transform.flip(self.__texture, self.__flip_x, 
+                                                           self.__flip_y)
 
         # Blit the current texture.
         screen.blit(self.__texture, self._absrect)
@@ -3,16 +3,10 @@
 Missing tile sheets means the tile texture will default to a missing texture
 image, which is 16x16 and will be stretched to compensate for the tile size."""
 
-import os
 import pygame
 
 from . import entity
-
-# Macros.
-TILES_PER_ROW = 16
-
-# Cached tile sheets.
-cached_sheets = dict()
+from . import atlas
 
 # Map tile entity.
 class Tile(entity.Entity):
@@ -26,51 +20,56 @@ class Tile(entity.Entity):
         # Map tile properties.
         self.__texture = engine.missing # Default to the missing texture (although
                                         # it won't be stretched).
+        self.__variant = None           # The path, size, index, flip and rotation of
+                                        # the texture, if it is shared through the atlas.
 
     # Load from a tile sheet.
     def load(self, path, res, index):
         # Set the size of this tile's hitbox.
         self.set_hitbox(pygame.math.Vector2(*res))
+        self._revision += 1
+        self.__texture = load_tile(self._engine, path, res, index)
+        self.__variant = (path, res, index, False, False, 0) if atlas.load_sheet(path) else None
 
-        # Fallback function, should the sheet provided be invalid.
-        def fallback():
-            nonlocal self, path
-            self._engine.console.warn(f"tile sheet path \"{path}\" is invalid")
-            self.__texture = pygame.transform.scale(self._engine.missing, res)
-
-        # Check whether the sheet is already cached.
-        abspath = os.path.abspath(path)
-        if abspath in cached_sheets:
-            sheet = cached_sheets[abspath]
-        else:
-            # Check if the path for the sheet exists.
-            if not os.path.isfile(path):
-                fallback()
-                return
-
-            # Attempt to load the image.
-            try:
-                sheet = cached_sheets[abspath] = pygame.image.load(path).convert_alpha()
-            except pygame.error:
-                fallback()
-                return
-        
-        # Calculate the row and column numbers with the index provided.
-        column = index % TILES_PER_ROW
-        row = index // TILES_PER_ROW
-        
-        # Create a new surface for this tile specifically.
-        self.__texture = pygame.Surface(res, pygame.SRCALPHA)
-        self.__texture.blit(sheet, (0, 0), (column * res[0], row * res[1], *res))
+    # Set the texture of this tile directly, such as a texture baked out of many tiles.
+    # The hitbox is resized to fit the texture.
+    def set_texture(self, texture):
+        self.set_hitbox(pygame.math.Vector2(texture.get_size()))
+        self._revision += 1
+        self.__texture = texture
+        self.__variant = None
 
-    # Flip this tile.
+    # Flip this tile. Unless it has already been rotated, the flipped texture is shared
+    # with every other tile flipped the same way.
     def flip(self, flip_x = False, flip_y = False):
-        self.__texture = pygame.transform.flip(self.__texture, flip_x, flip_y)
+        variant = self.__variant
+        if variant and not variant[5]:
+            self.__variant = variant[:3] + (variant[3] != flip_x, variant[4] != flip_y, 0)
+            self.__texture = atlas.get_variant(self._engine, *self.__variant)
+        else:
+            self.__variant = None
+            self.__texture = pygame.transform.flip(self.__texture, flip_x, flip_y)
+        self._revision += 1
 
-    # Rotate this tile. Note that the hitbox size will not change!
+    # Rotate this tile. Note that the hitbox size will not change! Rotations by multiples
+    # of 90 degrees are shared with every other tile rotated the same way.
     def rotate(self, angle):
-        self.__texture = pygame.transform.rotate(self.__texture, angle)
+        variant = self.__variant
+        if variant and angle % 90 == 0 and variant[5] % 90 == 0:
+            self.__variant = variant[:5] + (variant[5] + angle,)
+            self.__texture = atlas.get_variant(self._engine, *self.__variant)
+        else:
+            self.__variant = None
+            self.__texture = pygame.transform.rotate(self.__texture, angle)
+        self._revision += 1
 
     # Draw this map tile entity.
     def draw_tile(self, screen):
-        screen.blit(self.__texture, self._absrect)
\ No newline at end of file
+        screen.blit(self.__texture, self._absrect)
+
+# Load a single tile out of a tile sheet. The texture returned is shared with every other
+# tile loaded from the same sheet, size and index, and so it must not be drawn onto.
+# Should the sheet provided be invalid, the missing texture is returned instead,
+# stretched to the tile size.
+def load_tile(engine, path, res, index):
+    return atlas.get_tile(engine, path, res, index)
\ No newline at end of file
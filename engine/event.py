@@ -23,6 +23,10 @@ class Event():
     def get_name(self):
         return self.__name
     
+    # Get the current function to be invoked.
+    def get_func(self):
+        return self.__func
+
     # Replace the current function to be invoked with a new one.
     def set_func(self, func):
         self.__func = func
@@ -38,6 +42,10 @@ class Event():
                 return
             self.__pre.append(function)
 
+    # Check whether this event has been detoured by any functions.
+    def is_detoured(self):
+        return bool(self.__pre or self.__post)
+
     # Remove a detoured function from this event.
     def remove_hook(self, function, post = False):
         if post and function in self.__post:
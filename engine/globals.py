@@ -7,4 +7,6 @@ class GlobalVars():
         self.fps = 0        # The average FPS of the game. Calculations vary depending
                             # on which method of frame-limitation is used.
         self.frames = 0     # Number of frames ever since the engine launched.
-        self.time = 0       # Time ever since the engine launched (s).
\ No newline at end of file
+        self.time = 0       # Time ever since the engine launched (s).
+        self.phasetimes = {}    # Time spent in each phase of the previous frame (s),
+                                # as timed by the engine's profiler.
\ No newline at end of file
@@ -16,20 +16,26 @@ from . import game_interface
 from . import entity
 from . import ui
 from . import sound
-
-# Engine-oriented timer, only invoked per frame.
-class Timer():
-    def __init__(self, func, end, *args):
-        self.func = func
-        self.end = end
-        self.args = args
+from . import replay
+from . import profiler
+from . import timer
+from . import renderer
+from . import preload
 
 # The top-level engine class.
 class LLEngine():
-    # Construct an instance of the engine class.
-    def __init__(self, name = "LLEngine"):
-        # Set the name of this engine
+    # Construct an instance of the engine class. If headless, the engine runs without
+    # a window or an audio device.
+    def __init__(self, name = "LLEngine", headless = False):
+        # Set the name of this engine, and whether it is running headless.
         self.__name = name
+        self.headless = headless
+
+        # Use the dummy video and audio drivers when running headless. These have to be
+        # selected before Pygame is initialized.
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
 
         # Initialize Pygame and set up any crucial Pygame objects here.
         pygame.init()
@@ -54,6 +60,27 @@ class LLEngine():
         self.use_self_busywait = self.create_gvar("use_self_busywait", 0,
                                         "Use custom busy-wait code.")
         self.showfps = self.create_gvar("showfps", 0, "Display FPS counter.")
+        self.profile_frames = self.create_gvar("profile_frames", 300,
+                                               "Number of frames kept by the profiler.", min=1)
+        self.profile_graph = self.create_gvar("profile_graph", 0,
+                                              "Display the profiler's frame time graph.")
+        self.profile_dump = self.create_gvar("profile_dump", 0,
+                                             "Write the profiler's percentiles to the console on exit.")
+        self.physics_hz = self.create_gvar("physics_hz", 0.0,
+                                           "Fixed physics tick rate. Set to 0 to step the physics " \
+                                           "engine once per frame instead.", min=0)
+        self.physics_maxsteps = self.create_gvar("physics_maxsteps", 5,
+                                                 "Maximum number of fixed physics steps per frame.",
+                                                 min=1)
+        self.headless_frametime = self.create_gvar("headless_frametime", 1 / 60,
+                                                   "Fixed frame time when running headless.",
+                                                   min=0.001)
+        self.headless_frames = self.create_gvar("headless_frames", 0,
+                                                "Number of frames to run when headless. Set to 0 " \
+                                                "to run until the game quits.", min=0)
+        self.record = self.create_gvar("record", "", "Record all input into the given replay file.")
+        self.replay = self.create_gvar("replay", "", "Replay all input from the given replay file " \
+                                       "at maximum speed.")
         
         # Create gvars for the renderer.
         self.width = self.create_gvar("width", 640, "Start-up width of the window.", min=0)
@@ -62,9 +89,47 @@ class LLEngine():
                                            gvar.GVAR_PROGRAMONLY, 0)
         self.game_height = self.create_gvar("game_height", 480, "Fixed game resolution height.",
                                             gvar.GVAR_PROGRAMONLY, 0)
+        self.render_dirty = self.create_gvar("render_dirty", 0,
+                                             "Only redraw and present the regions of the screen " \
+                                             "that changed since the previous frame.")
+        self.cull_entities = self.create_gvar("cull_entities", 1,
+                                              "Only draw the static entities within view, once " \
+                                              "the game has set the view with set_view().")
+        self.cull_margin = self.create_gvar("cull_margin", 150,
+                                            "Margin around the view within which static entities " \
+                                            "are still drawn (px).", min = 0)
+        self.texture_variants = self.create_gvar("texture_variants", 256,
+                                                 "Maximum number of flipped and rotated tile " \
+                                                 "variants that are cached.", min = 0)
+        self.sound_playbacks = self.create_gvar("sound_playbacks", 64,
+                                                "Maximum number of mixer sounds cached for each " \
+                                                "sample buffer and playback speed.", min = 0)
+        self.sfx_voices = self.create_gvar("sfx_voices", 4,
+                                           "Maximum number of channels each sound effect plays " \
+                                           "on at once, unless set with set_sfx_limit().", min = 0)
         
-        # Create a list of timers. 
-        self.__timers = []
+        # Create a timer scheduler for each clock.
+        self.__timers = {
+            timer.CLOCK_WALL: timer.TimerScheduler(),
+            timer.CLOCK_GAME: timer.TimerScheduler()
+        }
+
+        # Create the asset preloader.
+        self.preloader = preload.Preloader(self)
+
+        # Create the sound effect pool.
+        self.__sfx = sound.SoundPool(self)
+
+        # The time of the engine, which is advanced by the frame time at the end of each frame,
+        # alongside the time of the game, which is only advanced whilst physics is enabled.
+        self.__time = 0.0
+        self.__gametime = 0.0
+
+        # The held keys as of the start of this frame, alongside the input recorder/reader.
+        self.__keys = None
+        self.__recorder: replay.ReplayRecorder = None
+        self.__reader: replay.ReplayReader = None
+        self.__seeds = []
         
         # Configure entities.
         self.__entity_head: entity.Entity = None
@@ -95,8 +160,23 @@ class LLEngine():
         # Declare a text element for the graphical FPS counter.
         self.__fps_counter: ui.Text = None
 
-        # Instantiate the physics engine.
+        # Declare the profiler, which is created once the engine is launched.
+        self.profiler: profiler.Profiler = None
+
+        # Declare the dirty-rect tracker, alongside where the frame was last presented.
+        self.__dirty: renderer.DirtyRects = None
+        self.__frame_rect: pygame.Rect = None
+
+        # Declare the origin displacement that the game's entities are drawn with, which
+        # is set by the game for culling, alongside the entities that are within view.
+        self.__view: pygame.math.Vector2 = None
+        self.__visible: set = None
+
+        # Instantiate the physics engine, alongside the accumulated frame time that has yet
+        # to be simulated when stepping at a fixed rate.
         self.__physics = entity.LLPhysics(self)
+        self.__physics_accumulator = 0.0
+        self.__physics_alpha = 1.0
         self.physics_enabled = True
 
         # Show that the engine has initialized.
@@ -168,23 +248,70 @@ class LLEngine():
                     self.console.warn(f"game variable \"{name}\" modification failed: \"{ex}\"")
         self.console.log("")
 
+        # Open the replay file for recording or replaying input.
+        if self.replay.get():
+            try:
+                self.__reader = replay.ReplayReader(self.replay.get())
+                self.console.log(f"Replaying input from \"{self.replay.get()}\".")
+            except (OSError, ValueError) as ex:
+                self.console.warn(f"could not open replay \"{self.replay.get()}\": \"{ex}\"")
+        elif self.record.get():
+            try:
+                self.__recorder = replay.ReplayRecorder(self.record.get(),
+                                                        len(pygame.key.get_pressed()))
+                self.console.log(f"Recording input to \"{self.record.get()}\".")
+            except OSError as ex:
+                self.console.warn(f"could not open replay \"{self.record.get()}\": \"{ex}\"")
+
+        # Create the profiler, now that the size of its ring buffer is known.
+        self.profiler = profiler.Profiler(self.profile_frames.get())
+        self.globals.phasetimes = self.profiler.phasetimes
+
         # Create a new screen for the window, and a background surface, which everything will be
         # blit onto.
         screen = pygame.display.set_mode((self.width.get(), self.height.get()), pygame.RESIZABLE)
         pygame.display.set_caption(self.__name)
         background = pygame.Surface((self.game_width.get(), self.game_height.get()))
 
+        # Track which regions of the background surface change between frames, for when
+        # dirty-rect rendering is enabled.
+        self.__dirty = renderer.DirtyRects(background.get_size())
+        dirty_rendering = False
+
+        # Create the render target that the background surface is scaled into, which is
+        # rebuilt whenever the window is resized.
+        target = renderer.RenderTarget(background)
+        target.resize(screen.get_size())
+
         # Main game loop: run the user-defined per-frame game code each frame.
         self.globals.fps = self.fps_max.get()
-        engine_start = time.perf_counter()
+        engine_start = self.get_time()
         try:
             while True:
                 # Timestamp for the beginning of this frame.
                 start = time.perf_counter()
                 
-                # Read the events queue to check for any new Pygame events.
+                # Read the events queue and the held keys. When replaying, the recorded
+                # input is used instead, with only the window events kept.
+                events = pygame.event.get()
+                if self.__reader:
+                    recorded = self.__reader.read_frame()
+                    if not recorded:
+                        self.console.log(f"Replay finished after {self.__reader.frames} frames.")
+                        break
+                    events = [event for event in events 
+                              if event.type in (pygame.QUIT, pygame.VIDEORESIZE)] + recorded.events
+                    self.__keys = recorded.keys
+                    self.__seeds = recorded.seeds
+                else:
+                    self.__keys = pygame.key.get_pressed()
+                    if self.__recorder:
+                        self.__recorder.record_keys(self.__keys)
+
+                # Check for any new Pygame events.
+                self.profiler.begin_frame(start)
                 quit = False
-                for event in pygame.event.get():
+                for event in events:
                     # Quit Pygame upon exit.
                     if event.type == pygame.QUIT:
                         pygame.quit()
@@ -199,9 +326,14 @@ class LLEngine():
                         if self.width.get() != event.w or self.height.get() != event.h:
                             screen = pygame.display.set_mode((self.width.get(), self.height.get()),
                                                              pygame.RESIZABLE)
+                        target.resize(screen.get_size())
+                        self.__frame_rect = None
                             
                     # Check if we are pressing a new key.
                     elif event.type == pygame.KEYDOWN:
+                        if self.__recorder:
+                            self.__recorder.record_event(event)
+
                         # Check if we are focused on a text element.
                         if self.focused():
                             # If this is the enter key, unfocus.
@@ -209,7 +341,7 @@ class LLEngine():
                                 self.unfocus_text(True)
                             else:
                                 # Configure the new held down key.
-                                self.__focused_timestamp = time.perf_counter()
+                                self.__focused_timestamp = self.get_time()
                                 self.__focused_keydown = (event.unicode, event.key)
                                 self.__manipulate_text()
 
@@ -218,6 +350,9 @@ class LLEngine():
 
                     # Check if we stopped pressing a key.
                     elif event.type == pygame.KEYUP:
+                        if self.__recorder:
+                            self.__recorder.record_event(event)
+
                         # Check if we are focused on a text element.
                         if self.focused() and event.key == self.__focused_keydown[1]:
                             self.__focused_timestamp = -1.0
@@ -232,95 +367,105 @@ class LLEngine():
                 # Manipulate the focused text buffer repeatedly if we are pressing a key
                 # and it has been >0.5s since we pressed said key.
                 if (self.__focused_timestamp > 0 
-                    and time.perf_counter() - self.__focused_timestamp > 0.5
-                    and time.perf_counter() - self.__focused_keyinterval > 0.025):
+                    and self.get_time() - self.__focused_timestamp > 0.5
+                    and self.get_time() - self.__focused_keyinterval > 0.025):
                     self.__manipulate_text()
-                    self.__focused_keyinterval = time.perf_counter()
+                    self.__focused_keyinterval = self.get_time()
+                self.profiler.mark("input")
 
                 # Call the game and physics engines' per-frame methods.
                 self.__game.per_frame()
+                self.profiler.mark("game")
                 if self.physics_enabled:
-                    self.__physics.per_frame()
+                    self.__step_physics()
+                self.profiler.mark("physics")
                 self.__game.post_physics()
-
-                # Invoke and clear any expired timers.
-                for timer in self.__timers:
-                    if timer.end < start:
-                        timer.func(*timer.args)
-                self.__timers[:] = [timer for timer in self.__timers if timer.end >= start]
-
-                # Clear the background surface prior to any drawing.
-                background.fill((0, 0, 0))
-
-                # Blit all background UI elements.
-                element = self.__background_head
-                while element:
-                    if element.enabled:
-                        element.invoke_event("draw", background)
-                    element = element.next
-
-                # Blit all entities.
-                entity = self.__entity_head
-                while entity:
-                    # If the entity is active, call some important events.
-                    if entity.active:
-                        # Call the per-frame and draw events.
-                        entity.invoke_event("per_frame")
-                        if entity.draw:
-                            entity.invoke_event("draw", background)
-
-                        # For debugging, draw all the grid cells that the entity is in.
-                        if entity.drawgrid:
-                            entity.draw_grid(background)
-
-                    # Go to the next entity.
-                    entity = entity.next
-
-                # Blit all foreground UI elements.
-                element = self.__element_head
-                while element:
-                    if element.enabled:
-                        element.invoke_event("draw", background)
-                    element = element.next
-
-                # Blit the FPS counter if it is configured.
-                if self.showfps.get() and self.__fps_counter:
-                    self.__fps_counter.invoke_event("draw", background)
-
-                # Scale the background surface onto the current resolution of the window.
-                scale = min(screen.get_width() / self.game_width.get(), 
-                            screen.get_height() / self.game_height.get())
-                frame = pygame.transform.scale_by(background, scale)
-                
-                # Manipulate the position of the frame surface.
-                frame_rect = frame.get_rect(center = screen.get_rect().center)
-                frame_rect = frame_rect.move(self.origin.x * scale, -self.origin.y * scale)
-
-                # Blit the frame onto the screen and update the rendered output.
-                screen.blit(frame, frame_rect)
-                pygame.display.update()
+                self.profiler.mark("post_physics")
+
+                # Invoke any expired timers.
+                self.__timers[timer.CLOCK_WALL].run(self.get_time())
+                self.__timers[timer.CLOCK_GAME].run(self.get_game_time())
+                self.preloader.update()
+                sound.update_voices()
+                self.profiler.mark("timers")
+
+                # If enabled, only redraw the regions of the background surface that changed.
+                # The whole surface is redrawn upon switching over to dirty-rect rendering.
+                if self.render_dirty.get():
+                    if not dirty_rendering:
+                        self.__dirty.invalidate()
+                    dirty_rendering = True
+                    dirty_regions = self.__draw_dirty(background)
+                else:
+                    dirty_rendering = False
+                    dirty_regions = None
+                    self.__draw(background)
+
+                # There is nothing to present when running headless.
+                if not self.headless:
+                    # Manipulate the position of the frame, which is the background surface
+                    # scaled onto the current resolution of the window.
+                    frame_rect = target.rect.move(self.origin.x * target.scale,
+                                                  -self.origin.y * target.scale)
+
+                    # If only the dirty regions were redrawn, only scale and update those
+                    # regions too, unless the window has been resized or the frame moved.
+                    if dirty_regions is not None and frame_rect == self.__frame_rect:
+                        updates = target.update_regions(dirty_regions)
+                        self.profiler.mark("scale")
+                        updates = [screen.blit(target.surface, rect.move(frame_rect.topleft), rect)
+                                   for rect in updates]
+                        if updates:
+                            pygame.display.update(updates)
+                    else:
+                        target.update()
+                        self.profiler.mark("scale")
+
+                        # Blit the frame onto the screen and update the rendered output.
+                        screen.blit(target.surface, frame_rect)
+                        pygame.display.update()
+                    self.__frame_rect = frame_rect
+                self.profiler.mark("present")
+                self.profiler.end_frame(self.globals.frames)
 
                 # Limit the framerate (if specified) and calculate the delta time and fps.
+                # When replaying, use the recorded frame time without waiting. When running
+                # headless, fast-forward by a fixed frame time instead.
                 end = 0
-                if not self.use_self_busywait.get():
-                    # Just call clock.tick() if using Pygame's Clock class.
-                    self.__clock.tick(self.fps_max.get())
-                    end = time.perf_counter()
+                if self.__reader:
+                    self.globals.frametime = recorded.frametime
+                elif self.headless:
+                    self.globals.frametime = self.headless_frametime.get()
                 else:
-                    # Busy-wait implementation (that unfortunately uses up the CPU)
-                    # by infinitely looping until the delta time matches our framerate.
-                    end = time.perf_counter()
-                    if self.fps_max.get() > 0:
-                        while (end - start) < (1 / self.fps_max.get()):
-                            end = time.perf_counter()
-                self.globals.frametime = end - start
+                    if not self.use_self_busywait.get():
+                        # Just call clock.tick() if using Pygame's Clock class.
+                        self.__clock.tick(self.fps_max.get())
+                        end = time.perf_counter()
+                    else:
+                        # Busy-wait implementation (that unfortunately uses up the CPU)
+                        # by infinitely looping until the delta time matches our framerate.
+                        end = time.perf_counter()
+                        if self.fps_max.get() > 0:
+                            while (end - start) < (1 / self.fps_max.get()):
+                                end = time.perf_counter()
+                    self.globals.frametime = end - start
+                if self.__recorder:
+                    self.__recorder.end_frame(self.globals.frametime)
+                self.__time += self.globals.frametime
+                if self.physics_enabled:
+                    self.__gametime += self.globals.frametime
                 self.globals.fps = pygame.math.lerp(self.globals.fps,
                                                     1 / self.globals.frametime,
                                                     min(max(self.globals.frametime * 2, 0), 1))
                 
                 # Bump the frames counter and calculate the time length.
                 self.globals.frames += 1
-                self.globals.time = time.perf_counter() - engine_start
+                self.globals.time = self.get_time() - engine_start
+
+                # Stop running headless once the requested number of frames have been run.
+                if (self.headless and self.headless_frames.get() > 0
+                    and self.globals.frames >= self.headless_frames.get()):
+                    break
 
                 # Display the FPS counter if showfps is toggled.
                 if self.showfps.get():
@@ -348,8 +493,36 @@ class LLEngine():
         # exception being re-thrown.
         finally:
             self.__game.atexit(exception_thrown)
+            if self.profile_dump.get() and self.profiler:
+                self.profiler.dump(self.console)
+            if self.__recorder:
+                self.__recorder.close()
+                self.console.log(f"Recorded {self.__recorder.frames} frames.")
             pygame.quit()
 
+    # Get the current time of the engine in seconds, which should be used by games in
+    # place of time.perf_counter(). This only advances at the end of each frame, so that
+    # it can be fast-forwarded when running headless and reproduced when replaying.
+    def get_time(self):
+        return self.__time
+
+    # Get the current time of the game in seconds, which is the same as the engine's time,
+    # except that it stops whilst the physics engine is disabled (i.e. the game is paused).
+    def get_game_time(self):
+        return self.__gametime
+
+    # Get a new seed for Python's RNG. These are recorded alongside the input, so that
+    # the same seeds are handed out when replaying.
+    def random_seed(self):
+        if self.__reader:
+            if self.__seeds:
+                return self.__seeds.pop(0)
+            self.console.warn("replay ran out of random seeds; it may desync.")
+        seed = time.perf_counter_ns()
+        if self.__recorder:
+            self.__recorder.record_seed(seed)
+        return seed
+
     # Create a new game variable.
     def create_gvar(self, name, value, description = "", flags = 0, min = None, max = None):
         # If it already exists, just return the existing one.
@@ -391,6 +564,13 @@ class LLEngine():
                 self.__entity_head = newEnt
             newEnt.next = before
             before.prev = newEnt
+
+            # Order the entity between its neighbours, renumbering the whole list if
+            # there is no room left between them.
+            lower = newEnt.prev.order if newEnt.prev else before.order - 1.0
+            newEnt.order = (lower + before.order) / 2
+            if not lower < newEnt.order < before.order:
+                self.__renumber_entities()
         else:
             # Insert the entity at the end of the linked list instead.
             newEnt.prev = self.__entity_tail
@@ -399,6 +579,7 @@ class LLEngine():
             if not self.__entity_head:
                 self.__entity_head = newEnt
             self.__entity_tail = newEnt
+            newEnt.order = newEnt.prev.order + 1.0 if newEnt.prev else 0.0
 
         # Return the entity.
         return newEnt
@@ -408,6 +589,10 @@ class LLEngine():
         ent.active = True
         ent.invoke_event("activated")
         self.__physics.insert_entity(ent)
+
+        # Always draw entities that are activated whilst the entities are being drawn.
+        if self.__visible is not None:
+            self.__visible.add(ent)
     
     # Initiate the sequence of deleting an entity.
     def delete_entity(self, ent):
@@ -421,9 +606,22 @@ class LLEngine():
         ent.movetype = entity.MOVETYPE_NONE
         self.create_timer(self.__delete_entity, 0, ent)
 
+    # Set the origin displacement that the game's entities are currently drawn with, so
+    # that static entities out of view aren't drawn. Set to None to draw every entity.
+    def set_view(self, origindisp):
+        self.__view = origindisp
+
     # Return the first entity instance in the engine.
     def entity_head(self):
         return self.__entity_head
+
+    # Notify the physics engine that an active entity's movetype has changed.
+    def entity_movetype_changed(self, ent):
+        self.__physics.update_movetype(ent)
+
+    # Notify the physics engine that an active static entity has moved.
+    def mark_entity_dirty(self, ent):
+        self.__physics.mark_dirty(ent)
     
     # Register a new element type by classname.
     def register_ui_classname(self, name, element_type):
@@ -504,9 +702,11 @@ class LLEngine():
         else:
             self.__focused_text.set_text(current + self.__focused_keydown[0])
 
-    # Get all held keys.
+    # Get all held keys, as of the start of this frame.
     def get_keys_dict(self):
-        return pygame.key.get_pressed()
+        if self.__keys is None:
+            return pygame.key.get_pressed()
+        return self.__keys
     
     # Create a new sound instance.
     def create_sound(self, path = None):
@@ -515,9 +715,43 @@ class LLEngine():
             snd.load(path)
         return snd
     
-    # Create a new timer, which will be handled by the engine.
-    def create_timer(self, func, length, *args):
-        self.__timers.append(Timer(func, time.perf_counter() + length, *args))
+    # Play a sound effect from the pool, without needing a sound instance. If the mixer has
+    # no free channels, the lowest priority sound effect with a priority of at most this
+    # one is stopped to make room, otherwise it isn't played.
+    def play_sfx(self, path, volume = 1.0, priority = 0):
+        return self.__sfx.play(path, volume, priority)
+
+    # Set the maximum number of channels a sound effect plays on at once. Beyond that,
+    # its oldest channel is restarted.
+    def set_sfx_limit(self, path, limit):
+        self.__sfx.set_limit(path, limit)
+
+    # Stream a music file from disk, optionally after an introduction which is played
+    # once. Only one piece of music plays at a time.
+    def play_music(self, path, intro = None, loop = True, volume = 1.0):
+        sound.play_music(self, path, intro, loop, volume)
+
+    # Stop streaming music.
+    def stop_music(self):
+        sound.stop_music()
+
+    # Is music streaming?
+    def music_playing(self):
+        return sound.music_playing()
+
+    # Create a new synthesizer voice, which plays a waveform (engine.WAVE_*) at a pitch (Hz)
+    # and volume once played.
+    def create_voice(self, wave = sound.WAVE_SQUARE, pitch = 440.0, volume = 0.5):
+        return sound.Voice(wave, pitch, volume)
+
+    # Create a new timer, which will be handled by the engine, and return a handle to it
+    # that can be cancelled. If repeat is set, the timer fires every length seconds until
+    # it is cancelled. Timers use the engine's time by default; timers using the game's
+    # time (CLOCK_GAME) do not run whilst the game is paused.
+    def create_timer(self, func, length, *args, repeat = False, clock = timer.CLOCK_WALL):
+        now = self.get_game_time() if clock == timer.CLOCK_GAME else self.get_time()
+        return self.__timers[clock].schedule(
+            timer.Timer(func, now + length, args, length if repeat else None, clock))
 
     # Clear all background elements.
     def clear_background_elements(self):
@@ -534,17 +768,20 @@ class LLEngine():
         # Nullify each entity's gridhashes array.
         ent = self.__entity_head
         while ent:
-            ent.gridhashes = dict()
+            ent.gridhashes = []
             ent = ent.next
 
-        # Reset the physics engine and this engine's entity list.
+        # Reset the physics engine and this engine's entity list, alongside the view.
         self.__physics.clear_entities()
         self.__entity_head = None
         self.__entity_tail = None
+        self.__view = None
 
     # For a given set of start/end points forming a rectangle, return all the 
-    # entities that are found within said rectangle.
-    def query_entities(self, start, end, include_nocollide = True):
+    # entities that are found within said rectangle. Entities can optionally be
+    # filtered by a collection of movetypes, or by whether they can be used.
+    def query_entities(self, start, end, include_nocollide = True, movetypes = None,
+                       usable_only = False):
         # First, create the rectangle for testing collision.
         diff = end - start
         hitbox = pygame.Rect(start.x, -start.y, diff.x, -diff.y)
@@ -552,21 +789,22 @@ class LLEngine():
         # Get a list of entities within the appropriate grid cells from the
         # physics engine, and check whether they overlap with the given
         # rectangle, and return it.
-        entities = self.__physics.query_entities(start, end, include_nocollide)
-        entities[:] = [ent for ent in entities if hitbox.colliderect(ent._baserect)]
-        return entities
+        entities = self.__physics.query_entities(start, end, include_nocollide, movetypes,
+                                                 usable_only)
+        return [ent for ent in entities if hitbox.colliderect(ent._baserect)]
     
     # Return all entities that are found within a given radius, i.e. return all entities
     # within a given circle.
-    def query_entities_in_radius(self, centre, radius, include_nocollide = True):
+    def query_entities_in_radius(self, centre, radius, include_nocollide = True, movetypes = None,
+                                 usable_only = False):
         # Get a list of entities within the appropriate grid cells from the
         # physics engine, and check whether they are within the given radius.
         entities = self.__physics.query_entities(centre + pygame.math.Vector2(-radius, radius), 
                                                  centre + pygame.math.Vector2(radius, -radius), 
-                                                 include_nocollide)
-        entities[:] = [ent for ent in entities 
-                       if ent.get_centre().distance_squared_to(centre) < radius ** 2]
-        return entities
+                                                 include_nocollide, movetypes, usable_only)
+        radius_squared = radius ** 2
+        return [ent for ent in entities 
+                if ent.get_centre().distance_squared_to(centre) < radius_squared]
     
     # Get the number of entities that currently exist.
     def count_entities(self, active = True):
@@ -577,11 +815,228 @@ class LLEngine():
                 count += 1
             ent = ent.next
         return count
+
+    # Count the number of entities that are moved by the physics engine.
+    def count_dynamic_entities(self):
+        return self.__physics.count_dynamic()
+
+    # Count the number of occupied cells in the physics engine's spatial hash grid.
+    def count_grid_cells(self):
+        return self.__physics.count_cells()
     
+    # Draw every UI element and entity onto the background surface.
+    def __draw(self, background):
+        # Clear the background surface prior to any drawing.
+        background.fill((0, 0, 0))
+
+        # Blit all background UI elements.
+        element = self.__background_head
+        while element:
+            if element.enabled:
+                element.invoke_event("draw", background)
+            element = element.next
+        self.profiler.mark("draw_background")
+
+        # If the physics engine is stepped at a fixed rate, draw each moving entity
+        # between its last two physics states.
+        fixed_physics = self.physics_hz.get() > 0
+        if fixed_physics:
+            self.__physics.interpolate(self.__physics_alpha)
+
+        # Blit all entities, culling the static entities that are out of view.
+        self.__run_entity_frames()
+        visible = self.__query_visible()
+        entity = self.__entity_head
+        while entity:
+            # If the entity is active, call its draw event.
+            if entity.active:
+                if entity.draw and (visible is None or entity.dynamic or entity in visible):
+                    entity.invoke_event("draw", background)
+
+                # For debugging, draw all the grid cells that the entity is in.
+                if entity.drawgrid:
+                    entity.draw_grid(background)
+
+            # Go to the next entity.
+            entity = entity.next
+
+        # Restore the actual positions of the interpolated entities.
+        if fixed_physics:
+            self.__physics.interpolate(1.0)
+        self.__visible = None
+        self.profiler.mark("draw_entities")
+
+        # Blit all foreground UI elements.
+        element = self.__element_head
+        while element:
+            if element.enabled:
+                element.invoke_event("draw", background)
+            element = element.next
+
+        # Blit the FPS counter if it is configured.
+        if self.showfps.get() and self.__fps_counter:
+            self.__fps_counter.invoke_event("draw", background)
+
+        # Blit the profiler's frame time graph if it is configured.
+        if self.profile_graph.get():
+            self.profiler.draw(background)
+        self.profiler.mark("draw_foreground")
+
+    # Call the per-frame events of all active entities. This is done before any entity
+    # is drawn or tracked, as they may move each other around.
+    def __run_entity_frames(self):
+        entity = self.__entity_head
+        while entity:
+            if entity.active:
+                entity.invoke_event("per_frame")
+            entity = entity.next
+
+    # Return the set of entities within view, plus a margin, by querying the physics
+    # engine's spatial hash grid. Returns None if culling is disabled, or if the game
+    # hasn't set the view. As dynamic entities can move without updating the grid until
+    # the next physics step, only static entities should be culled.
+    def __query_visible(self):
+        if self.__view is None or not self.cull_entities.get():
+            return None
+        self.__physics.flush()
+        margin = self.cull_margin.get()
+        left = -self.__view.x - margin
+        top = -self.__view.y + margin
+        self.__visible = set(self.__physics.query_entities(
+            pygame.math.Vector2(left, top),
+            pygame.math.Vector2(left + self.game_width.get() + margin * 2,
+                                top - self.game_height.get() - margin * 2)))
+        return self.__visible
+
+    # Only redraw the regions of the background surface that changed since the previous
+    # frame, and return those regions. Everything that is drawn is tracked by its rect and
+    # render state first, and then each layer is redrawn within the dirty regions only.
+    def __draw_dirty(self, background):
+        # Track all background UI elements.
+        dirty = self.__dirty
+        backgrounds = []
+        element = self.__background_head
+        while element:
+            if element.enabled:
+                dirty.track(element, element._rect, element.get_render_state())
+                backgrounds.append(element)
+            element = element.next
+
+        # If the physics engine is stepped at a fixed rate, draw each moving entity
+        # between its last two physics states.
+        fixed_physics = self.physics_hz.get() > 0
+        if fixed_physics:
+            self.__physics.interpolate(self.__physics_alpha)
+
+        # Track all active entities, culling the static entities that are out of view.
+        # The debug grid isn't tracked, so redraw everything whilst it is being drawn.
+        self.__run_entity_frames()
+        visible = self.__query_visible()
+        self.__visible = None
+        entities = []
+        entity = self.__entity_head
+        while entity:
+            if entity.active:
+                if entity.draw and (visible is None or entity.dynamic or entity in visible):
+                    dirty.track(entity, entity._absrect, entity.get_render_state())
+                    entities.append(entity)
+                if entity.drawgrid:
+                    dirty.invalidate()
+            entity = entity.next
+
+        # Track all foreground UI elements, the FPS counter and the profiler's frame time
+        # graph, which is redrawn every frame.
+        foregrounds = []
+        element = self.__element_head
+        while element:
+            if element.enabled:
+                dirty.track(element, element._rect, element.get_render_state())
+                foregrounds.append(element)
+            element = element.next
+        if self.showfps.get() and self.__fps_counter:
+            counter = self.__fps_counter
+            dirty.track(counter, counter._rect, counter.get_render_state())
+            foregrounds.append(counter)
+        if self.profile_graph.get():
+            dirty.track(self.profiler, self.profiler.get_rect(background), self.globals.frames)
+        regions = dirty.collect()
+
+        # Clear the dirty regions and blit the background UI elements within them. Dirty
+        # regions never overlap, so each layer can be drawn across all of them at once.
+        for region in regions:
+            background.set_clip(region)
+            background.fill((0, 0, 0))
+            for i in region.collidelistall([element._rect for element in backgrounds]):
+                backgrounds[i].invoke_event("draw", background)
+        self.profiler.mark("draw_background")
+
+        # Blit the entities within the dirty regions.
+        rects = [entity._absrect for entity in entities]
+        for region in regions:
+            background.set_clip(region)
+            for i in region.collidelistall(rects):
+                entities[i].invoke_event("draw", background)
+            for entity in entities:
+                if entity.drawgrid:
+                    entity.draw_grid(background)
+
+        # Restore the actual positions of the interpolated entities.
+        if fixed_physics:
+            self.__physics.interpolate(1.0)
+        self.profiler.mark("draw_entities")
+
+        # Blit the foreground UI elements and the frame time graph within the dirty regions.
+        rects = [element._rect for element in foregrounds]
+        for region in regions:
+            background.set_clip(region)
+            for i in region.collidelistall(rects):
+                foregrounds[i].invoke_event("draw", background)
+            if self.profile_graph.get():
+                self.profiler.draw(background)
+        background.set_clip(None)
+        self.profiler.mark("draw_foreground")
+        return regions
+
+    # Step the physics engine. If physics_hz is set, the frame time is accumulated and the
+    # physics engine is stepped at a fixed rate for as many times as the accumulated time
+    # allows for, capped by physics_maxsteps. Otherwise, it's stepped once per frame.
+    def __step_physics(self):
+        # Step the physics engine with the frame time if there is no fixed rate.
+        if self.physics_hz.get() <= 0:
+            self.__physics.per_frame()
+            self.__physics_accumulator = 0.0
+            self.__physics_alpha = 1.0
+            return
+
+        # Run as many fixed steps as the accumulated time allows for.
+        step = 1 / self.physics_hz.get()
+        self.__physics_accumulator += self.globals.frametime
+        steps = 0
+        while self.__physics_accumulator >= step and steps < self.physics_maxsteps.get():
+            self.__physics.snapshot()
+            self.__physics.per_frame(step)
+            self.__physics_accumulator -= step
+            steps += 1
+
+        # If the physics engine can't keep up, drop the time that couldn't be simulated
+        # rather than spiralling further behind.
+        self.__physics_accumulator %= step
+        self.__physics_alpha = self.__physics_accumulator / step
+
+    # Renumber the order of every entity along the entity linked list.
+    def __renumber_entities(self):
+        order = 0.0
+        ent = self.__entity_head
+        while ent:
+            ent.order = order
+            order += 1.0
+            ent = ent.next
+
     # Delete an entity from the engine, thus unlinking it from the entity linked list.
     def __delete_entity(self, ent):
-        # Remove the entity from the physics engine's grid.
+        # Remove the entity from the physics engine and deactivate it.
         self.__physics.remove_entity(ent)
+        ent.active = False
 
         # Unlink the entity from the entity linked list and delete it.
         if not ent.prev:
@@ -0,0 +1,108 @@
+"""Preloading of assets on a worker thread, so that images and sounds don't have to be
+read from disk and decoded whilst the game is being played.
+
+Assets are decoded on the worker thread, and then handed over to the engine's caches
+on the main thread, as images can only be converted for the display there. Assets that
+fail to load are skipped, and are instead loaded (and warned about) as per usual once
+they are used."""
+
+import os
+import queue
+import threading
+import pygame
+
+from .entity import atlas
+from .ui import image
+from . import sound
+
+# Asset types, by file extension.
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+SOUND_EXTENSIONS = (".ogg", ".wav", ".mp3", ".flac")
+
+# Loads assets on a worker thread, and hands them over to the engine's caches.
+class Preloader():
+    # Construct a new preloader.
+    def __init__(self, engine):
+        self.__engine = engine
+        self.__requests = queue.Queue()
+        self.__results = queue.Queue()
+        self.__pending = set()
+        self.__thread = None
+
+    # Queue assets to be preloaded, skipping any that are already cached or queued.
+    def preload(self, paths):
+        for path in paths:
+            abspath = os.path.abspath(path)
+            if abspath in self.__pending or is_cached(abspath):
+                continue
+            self.__pending.add(abspath)
+            self.__requests.put(abspath)
+
+        # Start the worker thread if it isn't running yet.
+        if self.__pending and not self.__thread:
+            self.__thread = threading.Thread(target = self.__work, name = "Preloader", daemon = True)
+            self.__thread.start()
+
+    # Return the number of assets that are still being preloaded.
+    def pending(self):
+        return len(self.__pending)
+
+    # Hand any assets that have been loaded since the last call over to the caches. This
+    # is called by the engine once per frame.
+    def update(self):
+        while self.__pending:
+            try:
+                self.__install(*self.__results.get_nowait())
+            except queue.Empty:
+                return
+
+    # Wait for every queued asset to be loaded, and hand them over to the caches.
+    def wait(self):
+        if self.__pending:
+            self.__engine.console.log(f"Waiting for {len(self.__pending)} assets to preload.")
+        while self.__pending:
+            self.__install(*self.__results.get())
+
+    # Hand a loaded asset over to its cache. Images are shared between the tile sheet
+    # and image caches, since both hold converted images by their absolute path.
+    def __install(self, abspath, asset):
+        self.__pending.discard(abspath)
+        if isinstance(asset, pygame.Surface):
+            try:
+                asset = asset.convert_alpha()
+            except pygame.error:
+                return
+            atlas.cached_sheets.setdefault(abspath, asset)
+            image.cached_images.setdefault(abspath, asset)
+        elif asset is not None:
+            sound.cached_sounds.setdefault(abspath, asset)
+
+    # The worker thread, which decodes each queued asset. Any failure is handed over as
+    # a missing asset rather than ending the thread, as wait() relies on every queued
+    # asset getting a result.
+    def __work(self):
+        while True:
+            abspath = self.__requests.get()
+            try:
+                asset = decode_asset(abspath)
+            except Exception:
+                asset = None
+            self.__results.put((abspath, asset))
+
+# Check whether an asset is already cached.
+def is_cached(abspath):
+    return (abspath in atlas.cached_sheets or abspath in image.cached_images 
+            or abspath in sound.cached_sounds)
+
+# Decode an asset from disk, without converting it for the display. Images are returned
+# as surfaces, and sounds as sample buffers. Returns None for any other type of asset.
+def decode_asset(abspath):
+    extension = os.path.splitext(abspath)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return pygame.image.load(abspath)
+    if extension in SOUND_EXTENSIONS:
+        return pygame.sndarray.array(pygame.mixer.Sound(abspath))
+    return None
+
+# Define what should be imported from this module.
+__all__ = ["Preloader", "is_cached", "decode_asset"]
\ No newline at end of file
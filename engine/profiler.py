@@ -0,0 +1,179 @@
+"""A per-frame profiler, which times each phase of the engine's main loop.
+
+The timings of the last few frames are kept in a ring buffer, which can be drawn as a
+frame time graph, or summarized into percentiles."""
+
+import time
+import numpy
+import pygame
+
+# Phases of the main loop, in the order they are run in.
+PHASES = ["input", "game", "physics", "post_physics", "timers",
+          "draw_background", "draw_entities", "draw_foreground", "scale", "present"]
+
+# The colour of each phase in the frame time graph.
+PHASE_COLOURS = {
+    "input":            pygame.Color(128, 128, 128),
+    "game":             pygame.Color(66, 135, 245),
+    "physics":          pygame.Color(235, 64, 52),
+    "post_physics":     pygame.Color(245, 166, 35),
+    "timers":           pygame.Color(171, 71, 188),
+    "draw_background":  pygame.Color(38, 166, 154),
+    "draw_entities":    pygame.Color(102, 187, 106),
+    "draw_foreground":  pygame.Color(212, 225, 87),
+    "scale":            pygame.Color(236, 64, 122),
+    "present":          pygame.Color(255, 255, 255),
+}
+
+# Frame time graph properties.
+GRAPH_WIDTH     = 240           # Width of the graph in pixels, where each frame is one pixel wide.
+GRAPH_HEIGHT    = 100           # Height of the graph in pixels.
+GRAPH_RANGE     = 2 / 60        # Frame time at the top of the graph (s).
+GRAPH_TARGET    = 1 / 60        # Frame time to mark with a line (s).
+
+# The profiler class.
+class Profiler():
+    # Construct a new profiler, with a ring buffer of a given number of frames.
+    def __init__(self, frames):
+        # The timings of the current frame, and the time of the last mark.
+        self.phasetimes = dict.fromkeys(PHASES, 0.0)
+        self.__last = 0.0
+
+        # The ring buffer of frame timings, alongside the frame number of each entry.
+        self.__samples = numpy.zeros((frames, len(PHASES)))
+        self.__frames = numpy.zeros(frames, dtype=numpy.int64)
+        self.__index = 0
+        self.__count = 0
+
+        # The frame time graph, which is scrolled along by a pixel each frame.
+        self.__graph: pygame.Surface = None
+        self.__legend: pygame.Surface = None
+
+    # Start timing a new frame.
+    def begin_frame(self, start):
+        self.__last = start
+
+    # Mark the end of a phase, which is timed from the end of the previous phase.
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phasetimes[phase] = now - self.__last
+        self.__last = now
+
+    # Push the timings of the current frame into the ring buffer.
+    def end_frame(self, frame):
+        phasetimes = self.phasetimes
+        self.__samples[self.__index] = [phasetimes[phase] for phase in PHASES]
+        self.__frames[self.__index] = frame
+        self.__index = (self.__index + 1) % len(self.__samples)
+        self.__count = min(self.__count + 1, len(self.__samples))
+
+        # Draw this frame onto the graph, if it is being shown.
+        if self.__graph:
+            self.__draw_column()
+
+    # Return the timings in the ring buffer from oldest to newest, as an array of
+    # shape (frames, phases), alongside the frame numbers.
+    def get_samples(self):
+        if self.__count < len(self.__samples):
+            return self.__samples[:self.__count], self.__frames[:self.__count]
+        return (numpy.roll(self.__samples, -self.__index, axis=0),
+                numpy.roll(self.__frames, -self.__index))
+
+    # Return the given percentiles of each phase and the whole frame (s), over the
+    # frames in the ring buffer.
+    def percentiles(self, percentiles = (50, 95, 99)):
+        samples = self.get_samples()[0]
+        if not len(samples):
+            return {}
+        stats = numpy.percentile(samples, percentiles, axis=0)
+        result = {phase: list(stats[:, i]) for i, phase in enumerate(PHASES)}
+        result["frame"] = list(numpy.percentile(samples.sum(axis=1), percentiles))
+        return result
+
+    # Write the percentiles of each phase to a logger, alongside the slowest frames and
+    # the phase that took the longest in each of them.
+    def dump(self, console, spikes = 5):
+        # Write the percentiles.
+        samples, frames = self.get_samples()
+        if not len(samples):
+            return
+        console.log(f"Profiler: last {len(samples)} frames (ms)")
+        console.log(f"{'phase':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        stats = self.percentiles()
+        maxima = dict(zip(PHASES, samples.max(axis=0)))
+        maxima["frame"] = samples.sum(axis=1).max()
+        for phase, (p50, p95, p99) in stats.items():
+            console.log(f"{phase:<16}{p50 * 1000:>9.3f}{p95 * 1000:>9.3f}{p99 * 1000:>9.3f}" \
+                        f"{maxima[phase] * 1000:>9.3f}")
+
+        # Write the slowest frames.
+        totals = samples.sum(axis=1)
+        for i in numpy.argsort(totals)[::-1][:spikes]:
+            worst = numpy.argmax(samples[i])
+            console.log(f"Profiler: frame {frames[i]} took {totals[i] * 1000:.3f} ms, " \
+                        f"{samples[i][worst] * 1000:.3f} ms of which was {PHASES[worst]}")
+
+    # Draw the frame time graph onto a surface, in the bottom-left corner.
+    def draw(self, surface):
+        # Create the graph and its legend if they don't exist yet.
+        if not self.__graph:
+            self.__create_graph()
+
+        # Blit the graph, with the legend on top.
+        top = surface.get_height() - GRAPH_HEIGHT - 10
+        surface.blit(self.__graph, (10, top))
+        surface.blit(self.__legend, (10, top - self.__legend.get_height()))
+
+    # Get the area of a surface that the frame time graph and its legend are drawn onto.
+    def get_rect(self, surface):
+        if not self.__graph:
+            self.__create_graph()
+        height = GRAPH_HEIGHT + self.__legend.get_height()
+        return pygame.Rect(10, surface.get_height() - height - 10, GRAPH_WIDTH, height)
+
+    # Create the frame time graph surface and the legend.
+    def __create_graph(self):
+        # Create the graph, and fill it in with the frames that are already recorded.
+        self.__graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT), pygame.SRCALPHA)
+        self.__graph.fill((0, 0, 0, 160))
+        for row in self.get_samples()[0][-GRAPH_WIDTH:]:
+            self.__draw_column(row)
+
+        # Render the name of each phase in its colour.
+        font = pygame.font.Font(pygame.font.get_default_font(), 9)
+        labels = [font.render(phase, True, PHASE_COLOURS[phase]) for phase in PHASES]
+        columns = 2
+        width = GRAPH_WIDTH // columns
+        self.__legend = pygame.Surface(
+            (GRAPH_WIDTH, ((len(labels) + columns - 1) // columns) * font.get_linesize()),
+            pygame.SRCALPHA)
+        self.__legend.fill((0, 0, 0, 160))
+        for i, label in enumerate(labels):
+            self.__legend.blit(label, ((i % columns) * width + 2, (i // columns) * font.get_linesize()))
+
+    # Scroll the graph along by a pixel and draw a frame onto its rightmost column, with
+    # each phase stacked on top of each other.
+    def __draw_column(self, row = None):
+        # Scroll the graph and clear the rightmost column.
+        if row is None:
+            row = self.__samples[self.__index - 1]
+        graph = self.__graph
+        graph.scroll(-1, 0)
+        x = GRAPH_WIDTH - 1
+        graph.fill((0, 0, 0, 160), (x, 0, 1, GRAPH_HEIGHT))
+
+        # Stack each phase from the bottom up.
+        bottom = GRAPH_HEIGHT
+        for phase, length in zip(PHASES, row):
+            height = length / GRAPH_RANGE * GRAPH_HEIGHT
+            top = max(bottom - height, 0)
+            if round(bottom) > round(top):
+                graph.fill(PHASE_COLOURS[phase], (x, round(top), 1, round(bottom) - round(top)))
+            bottom = top
+
+        # Mark the target frame time.
+        graph.set_at((x, round(GRAPH_HEIGHT - GRAPH_TARGET / GRAPH_RANGE * GRAPH_HEIGHT)),
+                     (255, 0, 0))
+
+# Define what should be imported from this module.
+__all__ = ["Profiler", "PHASES"]
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""Rendering helpers for the engine's main loop.
+
+DirtyRects tracks which regions of the background surface changed since the previous
+frame, so that only those have to be redrawn and presented. Each frame, the rect and
+render state of every drawn entity and UI element is compared against the previous
+frame. Entities and elements are assumed to only draw within their rect, and to bump
+their render state whenever their appearance changes.
+
+RenderTarget holds the background surface scaled up to the size of the window, which
+is allocated once per window size and scaled into in place."""
+
+import math
+import pygame
+
+# Macros.
+MAX_DIRTY_RECTS     = 16    # Beyond this many dirty rects, they are merged into one.
+MAX_DIRTY_COVERAGE  = 0.5   # Beyond this fraction of the surface, the whole surface is redrawn.
+
+# Tracks the dirty regions of a surface between frames.
+class DirtyRects():
+    # Construct a new dirty rect tracker for a surface of the given size.
+    def __init__(self, size):
+        self.__bounds = pygame.Rect((0, 0), size)
+        self.__states = dict()
+        self.__previous = dict()
+        self.__rects = []
+        self.__full = True
+
+    # Force the whole surface to be redrawn on the next frame.
+    def invalidate(self):
+        self.__full = True
+
+    # Mark a region of the surface as dirty.
+    def mark(self, rect):
+        self.__rects.append(pygame.Rect(rect))
+
+    # Track an entity or UI element that is being drawn this frame, given its rect and
+    # render state. If either changed since the previous frame, both its old and new
+    # rects are marked as dirty.
+    def track(self, obj, rect, state):
+        current = (rect.x, rect.y, rect.w, rect.h, state)
+        self.__states[obj] = current
+        previous = self.__previous.pop(obj, None)
+        if previous != current:
+            self.__rects.append(pygame.Rect(current[:4]))
+            if previous:
+                self.__rects.append(pygame.Rect(previous[:4]))
+
+    # Finish tracking this frame, and return the list of dirty rects that need to be
+    # redrawn, which is empty if nothing changed.
+    def collect(self):
+        # Anything that was drawn on the previous frame but not this frame is dirty.
+        rects = self.__rects
+        for previous in self.__previous.values():
+            rects.append(pygame.Rect(previous[:4]))
+        self.__previous = self.__states
+        self.__states = dict()
+        self.__rects = []
+
+        # Redraw the whole surface if requested.
+        bounds = self.__bounds
+        if self.__full:
+            self.__full = False
+            return [bounds.copy()]
+
+        # Clip each rect to the surface, and merge any overlapping rects together.
+        merged = []
+        for rect in rects:
+            rect = rect.clip(bounds)
+            if not rect.w or not rect.h:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+
+        # If there are too many rects, or they cover most of the surface, merge them into
+        # a single rect.
+        if len(merged) > MAX_DIRTY_RECTS:
+            merged = [merged[0].unionall(merged[1:])]
+        if sum(rect.w * rect.h for rect in merged) > bounds.w * bounds.h * MAX_DIRTY_COVERAGE:
+            merged = [bounds.copy()]
+        return merged
+
+# The background surface scaled onto the window, centred and keeping its aspect ratio.
+class RenderTarget():
+    # Construct a new render target for a source surface.
+    def __init__(self, source):
+        self.__source = source
+        self.surface = source
+        self.rect = source.get_rect()
+        self.scale = 1.0
+
+    # Rebuild the render target for a new window size.
+    def resize(self, size):
+        source = self.__source
+        self.scale = min(size[0] / source.get_width(), size[1] / source.get_height())
+        self.rect = pygame.Rect(0, 0, int(source.get_width() * self.scale),
+                                int(source.get_height() * self.scale))
+        self.rect.center = (size[0] // 2, size[1] // 2)
+
+        # If the source surface isn't scaled at all, it's blit onto the window directly.
+        # Otherwise, allocate a surface with the same format to scale into.
+        if self.rect.size == source.get_size():
+            self.surface = source
+        elif self.surface is source or self.surface.get_size() != self.rect.size:
+            self.surface = pygame.Surface(self.rect.size, 0, source)
+
+    # Scale the whole source surface into the render target.
+    def update(self):
+        if self.surface is not self.__source:
+            pygame.transform.scale(self.__source, self.rect.size, self.surface)
+
+    # Scale the given regions of the source surface into the render target, and return
+    # the regions of the render target that changed.
+    def update_regions(self, regions):
+        if self.surface is self.__source:
+            return regions
+        source = self.__source
+        scale_x = self.rect.w / source.get_width()
+        scale_y = self.rect.h / source.get_height()
+        bounds = self.surface.get_rect()
+        updates = []
+        for region in regions:
+            # Round outwards, so that neighbouring regions don't leave gaps between them.
+            left, top = math.floor(region.left * scale_x), math.floor(region.top * scale_y)
+            right, bottom = math.ceil(region.right * scale_x), math.ceil(region.bottom * scale_y)
+            rect = pygame.Rect(left, top, right - left, bottom - top).clip(bounds)
+            if rect.w and rect.h:
+                pygame.transform.scale(source.subsurface(region), rect.size,
+                                       self.surface.subsurface(rect))
+                updates.append(rect)
+        return updates
+
+# Define what should be imported from this module.
+__all__ = ["DirtyRects", "RenderTarget"]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Input recording and replaying, so that a play session can be reproduced exactly.
+
+A replay file is a small header followed by one record per frame. Each record holds
+the frame time, the held keys (only when they changed since the last frame), the
+keydown/keyup events and any random seeds that were handed out during the frame."""
+
+import struct
+import pygame
+
+# Replay file format.
+REPLAY_MAGIC    = b"LLRP"
+REPLAY_VERSION  = 1
+KEYS_UNCHANGED  = 0xFFFF # Written in place of the key count if no keys changed.
+
+# Structures used in a replay file.
+HEADER      = struct.Struct("<4sHH")   # Magic, version, size of the key state.
+FRAME       = struct.Struct("<dHHH")   # Frame time, key count, event count, seed count.
+SCANCODE    = struct.Struct("<H")      # Held key, as a scancode.
+EVENT       = struct.Struct("<BiB")    # Event type, key, length of the unicode string.
+SEED        = struct.Struct("<Q")      # Random seed.
+
+# Event types.
+EVENT_KEYDOWN   = 0
+EVENT_KEYUP     = 1
+
+# A single frame read back from a replay file.
+class ReplayFrame():
+    def __init__(self, frametime, keys, events, seeds):
+        self.frametime = frametime
+        self.keys = keys
+        self.events = events
+        self.seeds = seeds
+
+# Writes the input of each frame into a replay file.
+class ReplayRecorder():
+    # Open a new replay file for writing.
+    def __init__(self, path, numkeys):
+        self.__file = open(path, "wb")
+        self.__file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, numkeys))
+        self.__held = None
+        self.__keys = None
+        self.__events = []
+        self.__seeds = []
+        self.frames = 0
+
+    # Record the held keys at the start of a frame.
+    def record_keys(self, keys):
+        held = [scancode for scancode, pressed in enumerate(keys) if pressed]
+        self.__keys = None if held == self.__held else held
+        self.__held = held
+
+    # Record a keydown/keyup event.
+    def record_event(self, event):
+        type = EVENT_KEYDOWN if event.type == pygame.KEYDOWN else EVENT_KEYUP
+        self.__events.append((type, event.key, event.unicode.encode("utf-8")[:255]))
+
+    # Record a random seed handed out during this frame.
+    def record_seed(self, seed):
+        self.__seeds.append(seed & 0xFFFFFFFFFFFFFFFF)
+
+    # Write the recorded frame into the replay file.
+    def end_frame(self, frametime):
+        # Write the frame header.
+        keycount = KEYS_UNCHANGED if self.__keys is None else len(self.__keys)
+        data = [FRAME.pack(frametime, keycount, len(self.__events), len(self.__seeds))]
+
+        # Write the held keys, events and seeds.
+        if self.__keys is not None:
+            data += [SCANCODE.pack(scancode) for scancode in self.__keys]
+        for type, key, unicode in self.__events:
+            data.append(EVENT.pack(type, key, len(unicode)))
+            data.append(unicode)
+        data += [SEED.pack(seed) for seed in self.__seeds]
+        self.__file.write(b"".join(data))
+
+        # Reset the frame.
+        self.__keys = None
+        self.__events.clear()
+        self.__seeds.clear()
+        self.frames += 1
+
+    # Close the replay file.
+    def close(self):
+        self.__file.close()
+
+# Reads the input of each frame back from a replay file.
+class ReplayReader():
+    # Open a replay file for reading. Raises a ValueError if the file is not a replay.
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.__data = file.read()
+        if len(self.__data) < HEADER.size:
+            raise ValueError("file is too short")
+        magic, version, self.__numkeys = HEADER.unpack_from(self.__data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("file is not a replay")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        self.__offset = HEADER.size
+        self.__keys = pygame.key.ScancodeWrapper((False,) * self.__numkeys)
+        self.frames = 0
+
+    # Read the next frame, or return None at the end of the replay.
+    def read_frame(self):
+        # Check if there are any frames left.
+        data = self.__data
+        if self.__offset + FRAME.size > len(data):
+            return None
+        frametime, keycount, eventcount, seedcount = FRAME.unpack_from(data, self.__offset)
+        self.__offset += FRAME.size
+
+        # Rebuild the held keys if they changed.
+        if keycount != KEYS_UNCHANGED:
+            held = [False] * self.__numkeys
+            for _ in range(keycount):
+                held[SCANCODE.unpack_from(data, self.__offset)[0]] = True
+                self.__offset += SCANCODE.size
+            self.__keys = pygame.key.ScancodeWrapper(held)
+
+        # Rebuild the keydown/keyup events.
+        events = []
+        for _ in range(eventcount):
+            type, key, length = EVENT.unpack_from(data, self.__offset)
+            self.__offset += EVENT.size
+            unicode = data[self.__offset:self.__offset + length].decode("utf-8", "replace")
+            self.__offset += length
+            events.append(pygame.event.Event(pygame.KEYDOWN if type == EVENT_KEYDOWN
+                                             else pygame.KEYUP, key=key, unicode=unicode))
+
+        # Read the seeds.
+        seeds = []
+        for _ in range(seedcount):
+            seeds.append(SEED.unpack_from(data, self.__offset)[0])
+            self.__offset += SEED.size
+        self.frames += 1
+        return ReplayFrame(frametime, self.__keys, events, seeds)
+
+# Define what should be imported from this module.
+__all__ = ["ReplayRecorder", "ReplayReader", "ReplayFrame"]
\ No newline at end of file
@@ -1,12 +1,47 @@
-"""A basic module for creating audio instances."""
+"""A basic module for creating audio instances.
+
+Mixer sounds are built once for each sample buffer and playback speed, and then shared
+between every sound instance playing them, keeping only the most recently played up to
+the engine's sound_playbacks. Each sound instance controls the channel it is playing on,
+rather than the shared mixer sound.
+
+Synthesizer voices generate a waveform at a given pitch and volume in short chunks,
+which are queued onto their channel as the previous chunk plays, so that the pitch can
+be changed at any time without restarting or re-allocating the whole sound.
+
+Sound effects are played by path through a pool, so that sprites don't need to own a
+sound instance for each of them. Each sound effect plays on a limited number of channels
+at once, stealing its own oldest channel beyond that, and once the mixer runs out of
+channels the lowest priority sound effect is stolen instead.
+
+Music is streamed from disk through the mixer's music channel rather than decoded into
+a sample buffer, so that memory use doesn't grow with the length of the soundtrack. An
+introduction can be played first, with the looping part queued to follow it seamlessly."""
 
 import os
+import collections
 import pygame
 import numpy
 
 # Cached sound information.
 cached_sounds = dict()
 
+# Cached mixer sounds for each buffer and playback speed, from the least to the most
+# recently played.
+cached_playbacks = collections.OrderedDict()
+
+# Synthesizer waveforms.
+WAVE_SINE   = 0
+WAVE_SQUARE = 1
+
+# Synthesizer properties.
+SYNTH_CHUNK_LENGTH  = 0.05  # Length of each chunk queued onto a voice's channel (s).
+SYNTH_AMPLITUDE     = 10000 # Amplitude of the fundamental harmonic.
+SYNTH_HARMONICS     = 19    # Highest harmonic of a square wave, which is band-limited.
+
+# Synthesizer voices that are currently playing.
+active_voices = set()
+
 # The root sound class.
 class Sound():
     # Loaded sound information.
@@ -23,39 +58,20 @@ class Sound():
         # Track whether this sound instance loops or not.
         self.__looping = False
         
-        # Hold a buffer of all the audio samples and the internal
-        # sound instance.
+        # Hold a buffer of all the audio samples, the internal sound
+        # instance and the channel it is playing on.
         self.buffer = None
         self.__sound = None
+        self.__channel = None
 
         # Bind the engine instance to this sound instance.
         self.__engine = engine
 
     # Load an existing sound file.
     def load(self, path):
-        # Fallback function, should the sound file be invalid.
-        def fallback():
-            nonlocal self, path
-            self.__engine.console.warn(f"sound path \"{path}\" is invalid")
-            self.buffer = self.__sound = None
-            
-        # Check whether the sound buffer is already cached.
-        abspath = os.path.abspath(path)
-        if abspath in cached_sounds:
-            self.buffer = cached_sounds[abspath]
-        else:
-            # Check if the path for the sheet exists.
-            if not os.path.isfile(path):
-                fallback()
-                return
-            
-            # Attempt to load the audio file.
-            try:
-                sound = pygame.mixer.Sound(abspath)
-                self.buffer = cached_sounds[abspath] = pygame.sndarray.array(sound)
-            except pygame.error:
-                fallback()
-                return
+        self.buffer = load_buffer(self.__engine, path)
+        if self.buffer is None:
+            self.__sound = None
             
     # Check if this sound file has loaded.
     def loaded(self):
@@ -67,17 +83,11 @@ class Sound():
         if not self.loaded() or self.playing():
             return
         
-        # If the playback speed is any value besides 1, copy the sound buffer
-        # and remove/duplicate samples accordingly.
-        buffer = self.buffer
-        if self.speed != 1.0:
-            indices = numpy.arange(0, len(buffer), self.speed).astype(int)
-            buffer = buffer[indices[indices < len(buffer)]]
-
-        # Create the sound instance.
-        self.__sound = pygame.mixer.Sound(buffer)
-        self.__sound.set_volume(self.volume)
-        self.__sound.play(-1 if loop else 0)
+        # Play the shared sound instance for this buffer and speed.
+        self.__sound = get_playback(self.__engine, self.buffer, self.speed)
+        self.__channel = self.__sound.play(-1 if loop else 0)
+        if self.__channel:
+            self.__channel.set_volume(self.volume)
         
         # Set whether this sound instance is looping or not.
         self.__looping = loop
@@ -89,8 +99,8 @@ class Sound():
             return
         
         # Stop playing.
-        self.__sound.stop()
-        self.__sound = None
+        self.__channel.stop()
+        self.__sound = self.__channel = None
         self.__looping = False
 
     # Repeat this sound file.
@@ -100,13 +110,14 @@ class Sound():
 
     # Is this sound file playing?
     def playing(self):
-        # If the sound instance is valid, return true if it is playing,
-        # otherwise remove it if it is not playing in any channels.
+        # If the sound instance is valid, return true if its channel is still
+        # playing it, otherwise remove it.
         if self.__sound:
-            if self.__sound.get_num_channels() > 0:
+            if (self.__channel and self.__channel.get_busy() 
+                and self.__channel.get_sound() is self.__sound):
                 return True
             else:
-                self.__sound = None
+                self.__sound = self.__channel = None
                 self.__looping = False
 
         # The song instance is invalid, return false.
@@ -118,4 +129,224 @@ class Sound():
     
     # Get the length of this sound file.
     def __len__(self):
-        return len(self.buffer) / Sound.cached_sample_rate
\ No newline at end of file
+        return len(self.buffer) / Sound.cached_sample_rate
+
+# Load the sample buffer of a sound file, or return None if the sound file is invalid.
+def load_buffer(engine, path):
+    # Check whether the sound buffer is already cached.
+    abspath = os.path.abspath(path)
+    if abspath in cached_sounds:
+        return cached_sounds[abspath]
+    
+    # Check if the path for the sound file exists, and attempt to load it.
+    if os.path.isfile(path):
+        try:
+            sound = pygame.mixer.Sound(abspath)
+            cached_sounds[abspath] = pygame.sndarray.array(sound)
+            return cached_sounds[abspath]
+        except pygame.error:
+            pass
+    engine.console.warn(f"sound path \"{path}\" is invalid")
+    return None
+
+# Get the shared mixer sound for a buffer played at a given speed, building it if it
+# isn't cached yet. If the speed is any value besides 1, the buffer is copied, with its
+# samples removed/duplicated accordingly.
+def get_playback(engine, buffer, speed):
+    # Check whether the mixer sound is already cached, and mark it as the most recently
+    # played. The buffer is kept alongside it, so that its id can't be reused.
+    key = (id(buffer), speed)
+    if key in cached_playbacks:
+        cached_playbacks.move_to_end(key)
+        return cached_playbacks[key][1]
+
+    # Resample the buffer and build the mixer sound.
+    samples = buffer
+    if speed != 1.0:
+        indices = numpy.arange(0, len(buffer), speed).astype(int)
+        samples = buffer[indices[indices < len(buffer)]]
+    sound = pygame.mixer.Sound(samples)
+
+    # Cache the mixer sound, evicting the least recently played beyond the limit.
+    cached_playbacks[key] = (buffer, sound)
+    while len(cached_playbacks) > engine.sound_playbacks.get():
+        cached_playbacks.popitem(last = False)
+    return sound
+
+# A channel playing a sound effect from the pool.
+class PooledVoice():
+    def __init__(self, channel, sound, path, priority):
+        self.channel = channel
+        self.sound = sound
+        self.path = path
+        self.priority = priority
+
+# A pool of channels playing sound effects by path.
+class SoundPool():
+    # Construct a new sound effect pool.
+    def __init__(self, engine):
+        # The maximum number of channels of each sound effect by path, if not the
+        # engine's default, and the voices that are playing from oldest to newest.
+        self.__limits = dict()
+        self.__voices = []
+
+        # Bind the engine instance to this pool.
+        self.__engine = engine
+
+    # Set the maximum number of channels a sound effect plays on at once.
+    def set_limit(self, path, limit):
+        self.__limits[os.path.abspath(path)] = limit
+
+    # Play a sound effect, and return the channel it is playing on, or None if it
+    # couldn't be played.
+    def play(self, path, volume = 1.0, priority = 0):
+        # Get the shared mixer sound for this sound effect.
+        buffer = load_buffer(self.__engine, path)
+        if buffer is None:
+            return None
+        sound = get_playback(self.__engine, buffer, 1.0)
+
+        # Forget any voices that have finished, or whose channel was taken over.
+        voices = self.__voices = [voice for voice in self.__voices
+                                  if voice.channel.get_busy()
+                                  and voice.channel.get_sound() is voice.sound]
+
+        # If this sound effect is already playing on as many channels as it is allowed
+        # to, steal its oldest channel. Otherwise, use a free channel, or steal the oldest
+        # channel of the lowest priority sound effect that doesn't outrank this one.
+        abspath = os.path.abspath(path)
+        limit = self.__limits.get(abspath, self.__engine.sfx_voices.get())
+        same = [voice for voice in voices if voice.path == abspath]
+        stolen = None
+        if len(same) >= limit:
+            if not same:
+                return None
+            stolen = same[0]
+        else:
+            channel = pygame.mixer.find_channel()
+            if not channel:
+                candidates = [voice for voice in voices if voice.priority <= priority]
+                if not candidates:
+                    return None
+                stolen = min(candidates, key = lambda voice: voice.priority)
+        if stolen:
+            voices.remove(stolen)
+            channel = stolen.channel
+            channel.stop()
+
+        # Play the sound effect.
+        channel.play(sound)
+        channel.set_volume(volume)
+        voices.append(PooledVoice(channel, sound, abspath, priority))
+        return channel
+
+# A synthesizer voice, which plays a waveform at a pitch (Hz) and volume until stopped.
+class Voice():
+    # Construct a new synthesizer voice.
+    def __init__(self, wave = WAVE_SQUARE, pitch = 440.0, volume = 0.5):
+        self.wave = wave
+        self.pitch = pitch
+        self.volume = volume
+        self.__phase = 0.0      # Phase of the waveform at the end of the last chunk (cycles).
+        self.__channel = None
+
+    # Start playing this voice, on a free channel if there is one.
+    def play(self):
+        if self.playing():
+            return
+        self.__channel = pygame.mixer.find_channel(True)
+        if not self.__channel:
+            return
+        self.__channel.play(self.__generate())
+        self.__channel.queue(self.__generate())
+        self.__channel.set_volume(self.volume)
+        active_voices.add(self)
+
+    # Stop playing this voice.
+    def stop(self):
+        if not self.playing():
+            return
+        self.__channel.stop()
+        self.__channel = None
+        self.__phase = 0.0
+        active_voices.discard(self)
+
+    # Is this voice playing?
+    def playing(self):
+        return self in active_voices
+
+    # Queue the next chunk onto the channel once the previous chunk has started playing,
+    # and apply the volume.
+    def update(self):
+        channel = self.__channel
+        if not channel.get_busy():
+            channel.play(self.__generate())
+        if not channel.get_queue():
+            channel.queue(self.__generate())
+        channel.set_volume(self.volume)
+
+    # Generate the next chunk of the waveform, continuing from the phase of the last chunk.
+    def __generate(self):
+        # Calculate the phase (in cycles) of each frame of the chunk.
+        rate = Sound.cached_sample_rate
+        step = self.pitch / rate
+        frames = int(rate * SYNTH_CHUNK_LENGTH)
+        phase = self.__phase + numpy.arange(frames) * step
+        self.__phase = (self.__phase + frames * step) % 1.0
+
+        # Sum the odd harmonics of a square wave up to the Nyquist frequency, or just
+        # generate the fundamental harmonic for a sine wave.
+        angle = phase * 2 * numpy.pi
+        if self.wave == WAVE_SQUARE and self.pitch > 0:
+            limit = min(SYNTH_HARMONICS, int(rate / 2 / self.pitch))
+            harmonics = numpy.arange(1, limit + 1, 2)[:, numpy.newaxis]
+            samples = (numpy.sin(angle * harmonics) / harmonics).sum(axis = 0)
+        else:
+            samples = numpy.sin(angle)
+        samples = (samples * SYNTH_AMPLITUDE).astype(numpy.int16)
+
+        # Duplicate the samples onto every channel of the mixer.
+        if Sound.num_channels > 1:
+            samples = numpy.repeat(samples[:, numpy.newaxis], Sound.num_channels, axis = 1)
+        return pygame.mixer.Sound(samples)
+
+# Stream a music file, optionally after an introduction, replacing any music that is
+# already playing. If loop is set, the music (but not the introduction) repeats until
+# stopped.
+def play_music(engine, path, intro = None, loop = True, volume = 1.0):
+    # Check if the paths for the music files exist.
+    stop_music()
+    for file in (intro, path):
+        if file and not os.path.isfile(file):
+            engine.console.warn(f"music path \"{file}\" is invalid")
+            return
+    
+    # Start streaming the introduction, and queue the music after it. Otherwise, stream
+    # the music straight away.
+    try:
+        pygame.mixer.music.set_volume(volume)
+        if intro:
+            pygame.mixer.music.load(intro)
+            pygame.mixer.music.play()
+            pygame.mixer.music.queue(path, loops = -1 if loop else 0)
+        else:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.play(-1 if loop else 0)
+    except pygame.error:
+        engine.console.warn(f"music path \"{path}\" could not be streamed")
+        stop_music()
+
+# Stop streaming music, alongside anything queued after it.
+def stop_music():
+    pygame.mixer.music.stop()
+    pygame.mixer.music.unload()
+
+# Is music streaming?
+def music_playing():
+    return pygame.mixer.music.get_busy()
+
+# Queue the next chunk of every playing synthesizer voice. This is called by the engine
+# once per frame.
+def update_voices():
+    for voice in active_voices:
+        voice.update()
\ No newline at end of file
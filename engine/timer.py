@@ -0,0 +1,74 @@
+"""Engine-oriented timers, which are only invoked once per frame.
+
+Timers are kept in a priority queue for each clock, ordered by when they expire and
+then by when they were created, so that timers always fire in the same order."""
+
+import heapq
+
+# Timer clocks.
+CLOCK_WALL  = 0 # The engine's time, which keeps running whilst the game is paused.
+CLOCK_GAME  = 1 # The game's time, which stops whilst the physics engine is disabled.
+
+# A handle to a scheduled timer, which can be cancelled.
+class Timer():
+    # Construct a new timer, expiring at a given time. If an interval is given, the timer
+    # is re-scheduled by that interval each time it fires.
+    def __init__(self, func, end, args, interval = None, clock = CLOCK_WALL):
+        self.func = func
+        self.end = end
+        self.args = args
+        self.interval = interval
+        self.clock = clock
+        self.cancelled = False
+        self.order = 0 # Set by the scheduler.
+
+    # Cancel this timer, so that it will not fire again.
+    def cancel(self):
+        self.cancelled = True
+
+    # Compare timers by when they expire, and then by when they were scheduled.
+    def __lt__(self, other):
+        return (self.end, self.order) < (other.end, other.order)
+
+# A priority queue of timers using the same clock.
+class TimerScheduler():
+    # Construct a new timer scheduler.
+    def __init__(self):
+        self.__heap = []
+        self.__order = 0
+
+    # Schedule a timer.
+    def schedule(self, timer):
+        timer.order = self.__order
+        self.__order += 1
+        heapq.heappush(self.__heap, timer)
+        return timer
+
+    # Invoke all timers that have expired by a given time. Repeating timers are pushed
+    # back into the queue, and fire at most once per call even if they have fallen
+    # behind; any timers scheduled whilst this runs are left for the next call.
+    def run(self, now):
+        heap = self.__heap
+        while heap and heap[0].end < now:
+            # Skip any cancelled timers.
+            timer = heap[0]
+            if timer.cancelled:
+                heapq.heappop(heap)
+                continue
+
+            # Re-schedule the timer if it repeats, otherwise remove it, and then fire it.
+            if timer.interval is not None:
+                timer.end = max(timer.end + timer.interval, now)
+                timer.order = self.__order
+                self.__order += 1
+                heapq.heapreplace(heap, timer)
+            else:
+                heapq.heappop(heap)
+            timer.func(*timer.args)
+
+    # Count the number of timers that haven't been cancelled.
+    def __len__(self):
+        return sum(1 for timer in self.__heap if not timer.cancelled)
+
+# Define what should be imported from this module.
+__all__ = ["Timer", "TimerScheduler", "CLOCK_WALL", "CLOCK_GAME"]
\ No newline at end of file
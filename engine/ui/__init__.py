@@ -2,4 +2,6 @@ from .udim2 import UDim2
 from .element import *
 from .frame import Frame
 from .image import Image
-from .text import *
\ No newline at end of file
+from .text import *
+from . import fonts
+from . import glyphs
\ No newline at end of file
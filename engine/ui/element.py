@@ -19,6 +19,7 @@ class Element():
         self._rect = pygame.Rect(0, 0, 0, 0)
         self._engine = engine
         self.enabled = False
+        self._revision = 0 # Bumped whenever the appearance of this element changes.
 
         # UI element description.
         self.__position = UDim2(0, 0, 0, 0)
@@ -57,6 +58,11 @@ class Element():
         self._rect.width = self._engine.game_width.get() * udim2.x.scale + udim2.x.offset
         self._rect.height = self._engine.game_height.get() * udim2.y.scale + udim2.y.offset
 
+    # Get the render state of this element, which the dirty-rect renderer compares
+    # each frame to check whether this element has to be redrawn.
+    def get_render_state(self):
+        return self._revision
+
     # Retrieve an event from this element.
     def get_event(self, name):
         if name not in self.__events:
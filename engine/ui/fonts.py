@@ -0,0 +1,64 @@
+"""A cache of fonts shared between every text element, so that each font file is only
+parsed once for each size.
+
+Fonts are reference counted by the text elements using them. Fonts no longer in use
+are kept until more than MAX_UNUSED_FONTS of them are unused, so that a font used by
+one scene and then the next (such as the status bar's) isn't parsed again in between.
+Since fonts are shared, their style must be set before each time they are used."""
+
+import os
+import collections
+import pygame
+
+# Macros.
+MAX_UNUSED_FONTS = 8
+
+# Cached fonts, alongside the key and reference count of each font.
+cached_fonts = dict()
+font_keys = dict()
+references = dict()
+
+# Fonts that are no longer in use, from the least to the most recently used.
+unused_fonts = collections.OrderedDict()
+
+# Load a font from a local font file, or raise a FileNotFoundError if the font path is
+# invalid.
+def load_font(path, size):
+    return acquire_font((os.path.abspath(path), size), lambda: pygame.font.Font(path, size))
+
+# Load a system font.
+def load_sysfont(name, size):
+    return acquire_font(("sysfont", name, size), lambda: pygame.font.SysFont(name, size))
+
+# Load the default font.
+def load_default_font(size):
+    return acquire_font(("default", size),
+                        lambda: pygame.font.Font(pygame.font.get_default_font(), size))
+
+# Acquire a reference to a cached font, creating the font if it isn't cached yet.
+def acquire_font(key, create):
+    font = cached_fonts.get(key)
+    if not font:
+        font = cached_fonts[key] = create()
+        font_keys[font] = key
+    references[key] = references.get(key, 0) + 1
+    unused_fonts.pop(key, None)
+    return font
+
+# Release a reference to a cached font. Once the least recently used font that isn't in
+# use goes beyond the limit, it is removed from the cache.
+def release_font(font):
+    key = font_keys.get(font)
+    if key is None:
+        return
+    references[key] -= 1
+    if references[key] > 0:
+        return
+    unused_fonts[key] = None
+    while len(unused_fonts) > MAX_UNUSED_FONTS:
+        key = unused_fonts.popitem(last = False)[0]
+        del font_keys[cached_fonts.pop(key)]
+        del references[key]
+
+# Define what should be imported from this module.
+__all__ = ["load_font", "load_sysfont", "load_default_font", "release_font"]
\ No newline at end of file
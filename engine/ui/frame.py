@@ -24,6 +24,7 @@ class Frame(element.Element):
     def set_colour(self, colour):
         self.__colour = colour
         self.__surface = None
+        self._revision += 1
 
     # Draw this frame.
     def draw_frame(self, screen):
@@ -0,0 +1,99 @@
+"""A glyph atlas, which composes lines of text out of cached glyph surfaces, rather than
+rendering every line of text with the font.
+
+There is an atlas for each font, anti-aliasing, colour and style, which sets the style
+of the font before each time it is used, since fonts are shared. Glyphs are only
+composed if they fit within their advance and the font's height, and only for fonts
+where composing the printable ASCII glyphs gives exactly the same result as rendering
+them, which isn't the case for kerned or fractionally spaced fonts. Anything else is
+rendered with the font as per usual."""
+
+import string
+import weakref
+import pygame
+
+# Glyphs used to check whether a font can be composed out of its glyphs.
+PROBE_GLYPHS = string.printable[:95]
+
+# Cached glyph atlases for each font.
+cached_atlases = weakref.WeakKeyDictionary()
+
+# A cache of the glyphs of a font, rendered in one colour and style.
+class GlyphAtlas():
+    # Construct a new glyph atlas for a font, given the style to render it in as a tuple
+    # of whether it is bold, italic and underlined. The font is only weakly referenced,
+    # so that the atlas doesn't keep its own key in cached_atlases alive.
+    def __init__(self, font, antialias, colour, style):
+        self.__font = weakref.ref(font)
+        self.__antialias = antialias
+        self.__colour = pygame.Color(colour)
+        self.__style = style
+        self.__glyphs = dict() # The surface and advance of each glyph, or None if the
+                               # glyph cannot be composed.
+
+        # Check that composing glyphs gives the same result as rendering them.
+        line = "".join(glyph for glyph in PROBE_GLYPHS if self.__get_glyph(glyph))
+        self.__composable = False
+        if line:
+            self.__set_style()
+            composed, rendered = self.__compose(line), font.render(line, antialias, colour)
+            self.__composable = (composed.get_size() == rendered.get_size() and
+                                 pygame.image.tostring(composed, "RGBA") == 
+                                 pygame.image.tostring(rendered, "RGBA"))
+
+    # Render a line of text, composing it out of its glyphs if possible.
+    def render(self, line):
+        if self.__composable and line and all(self.__get_glyph(glyph) for glyph in line):
+            return self.__compose(line)
+        self.__set_style()
+        return self.__font().render(line, self.__antialias, self.__colour)
+
+    # Set the style of the font.
+    def __set_style(self):
+        bold, italic, underline = self.__style
+        font = self.__font()
+        font.set_bold(bold)
+        font.set_italic(italic)
+        font.set_underline(underline)
+
+    # Compose a line of text out of its glyphs.
+    def __compose(self, line):
+        glyphs = [self.__glyphs[glyph] for glyph in line]
+        surface = pygame.Surface((sum(advance for _, advance in glyphs), 
+                                  self.__font().get_height()), pygame.SRCALPHA)
+        x = 0
+        for texture, advance in glyphs:
+            surface.blit(texture, (x, 0))
+            x += advance
+        return surface
+
+    # Get the surface and advance of a glyph, rendering it if it isn't cached yet. If
+    # the glyph cannot be composed, None is returned instead.
+    def __get_glyph(self, glyph):
+        if glyph in self.__glyphs:
+            return self.__glyphs[glyph]
+
+        # The glyph must fit within its advance and the font's height.
+        font = self.__font()
+        self.__set_style()
+        metrics = font.metrics(glyph)[0]
+        entry = None
+        if metrics:
+            min_x, max_x, min_y, max_y, advance = metrics
+            texture = font.render(glyph, self.__antialias, self.__colour)
+            if (min_x >= 0 and max_x <= advance and min_y >= font.get_descent()
+                and max_y <= font.get_ascent() and texture.get_size() == (advance, font.get_height())):
+                entry = (texture, advance)
+        self.__glyphs[glyph] = entry
+        return entry
+
+# Get the glyph atlas of a font in a given colour and style.
+def get_atlas(font, antialias, colour, bold = False, italic = False, underline = False):
+    atlases = cached_atlases.setdefault(font, dict())
+    key = (antialias, tuple(colour), bold, italic, underline)
+    if key not in atlases:
+        atlases[key] = GlyphAtlas(font, antialias, colour, (bold, italic, underline))
+    return atlases[key]
+
+# Define what should be imported from this module.
+__all__ = ["GlyphAtlas", "get_atlas"]
\ No newline at end of file
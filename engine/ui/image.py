@@ -23,6 +23,7 @@ class Image(element.Element):
 
     # Load from an image.
     def load(self, path):
+        self._revision += 1
         # Fallback function, should the image path be invalid.
         def fallback():
             nonlocal self, path
@@ -49,6 +50,7 @@ class Image(element.Element):
     # Upon setting the size of this image, re-scale the texture appropriately.
     def set_size(self, udim2, scale = True, offset = (0, 0)):
         super().set_size(udim2)
+        self._revision += 1
         res = (self._rect.width, self._rect.height)
         if scale:
             image = pygame.transform.scale(self.__image, res)
@@ -60,6 +62,7 @@ class Image(element.Element):
     # Flip this image.
     def flip(self, flip_x = False, flip_y = False):
         self.__texture = pygame.transform.flip(self.__texture, flip_x, flip_y)
+        self._revision += 1
 
     # Draw this frame.
     def draw_image(self, screen):
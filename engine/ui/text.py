@@ -1,10 +1,13 @@
 """A text element that displays text, which can also be updated
 if chosen."""
 
+import weakref
 import pygame
 
 from ..event import Event
 from . import element
+from . import fonts
+from . import glyphs
 
 # Text alignment options.
 X_LEFT      = 0
@@ -26,6 +29,7 @@ class Text(element.Element):
         self.__text = ""
         self.__texture = None
         self.__font = None
+        self.__font_release = None
         self.__x_align = X_LEFT
         self.__y_align = Y_TOP
         self.__colour = pygame.Color(0, 0, 0)
@@ -42,7 +46,7 @@ class Text(element.Element):
     # Pygame will default to the default font.
     def load_localfont(self, path, size = 12):
         try:
-            self.__font = pygame.font.Font(path, size)
+            self.__set_font(fonts.load_font(path, size))
         except FileNotFoundError:
             self._engine.console.warn(f"font path \"{path}\" is invalid!")
             self.load_default()
@@ -52,20 +56,32 @@ class Text(element.Element):
     def load_systemfont(self, name, size = 12):
         if not pygame.font.match_font(name):
             self._engine.console.warn(f"system font \"{name}\" does not exist!")
-        self.__font = pygame.font.SysFont(name, size)
+        self.__set_font(fonts.load_sysfont(name, size))
 
     # Load the default font.
     def load_default(self, size = 12):
-        self.__font = pygame.font.Font(pygame.font.get_default_font(), size)
+        self.__set_font(fonts.load_default_font(size))
+
+    # Use a font from the font cache, releasing the previous font. The font is released
+    # as well once this element is garbage collected.
+    def __set_font(self, font):
+        if self.__font_release:
+            self.__font_release()
+        self.__font = font
+        self.__font_release = weakref.finalize(self, fonts.release_font, font)
+        self.__texture = None
+        self._revision += 1
 
     # Get the current text buffer.
     def get_text(self):
         return self.__text
     
-    # Set the text buffer.
+    # Set the text buffer. The text is only re-rendered if it changed.
     def set_text(self, text):
+        if text != self.__text:
+            self._revision += 1
+            self.__texture = None
         self.__text = text
-        self.__texture = None
 
     # Get the current x-alignment.
     def get_x_align(self):
@@ -75,6 +91,7 @@ class Text(element.Element):
     def set_x_align(self, x_align):
         self.__x_align = x_align
         self.__texture = None
+        self._revision += 1
     
     # Get the current y-alignment.
     def get_y_align(self):
@@ -84,6 +101,7 @@ class Text(element.Element):
     def set_y_align(self, y_align):
         self.__y_align = y_align
         self.__texture = None
+        self._revision += 1
 
     # Get whether this text is anti-aliased.
     def get_antialiased(self):
@@ -93,6 +111,7 @@ class Text(element.Element):
     def set_antialiased(self, toggle):
         self.__antialiasing = toggle
         self.__texture = None
+        self._revision += 1
 
     # Get the colour of this text.
     def get_colour(self):
@@ -102,6 +121,7 @@ class Text(element.Element):
     def set_colour(self, colour):
         self.__colour = colour
         self.__texture = None
+        self._revision += 1
 
     # Get whether this text is bold.
     def get_bold(self):
@@ -111,6 +131,7 @@ class Text(element.Element):
     def set_bold(self, bold):
         self.__bold = bold
         self.__texture = None
+        self._revision += 1
 
     # Get whether this text is italic.
     def get_italic(self):
@@ -120,6 +141,7 @@ class Text(element.Element):
     def set_italic(self, italic):
         self.__italic = italic
         self.__texture = None
+        self._revision += 1
 
     # Get whether this text is underlined.
     def get_underline(self):
@@ -129,6 +151,7 @@ class Text(element.Element):
     def set_underline(self, underline):
         self.__underline = underline
         self.__texture = None
+        self._revision += 1
 
     # Draw this text.
     def draw_text(self, screen):
@@ -138,11 +161,6 @@ class Text(element.Element):
 
         # Re-render the text surface if the texture is None.
         if not self.__texture:
-            # Set the font properties.
-            self.__font.set_bold(self.__bold)
-            self.__font.set_italic(self.__italic)
-            self.__font.set_underline(self.__underline)
-            
             # Create a new transparent surface beforehand, which all text
             # surfaces will be blit onto.
             self.__texture = pygame.Surface((self._rect.width, self._rect.height), pygame.SRCALPHA)
@@ -150,11 +168,12 @@ class Text(element.Element):
 
             # Split the text buffer into strings separated by newline, and
             # enumerate through each string.
+            atlas = glyphs.get_atlas(self.__font, self.__antialiasing, self.__colour,
+                                     self.__bold, self.__italic, self.__underline)
             strings = self.__text.split("\n")
             for i, str in enumerate(strings):
-                # Render this text buffer using the font.
-                texture = self.__font.render(str, self.__antialiasing,
-                                                    self.__colour)
+                # Render this text buffer using the font's glyph atlas.
+                texture = atlas.render(str)
                 
                 # Configure the alignment.
                 if self.__x_align == X_LEFT:
@@ -5,9 +5,7 @@ standards."""
 
 import engine
 import pygame
-import numpy
 import random 
-import time
 from . import scenes
 from . import sprites
 
@@ -18,6 +16,16 @@ SCENE_LEVELSELECT   = 1
 SCENE_LOADINGLEVEL  = 2
 SCENE_LEVEL         = 3
 
+# The maximum number of channels a sound effect plays on at once, if not the engine's
+# default. The player's own sound effects restart rather than overlap.
+SFX_LIMITS = {
+    "lostlevels/assets/audio/player/jump.ogg":          1,
+    "lostlevels/assets/audio/player/denied.ogg":        1,
+    "lostlevels/assets/audio/player/death.ogg":         1,
+    "lostlevels/assets/audio/player/block_hit.ogg":     2,
+    "lostlevels/assets/audio/objects/pipe_enter.ogg":   1,
+}
+
 # Main game interface for Lost Levels.
 class LostLevels(engine.Game):
     # Initialize the game interface.
@@ -32,32 +40,28 @@ class LostLevels(engine.Game):
         # Store the save file here.
         self.save = None
 
-        # Create a 1Hz 1s 4square wave.
-        samples = (numpy.arange(engine.Sound.cached_sample_rate * engine.Sound.num_channels) 
-                   * numpy.pi / engine.Sound.cached_sample_rate)
-        square = numpy.array([0] * engine.Sound.cached_sample_rate 
-                             * engine.Sound.num_channels).astype(numpy.int16)
-        for i in range(1, 21, 2):
-            square += (numpy.sin(samples * i) / i * 10000).astype(numpy.int16)
-
-        # Create some new square wave channels for the intro music.
-        self.__melody = self._engine.create_sound()
-        self.__harmony1 = self._engine.create_sound()
-        self.__harmony2 = self._engine.create_sound()
-        self.__harmony2.volume = 0.35
-        self.__bass = self._engine.create_sound()
-        self.__bass.volume = 0.35
-        self.__melody.buffer = self.__harmony1.buffer \
-            = self.__harmony2.buffer = self.__bass.buffer = square
+        # Create some new square wave voices for the intro music.
+        self.__melody = self._engine.create_voice(engine.WAVE_SQUARE)
+        self.__harmony1 = self._engine.create_voice(engine.WAVE_SQUARE)
+        self.__harmony2 = self._engine.create_voice(engine.WAVE_SQUARE, volume = 0.35)
+        self.__bass = self._engine.create_voice(engine.WAVE_SQUARE, volume = 0.35)
 
         # Set Python's RNG's seed to a hardcoded constant which can be changed later by
-        # hitting keys, and play all the created square wave channels.
+        # hitting keys, and play all the created square wave voices.
         random.seed(4389)
         self.__tweak_melody()
         self.__tweak_harmony1()
         self.__tweak_harmony2()
         self.__tweak_bass()
 
+        # Keep tweaking the voices until the start menu music is stopped.
+        self.__tweakers = [
+            self._engine.create_timer(self.__tweak_melody, 0.165, repeat = True),
+            self._engine.create_timer(self.__tweak_harmony1, 0.165, repeat = True),
+            self._engine.create_timer(self.__tweak_harmony2, 0.165, repeat = True),
+            self._engine.create_timer(self.__tweak_bass, 0.33, repeat = True)
+        ]
+
         # Register all of this game's entity types.
         self._engine.register_classname("player", sprites.Player)
         self._engine.register_classname("powerup_block", sprites.PowerupBlock)
@@ -73,6 +77,10 @@ class LostLevels(engine.Game):
         self._engine.register_classname("goomba", sprites.enemies.Goomba)
         self._engine.register_classname("koopa", sprites.enemies.Koopa)
 
+        # Limit how many of each sound effect can overlap.
+        for path, limit in SFX_LIMITS.items():
+            self._engine.set_sfx_limit(path, limit)
+
         # Declare all the status bar's elements.
         self.scorebox = None
         self.livesbox = None
@@ -125,7 +133,7 @@ class LostLevels(engine.Game):
     def keydown(self, enum, unicode, focused):
         if self.__scene:
             self.__scene.keydown(enum, unicode, focused)
-        random.seed(time.perf_counter_ns())
+        random.seed(self._engine.random_seed())
 
     # Forward all keyup events to the scene.
     def keyup(self, enum, unicode, focused):
@@ -153,6 +161,8 @@ class LostLevels(engine.Game):
             self.__harmony2.stop()
             self.__bass.stop()
             self.__melody = self.__harmony1 = self.__harmony2 = self.__bass = None
+            for tweaker in self.__tweakers:
+                tweaker.cancel()
 
         # Change the scene to the level selection map scene.
         self.checkpoint_time_limit = None
@@ -199,6 +209,9 @@ class LostLevels(engine.Game):
     
     # Load a section of the level.
     def load_level(self, section = "main", offset = None, time_remaining = 200, first_time = True):
+        # Finish preloading the level's assets, if the cutscene wasn't long enough.
+        self._engine.preloader.wait()
+
         # Clear all UI elements.
         self._engine.clear_background_elements()
         self._engine.clear_foreground_elements()
@@ -274,32 +287,28 @@ class LostLevels(engine.Game):
         self.timebox.set_x_align(engine.ui.X_CENTRE)
         self.timebox.enabled = True
 
-    # Tweak the melody channel's pitch.
+    # Tweak the melody voice's pitch.
     def __tweak_melody(self):
         if self.__melody != None:
-            self.__melody.speed = random.randint(700, 900)
-            self.__melody.repeat(True)
-            self._engine.create_timer(self.__tweak_melody, 0.165)
+            self.__melody.pitch = random.randint(700, 900)
+            self.__melody.play()
 
-    # Tweak the bass channel's pitch.
+    # Tweak the bass voice's pitch.
     def __tweak_harmony1(self):
         if self.__harmony1 != None:
-            self.__harmony1.speed = self.__melody.speed / 2
-            self.__harmony1.repeat(True)
-            self._engine.create_timer(self.__tweak_harmony1, 0.165)
+            self.__harmony1.pitch = self.__melody.pitch / 2
+            self.__harmony1.play()
 
-    # Tweak the bass channel's pitch.
+    # Tweak the bass voice's pitch.
     def __tweak_harmony2(self):
         if self.__harmony2 != None:
-            self.__harmony2.speed = random.randint(1600, 2400)
+            self.__harmony2.pitch = random.randint(1600, 2400)
             self.__harmony2.stop()
             if random.randint(1, 5) == 1:
-                self.__harmony2.play(True)
-            self._engine.create_timer(self.__tweak_harmony2, 0.165)
+                self.__harmony2.play()
 
-    # Tweak the bass channel's pitch.
+    # Tweak the bass voice's pitch.
     def __tweak_bass(self):
         if self.__bass != None:
-            self.__bass.speed = random.randint(150, 375)
-            self.__bass.repeat(True)
-            self._engine.create_timer(self.__tweak_bass, 0.33)
\ No newline at end of file
+            self.__bass.pitch = random.randint(150, 375)
+            self.__bass.play()
\ No newline at end of file
@@ -3,7 +3,6 @@
 import os
 import pygame
 import engine
-import time
 
 from .. import levelinfo
 from ..sprites import Moveable
@@ -21,15 +20,15 @@ class Level(engine.Game):
         self.backgroundmain = None
         self.backgroundsecondary = None
 
-        # Declare the audio attributes in advance.
-        self.audio_intro = None
-        self.audio_main = None
+        # Create the sound of the remaining time being counted.
         self.finished_score = self._engine.create_sound(
             "lostlevels/assets/audio/objects/flagpole_count.ogg")
         self.finished_score.volume = 1
 
-        # Has the level concluded yet?
+        # Has the level concluded yet? If so, the remaining time is transferred into score
+        # points by a timer.
         self.finished = False
+        self.score_timer = None
 
         # Create the player entity before the rest of the map is generated.
         self.player = self._engine.create_entity_by_class("player")
@@ -149,14 +148,9 @@ class Level(engine.Game):
             if self.player.get_absorigin().x > 576:
                 self._engine.delete_entity(self.player)
 
-        # Handle playing the level music, if it exists.
-        if (self.audio_main != None and (self.audio_intro == None or not self.audio_intro.playing())
-            and not self.audio_main.playing()):
-            self.audio_main.play(True)
-
         # Enable the ESC prompt based on whether the ESC key was the last key
         # pressed, and if it was pressed recently.
-        if self.last_keys[-1] == pygame.K_ESCAPE and time.perf_counter() - self.last_key_press < 3:
+        if self.last_keys[-1] == pygame.K_ESCAPE and self._engine.get_time() - self.last_key_press < 3:
             self.esc_prompt.enabled = self.player.alive
         else:
             self.esc_prompt.enabled = False
@@ -198,6 +192,9 @@ class Level(engine.Game):
             # Go to the next entity.
             ent = ent.next
 
+        # Let the engine cull the entities that are out of view.
+        self._engine.set_view(pygame.math.Vector2(-self.camoffset, 0))
+
         # Scroll the background slowly based on the camera offset.
         background_offset = self.camoffset / 3
         self.backgroundmain.set_position(
@@ -207,25 +204,14 @@ class Level(engine.Game):
         
     # Handle playing music for this level.
     def play_music(self, biome):
-        # Load the introduction audio if it exists.
+        # Stream the main audio, after the introduction audio if it exists.
         intro_path = f"lostlevels/assets/audio/{biome}/intro.ogg"
-        if os.path.isfile(intro_path):
-            self.audio_intro = self._engine.create_sound(intro_path)
-            self.audio_intro.volume = 1
-            self.audio_intro.play()
-        
-        # Load the main audio.
-        self.audio_main = self._engine.create_sound(f"lostlevels/assets/audio/{biome}/main.ogg")
-        self.audio_main.volume = 1
+        self._engine.play_music(f"lostlevels/assets/audio/{biome}/main.ogg",
+                                intro_path if os.path.isfile(intro_path) else None)
 
     # Stop playing the level music.
     def stop_music(self):
-        if self.audio_intro != None:
-            self.audio_intro.stop()
-            self.audio_intro = None
-        if self.audio_main != None:
-            self.audio_main.stop()
-            self.audio_main = None
+        self._engine.stop_music()
 
     # The death sequence: kill the player (if they are not already being killed) and
     # go back to the loading level screen.
@@ -256,14 +242,14 @@ class Level(engine.Game):
         # If the last two keys pressed were ESC keys, return to the level selection
         # map, if the player is alive.
         if (self.last_keys[-1] == pygame.K_ESCAPE and enum == pygame.K_ESCAPE
-            and (time.perf_counter() - self.last_key_press < 3) and self.player.alive):
+            and (self._engine.get_time() - self.last_key_press < 3) and self.player.alive):
             self.stop_music()
             self.__game.load_levelselection()
 
         # Buffer the latest input.
         self.last_keys.append(enum)
         self.last_keys = self.last_keys[1:]
-        self.last_key_press = time.perf_counter()
+        self.last_key_press = self._engine.get_time()
 
         # Forward this event to the player.
         self.player.keydown(enum, unicode, focused)
@@ -278,14 +264,14 @@ class Level(engine.Game):
         self.stop_music()
         self.finished = True
 
-        # Create the THX Deep Note sound object and play it.
-        thx = self._engine.create_sound("lostlevels/assets/audio/objects/flagpole_victory.ogg")
-        thx.volume = 1
-        thx.play()
+        # Play the THX Deep Note.
+        self._engine.play_sfx("lostlevels/assets/audio/objects/flagpole_victory.ogg", priority = 2)
 
-        # Create a timer for transferring the remaining time into score points.
+        # Create a timer for transferring the remaining time into score points. This uses
+        # the engine's time, like the timer for leaving this level, so that pausing can't
+        # hold up the transfer past the next scene being loaded.
         self.finished_score.play(True)
-        self._engine.create_timer(self.handle_timer_score, 1 / 30)
+        self.score_timer = self._engine.create_timer(self.handle_timer_score, 1 / 30, repeat = True)
 
         # Handle whether a new level should be started after this level or not.
         if self.get_save().currentlevel[self.__game.world - 1] >= levelinfo.NUM_LEVELS:
@@ -301,8 +287,7 @@ class Level(engine.Game):
         self.time_remaining = max(self.time_remaining - 2, 0)
         self.get_save().header.m_uScore += 20
 
-        # Repeat this function call if there is still some time remaining.
-        if self.time_remaining > 0:
-            self._engine.create_timer(self.handle_timer_score, 1 / 30)
-        else:
+        # Stop once there is no time remaining.
+        if self.time_remaining == 0:
+            self.score_timer.cancel()
             self.finished_score.stop() 
\ No newline at end of file
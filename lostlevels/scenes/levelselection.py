@@ -31,11 +31,8 @@ class LevelSelection(engine.Game):
         self.room.set_size(engine.ui.UDim2(1, 0, 1, 0))
         self.room.enabled = True
 
-        # Load the level selection map music.
-        self.music = self._engine.create_sound(
-            "lostlevels/assets/audio/levelselection/sma4_world_e_castle.ogg")
-        self.music.volume = 1
-        self.music.play(True)
+        # Stream the level selection map music.
+        self._engine.play_music("lostlevels/assets/audio/levelselection/sma4_world_e_castle.ogg")
 
         # Create an invisible rectangle for the ground.
         self.ground = self._engine.create_entity_by_class("rect")
@@ -117,7 +114,7 @@ class LevelSelection(engine.Game):
     def keydown(self, enum, unicode, focused):
         # Return to the main menu if the ESC key is pressed.
         if enum == pygame.K_ESCAPE:
-            self.music.stop()
+            self._engine.stop_music()
             self.__game.save.write("saves")
             self.__game.load_startmenu()
 
@@ -138,7 +135,7 @@ class LevelSelection(engine.Game):
         # world-loading sequence.
         if not started:
             self._engine.console.log(f"[Lost Levels]: loading world {portal.world}")
-            self.player.jump_sound.play()
+            self._engine.play_sfx("lostlevels/assets/audio/player/jump.ogg", priority = 1)
             self.player.moveable = False
             self.player.index = 4
             self.player.velocity.y = 650
@@ -146,7 +143,7 @@ class LevelSelection(engine.Game):
             self.player.move = 0
             self._engine.create_timer(self.load_world, 0.5, portal, True)
         else:
-            self.music.stop()
+            self._engine.stop_music()
             self.__game.load_world(portal.world)
 
     # Move the USE key dialogue with the player.
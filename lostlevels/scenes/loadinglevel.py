@@ -7,6 +7,7 @@ import pygame
 import engine
 
 from .. import levelinfo
+from ..worlds import manifest
 
 # Loading level scene.
 class LoadingLevel(engine.Game):
@@ -87,6 +88,9 @@ class LoadingLevel(engine.Game):
             self._engine.console.error(f"[Lost Levels]: missing module \"{path}\"!")
         self.__game.levelmodule = __import__(f"lostlevels.worlds.{self.__game.world}.{self.__game.level}", 
                                              fromlist = "*")
+
+        # Preload the level's assets in the background whilst the cutscene is shown.
+        self._engine.preloader.preload(manifest.get_level_assets(self.__game.levelmodule))
         
         # Create a textlabel for presenting the level to the player.
         worldname = self._engine.create_ui_element_by_class("text")
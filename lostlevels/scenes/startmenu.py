@@ -2,7 +2,6 @@
 
 import os
 import sys
-import time
 import pygame
 import engine
 
@@ -107,7 +106,7 @@ class StartMenu(engine.Game):
 
         # Create a timestamp since the start menu launched and whether we
         # already selected a button.
-        self.launch = time.perf_counter()
+        self.launch = self._engine.get_time()
         self.selected = False
 
         # Create a text element for the help page, which is disabled by
@@ -194,7 +193,7 @@ class StartMenu(engine.Game):
         
         # Show the help dialogue if it has been 10s since launching and if we
         # have not previously selected a button.
-        if time.perf_counter() - self.launch > 10 and not self.selected:
+        if self._engine.get_time() - self.launch > 10 and not self.selected:
             self.help_dialogue.enabled = True
         
     # Handle input on keyup.
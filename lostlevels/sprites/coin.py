@@ -19,8 +19,6 @@ class Coin(engine.entity.Sprite):
         # Set some coin-specific properties.
         self.level = None
         self.collected = False
-        self.coin_hit_sound = self._engine.create_sound("lostlevels/assets/audio/objects/coin_hit.ogg")
-        self.coin_hit_sound.volume = 1
 
     # Increment the coins counter.
     def increment_counter(self):
@@ -31,7 +29,7 @@ class Coin(engine.entity.Sprite):
         # Increment the coins counter.
         self.level.get_save().header.m_sCoins += 1
         self.collected = True
-        self.coin_hit_sound.play()
+        self._engine.play_sfx("lostlevels/assets/audio/objects/coin_hit.ogg")
 
         # Increment the score counter by 200.
         self.level.get_save().header.m_uScore += 200
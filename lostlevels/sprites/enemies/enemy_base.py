@@ -18,12 +18,6 @@ class EnemyBase(Moveable, Humanoid):
         self.set_event(engine.Event("player_hit", EnemyBase.player_hit)) # Called when player hits from above.
         self.set_event(engine.Event("kill", EnemyBase.kill))
 
-        # Create some sound effects.
-        self.kick = self._engine.create_sound("lostlevels/assets/audio/player/koopa_kick.ogg")
-        self.stomp = self._engine.create_sound("lostlevels/assets/audio/player/enemy_stomp.ogg")
-        self.kick.volume = 1
-        self.stomp.volume = 1
-
         # Bind the level scene instance to this enemy.
         self.level = None
 
@@ -50,14 +44,14 @@ class EnemyBase(Moveable, Humanoid):
     
     # Handle being hit by the player from above.
     def player_hit(self, player):
-        self.stomp.play()
+        self._engine.play_sfx("lostlevels/assets/audio/player/enemy_stomp.ogg")
         self.invoke_event("kill", True)
 
     # Handle killing this enemy.
     def kill(self, player_hit = False):
         self._engine.console.log(f"[Lost Levels]: enemy \"{self.get_class()}\" was killed")
         if not player_hit:
-            self.kick.repeat()
+            self._engine.play_sfx("lostlevels/assets/audio/player/koopa_kick.ogg")
         self._engine.delete_entity(self)
         self.level.get_save().header.m_uScore += 100
         self.alive = False
\ No newline at end of file
@@ -1,6 +1,5 @@
 """The Koopa enemy. They can be forced into their shells and kicked into other enemies."""
 
-import time
 import pygame
 import engine
 from . import EnemyBase
@@ -24,17 +23,19 @@ class Koopa(EnemyBase):
         # Handle the Koopa in its shell form.
         self.stomped = False
         self.kicked = False
-        self.time_since_hit = time.perf_counter()
-
-        # Store some Koopa-specific sounds.
-        self.block_hit_sound = self._engine.create_sound("lostlevels/assets/audio/player/block_hit.ogg")
-        self.block_hit_sound.volume = 1
+        self.time_since_hit = self._engine.get_time()
+        self.animator = None
 
     # Animate this Koopa while it still hasn't been stomped.
     def animate(self):
-        if not self.stomped:
-            self.index = (self.index + 1) % 2
-            self._engine.create_timer(self.animate, 0.25)
+        if self.stomped or self.deleted:
+            if self.animator:
+                self.animator.cancel()
+            return
+        self.index = (self.index + 1) % 2
+        if not self.animator:
+            self.animator = self._engine.create_timer(self.animate, 0.25, repeat = True,
+                                                      clock = engine.CLOCK_GAME)
 
     # Handle stomping the Koopa.
     def player_hit(self, player):
@@ -46,7 +47,7 @@ class Koopa(EnemyBase):
             self.set_hitbox(pygame.math.Vector2(25, 24))
             self.set_baseorigin(self.get_baseorigin() - pygame.math.Vector2(0, 24))
             self.stomped = True
-            self.stomp.play()
+            self._engine.play_sfx("lostlevels/assets/audio/player/enemy_stomp.ogg")
             self.level.get_save().header.m_uScore += 100
 
         # Otherwise, this Koopa is probably being kicked. Stop it from moving.
@@ -54,18 +55,18 @@ class Koopa(EnemyBase):
             self._engine.console.log(f"[Lost Levels]: enemy \"{self.get_class()}\" was stomped into shell")
             self.kicked = False
             self.speed = 0
-            self.stomp.play()
+            self._engine.play_sfx("lostlevels/assets/audio/player/enemy_stomp.ogg")
             self.level.get_save().header.m_uScore += 100
 
         # Set the time since this Koopa was last hit by the player.
-        self.time_since_hit = time.perf_counter()
+        self.time_since_hit = self._engine.get_time()
 
     # Handle collision detection.
     def collision(self, other, coltype, coldir):
         # Check if the other entity is the player.
         if other.get_class() == "player":
             # If the player has collided with the Koopa recently, do not accept collision.
-            if self.time_since_hit + 0.5 > time.perf_counter():
+            if self.time_since_hit + 0.5 > self._engine.get_time():
                 return False
             
             # Otherwise, if the Koopa is stomped bit not kicked, kick the Koopa.
@@ -75,8 +76,8 @@ class Koopa(EnemyBase):
                 self.kicked = True
                 self.speed = 300
                 self.negate_speed = self.get_abscentre().x - other.get_abscentre().x < 0
-                self.time_since_hit = time.perf_counter()
-                self.kick.play()
+                self.time_since_hit = self._engine.get_time()
+                self._engine.play_sfx("lostlevels/assets/audio/player/koopa_kick.ogg")
                 return False
         
         # Otherwise, if the Koopa is being kicked and the other entity is an enemy,
@@ -97,13 +98,13 @@ class Koopa(EnemyBase):
             # If this is the player, only hurt them if the Koopa is not stomped or being kicked,
             # and the player hasn't hit the Koopa recently.
             if other.get_class() == "player":
-                if (self.kicked or not self.stomped) and self.time_since_hit + 0.5 <= time.perf_counter():
+                if (self.kicked or not self.stomped) and self.time_since_hit + 0.5 <= self._engine.get_time():
                     other.hurt()
                     return engine.Event.DETOUR_CONTINUE
                 
             # Otherwise, if the Koopa is being kicked, play an impact sound.
             elif self.kicked:
-                self.block_hit_sound.repeat()
+                self._engine.play_sfx("lostlevels/assets/audio/player/block_hit.ogg")
             
         # If the player hit this enemy from above, invoke the player_hit event.
         if engine.entity.is_collision_above(coltype, coldir) and other.get_class() == "player":
@@ -24,8 +24,6 @@ class PipeTop(engine.entity.Tile):
         self.section = None
         self.offset = None
         self.entered = False
-        self.pipe_enter_sound = self._engine.create_sound("lostlevels/assets/audio/objects/pipe_enter.ogg")
-        self.pipe_enter_sound.volume = 1
 
         # Create an event for pipe transportation.
         self.set_event(engine.Event("entered", PipeTop.transport))
@@ -61,7 +59,7 @@ class PipeTop(engine.entity.Tile):
         # Destroy the player entity and call the entered event,
         # while playing the pipe enter sound.
         self.entered = True
-        self.pipe_enter_sound.play()
+        self._engine.play_sfx("lostlevels/assets/audio/objects/pipe_enter.ogg", priority = 1)
         self.level.player.can_die = False
         self._engine.delete_entity(other)
         self.invoke_event("entered")
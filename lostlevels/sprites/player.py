@@ -1,7 +1,6 @@
 """This is the Lost Levels player sprite, which can be controlled
 by the player."""
 
-import time
 import pygame
 import engine
 import lostlevels
@@ -42,15 +41,6 @@ class Player(engine.entity.Sprite, Humanoid):
 
         # The level scene object.
         self.level = None
-        
-        # Instantiate a bunch of sound objects for the player's SFX.
-        self.death_sound = self._engine.create_sound("lostlevels/assets/audio/player/death.ogg")
-        self.block_hit_sound = self._engine.create_sound("lostlevels/assets/audio/player/block_hit.ogg")
-        self.jump_sound = self._engine.create_sound("lostlevels/assets/audio/player/jump.ogg")
-        self.denied_sound = self._engine.create_sound("lostlevels/assets/audio/player/denied.ogg")
-        self.death_sound.volume = 1
-        self.block_hit_sound.volume = 1
-        self.jump_sound.volume = 1
 
         # Used for propelling off enemy targets.
         self.add_velocity_y = 0
@@ -78,13 +68,13 @@ class Player(engine.entity.Sprite, Humanoid):
 
             # Handle the player's climbing animation.
             self.flip() # Make sure the player is facing rightwards.
-            if time.perf_counter() > self.__animtimestamp + 0.085:
+            if self._engine.get_time() > self.__animtimestamp + 0.085:
                 if self.index < 8:
                     self.index = 8
                 else:
                     self.index -= 8
                     self.index = (self.index + 1) % 4 + 8
-                self.__animtimestamp = time.perf_counter()
+                self.__animtimestamp = self._engine.get_time()
 
             # Return.
             return
@@ -104,8 +94,8 @@ class Player(engine.entity.Sprite, Humanoid):
                 if self.groundentity:
                     if abs(self.velocity.x) > 0.1:
                         length = 1 / (abs(self.velocity.x) / 20)
-                        if time.perf_counter() > self.__animtimestamp + length:
-                            self.__animtimestamp = time.perf_counter()
+                        if self._engine.get_time() > self.__animtimestamp + length:
+                            self.__animtimestamp = self._engine.get_time()
                             self.index = (self.index % 3) + 1
                     else:
                         self.index = 0
@@ -134,14 +124,14 @@ class Player(engine.entity.Sprite, Humanoid):
             # Set the timestamp where the player started jumping.
             if (self.groundentity and self.__jumping == -1 
                 and not (self.groundentity.game_flags & lostlevels.sprites.CANNOT_JUMP)):
-                self.__jumping = time.perf_counter()
+                self.__jumping = self._engine.get_time()
                 self.__speedwhenjumping = abs(self.velocity.x)
-                self.jump_sound.repeat()
+                self._engine.play_sfx("lostlevels/assets/audio/player/jump.ogg", priority = 1)
             
             # Hold the player upwards depending on whether they are holding the X key
             # and how fast they're moving.
             multiplier = max(min(abs(self.__speedwhenjumping), 150) / 125, 1)
-            if self.__jumping + 0.3 > time.perf_counter():
+            if self.__jumping + 0.3 > self._engine.get_time():
                 self.velocity.y = 350 * multiplier * self.jump_multiplier
         else:
             self.__jumping = -1
@@ -188,7 +178,7 @@ class Player(engine.entity.Sprite, Humanoid):
         # If this player hit another entity from below, stop jumping.
         if (engine.entity.is_collision_above(coltype, coldir)):
             self.__jumping = -1
-            self.block_hit_sound.repeat()
+            self._engine.play_sfx("lostlevels/assets/audio/player/block_hit.ogg", priority = 1)
         
         # If this player was hit by a falling entity, kill the player.
         if (coltype == engine.entity.COLTYPE_COLLIDED and coldir == engine.entity.COLDIR_UP
@@ -211,17 +201,15 @@ class Player(engine.entity.Sprite, Humanoid):
         if not enum == pygame.K_e:
             return
 
-        # Generate a list of entities close to the player.
+        # Generate a list of entities close to the player that can be used.
         start = self.get_topleft() + pygame.math.Vector2(-30, 30)
         end = self.get_bottomright() + pygame.math.Vector2(30, -30)
-        entities = self._engine.query_entities(start, end)
+        entities = self._engine.query_entities(start, end, usable_only = True)
 
-        # Find the closest entity to the player that can be used.
+        # Find the closest entity to the player.
         closest = None
         closest_dist = 0
         for entity in entities:
-            if not entity.can_use:
-                continue
             diff = entity.get_centre() - self.get_centre()
             dist = diff.x ** 2 + diff.y ** 2
             if not closest or dist < closest_dist:
@@ -231,7 +219,7 @@ class Player(engine.entity.Sprite, Humanoid):
         if closest:
             closest.invoke_event("use")
         else:
-            self.denied_sound.repeat()
+            self._engine.play_sfx("lostlevels/assets/audio/player/denied.ogg", 0.5, priority = 1)
 
     # Kill this player. This method should not be called.
     def kill(self):
@@ -245,7 +233,7 @@ class Player(engine.entity.Sprite, Humanoid):
         self.move = 0
 
         # Log the player's death and play the death sound.
-        self.death_sound.play()
+        self._engine.play_sfx("lostlevels/assets/audio/player/death.ogg", priority = 2)
         self._engine.console.log("[Lost Levels]: the player has died!")
 
     # Hurt this player. This method should be used instead for downgrading the player or
@@ -22,6 +22,7 @@ class PowerupBlock(engine.entity.Sprite):
         self.hit = False
         self.origin_y = None
         self.level = None
+        self.scroller = None
         self.decoy = False
         self.released = False
         self.biome = ""
@@ -35,14 +36,16 @@ class PowerupBlock(engine.entity.Sprite):
         self.load(f"lostlevels/assets/biomes/{self.biome}/powerup_box.png", (32, 32), 10)
         if self.decoy:
             self.index = 5
-        else:
-            self._engine.create_timer(self.scroll_powerup, 0.1)
+        elif not self.scroller:
+            self.scroller = self._engine.create_timer(self.scroll_powerup, 0.1, repeat = True,
+                                                      clock = engine.CLOCK_GAME)
 
-    # Scroll the question mark.
+    # Scroll the question mark, until the block is hit.
     def scroll_powerup(self):
-        if not self.hit:
-            self.index = (self.index + 1) % 4
-            self._engine.create_timer(self.scroll_powerup, 0.1)
+        if self.hit or self.deleted:
+            self.scroller.cancel()
+            return
+        self.index = (self.index + 1) % 4
 
     # If this block is invisible, handle collision.
     def collision(self, other, coltype, coldir):
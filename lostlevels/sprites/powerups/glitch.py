@@ -31,9 +31,7 @@ class GlitchPowerup(MushroomBase):
         error.enabled = True
 
         # Play the Nintendo GameCube piano error sound.
-        error_sound = self._engine.create_sound("lostlevels/assets/audio/objects/glitch_powerup.ogg")
-        error_sound.volume = 1
-        error_sound.play()
+        self._engine.play_sfx("lostlevels/assets/audio/objects/glitch_powerup.ogg", priority = 2)
         
         # Create an engine timer for shutting down the game in 2 seconds.
         self._engine.create_timer(lambda: sys.exit(1), 2)
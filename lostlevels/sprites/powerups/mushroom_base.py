@@ -28,10 +28,6 @@ class MushroomBase(Moveable):
         # Has this power-up already been picked?
         self.picked = False
 
-        # Cache the power-up sound.
-        self.powerup_sound = self._engine.create_sound("lostlevels/assets/audio/objects/powerup_hit.ogg")
-        self.powerup_sound.volume = 1
-
     # Initiate the ejection of this power-up.
     def activated(self):
         self.__origin = self.get_baseorigin()
@@ -26,7 +26,7 @@ class RocketLauncher(MushroomBase):
     # Pick up the rocket launcher.
     def pickup(self, other):
         # Pick up the weapon.
-        self.powerup_sound.play()
+        self._engine.play_sfx("lostlevels/assets/audio/objects/powerup_hit.ogg")
         self.movetype = engine.entity.MOVETYPE_NONE
         self.equipped = other
         other.weapon = self
@@ -71,9 +71,7 @@ class RocketLauncher(MushroomBase):
         rocket.get_event("collisionfinal").set_func(rocket_hit)
 
         # Play a rocket shooting sound.
-        shoot = self._engine.create_sound("lostlevels/assets/audio/objects/rocket_shoot.ogg")
-        shoot.volume = 1
-        shoot.play()
+        self._engine.play_sfx("lostlevels/assets/audio/objects/rocket_shoot.ogg")
 
         # Delete this rocket launcher.
         self.equipped.weapon = None
@@ -92,9 +90,7 @@ class RocketLauncher(MushroomBase):
 # Handle the rocket hitting other entities.
 def rocket_hit(self, other, coltype, coldir):
     # Play an explosion sound.
-    explosion = self._engine.create_sound("lostlevels/assets/audio/objects/rocket_hit.ogg")
-    explosion.volume = 1
-    explosion.play()
+    self._engine.play_sfx("lostlevels/assets/audio/objects/rocket_hit.ogg")
 
     # Create a flash bang that gradually fades.
     frame = self._engine.create_ui_element_by_class("frame")
@@ -116,4 +112,4 @@ def fade_frame(self):
         self._engine.delete_ui_element(self)
     else:
         self.set_colour(pygame.Color(255, 255, 255, max(0, colour.a - 3)))
-        self._engine.create_timer(fade_frame, 1 / 20, self)
+        self._engine.create_timer(fade_frame, 1 / 20, self)
\ No newline at end of file
@@ -8,6 +8,7 @@ import lostlevels.scenes
 import lostlevels.sprites
 
 from .. import levelgenerator
+from .. import manifest
 
 # Define the level data for this level's main section.
 class Level11_main(levelgenerator.LevelData):
@@ -50,6 +51,15 @@ class Level11_main(levelgenerator.LevelData):
 def get_preview():
     return "lostlevels/assets/levels/1_1_preview.png"
 
+# Return the assets used by this level, besides those used by every level.
+def get_assets():
+    return manifest.get_biome_assets("overground") + manifest.get_biome_assets("underground") + [
+        "lostlevels/assets/sprites/monitor.png",
+        "lostlevels/assets/sprites/bsod_computer_signs.png",
+        "lostlevels/assets/audio/you_are_an_idiot.ogg",
+        "lostlevels/assets/audio/objects/car_crash.ogg"
+    ]
+
 # Generate the level data for this level.
 def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section):
     # Is this the main section?
@@ -59,10 +69,10 @@ def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section
         data = Level11_main(eng, level, pygame.math.Vector2(32, -358), "overground")
 
         # Create the main ground.
-        gen.generate_ground(pygame.math.Vector2(0, -416), 69, 2)
-        gen.generate_ground(pygame.math.Vector2(2272, -416), 15, 2)
-        gen.generate_ground(pygame.math.Vector2(2848, -416), 64, 2)
-        gen.generate_ground(pygame.math.Vector2(4960, -416), 80, 2)
+        gen.generate_ground(pygame.math.Vector2(0, -416), 69, 2, baked = True)
+        gen.generate_ground(pygame.math.Vector2(2272, -416), 15, 2, baked = True)
+        gen.generate_ground(pygame.math.Vector2(2848, -416), 64, 2, baked = True)
+        gen.generate_ground(pygame.math.Vector2(4960, -416), 80, 2, baked = True)
 
         # Create the power-up blocks.
         gen.generate_powerup_block(pygame.math.Vector2(512, -288))
@@ -143,46 +153,46 @@ def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section
         gen.generate_blocks(pygame.math.Vector2(6336, -384))
 
         # Create the hills.
-        gen.generate_hill(pygame.math.Vector2(0, -384))
-        gen.generate_hill(pygame.math.Vector2(512, -384))
-        gen.generate_hill(pygame.math.Vector2(1536, -384))
-        gen.generate_hill(pygame.math.Vector2(2048, -384))
-        gen.generate_hill(pygame.math.Vector2(3136, -384))
-        gen.generate_hill(pygame.math.Vector2(3552, -384))
-        gen.generate_hill(pygame.math.Vector2(4672, -384))
-        gen.generate_hill(pygame.math.Vector2(5152, -384))
-        gen.generate_hill(pygame.math.Vector2(6176, -384))
+        gen.generate_hill(pygame.math.Vector2(0, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(512, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(1536, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(2048, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(3136, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(3552, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(4672, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(5152, -384), baked = True)
+        gen.generate_hill(pygame.math.Vector2(6176, -384), baked = True)
 
         # Create the bushes.
-        gen.generate_bush(pygame.math.Vector2(384, -384), 4)
-        gen.generate_bush(pygame.math.Vector2(736, -384))
-        gen.generate_bush(pygame.math.Vector2(1312, -384), 3)
-        gen.generate_bush(pygame.math.Vector2(1920, -384), 4)
-        gen.generate_bush(pygame.math.Vector2(2304, -384))
-        gen.generate_bush(pygame.math.Vector2(2880, -384), 3)
-        gen.generate_bush(pygame.math.Vector2(3424, -384), 4)
-        gen.generate_bush(pygame.math.Vector2(3840, -384))
-        gen.generate_bush(pygame.math.Vector2(4416, -384))
-        gen.generate_bush(pygame.math.Vector2(5376, -384))
+        gen.generate_bush(pygame.math.Vector2(384, -384), 4, baked = True)
+        gen.generate_bush(pygame.math.Vector2(736, -384), baked = True)
+        gen.generate_bush(pygame.math.Vector2(1312, -384), 3, baked = True)
+        gen.generate_bush(pygame.math.Vector2(1920, -384), 4, baked = True)
+        gen.generate_bush(pygame.math.Vector2(2304, -384), baked = True)
+        gen.generate_bush(pygame.math.Vector2(2880, -384), 3, baked = True)
+        gen.generate_bush(pygame.math.Vector2(3424, -384), 4, baked = True)
+        gen.generate_bush(pygame.math.Vector2(3840, -384), baked = True)
+        gen.generate_bush(pygame.math.Vector2(4416, -384), baked = True)
+        gen.generate_bush(pygame.math.Vector2(5376, -384), baked = True)
 
         # Create the clouds.
-        gen.generate_cloud(pygame.math.Vector2(288, -128))
-        gen.generate_cloud(pygame.math.Vector2(608, -96))
-        gen.generate_cloud(pygame.math.Vector2(896, -128), 4)
-        gen.generate_cloud(pygame.math.Vector2(1184, -96), 3)
-        gen.generate_cloud(pygame.math.Vector2(1792, -128))
-        gen.generate_cloud(pygame.math.Vector2(2176, -96))
-        gen.generate_cloud(pygame.math.Vector2(2400, -128), 4)
-        gen.generate_cloud(pygame.math.Vector2(2720, -96), 3)
-        gen.generate_cloud(pygame.math.Vector2(3328, -128))
-        gen.generate_cloud(pygame.math.Vector2(3680, -96))
-        gen.generate_cloud(pygame.math.Vector2(3968, -128), 4)
-        gen.generate_cloud(pygame.math.Vector2(4256, -96), 3)
-        gen.generate_cloud(pygame.math.Vector2(4896, -128))
-        gen.generate_cloud(pygame.math.Vector2(5248, -96))
-        gen.generate_cloud(pygame.math.Vector2(5504, -128), 4)
-        gen.generate_cloud(pygame.math.Vector2(5792, -96), 3)
-        gen.generate_cloud(pygame.math.Vector2(6432, -128))
+        gen.generate_cloud(pygame.math.Vector2(288, -128), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(608, -96), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(896, -128), 4, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(1184, -96), 3, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(1792, -128), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(2176, -96), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(2400, -128), 4, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(2720, -96), 3, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(3328, -128), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(3680, -96), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(3968, -128), 4, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(4256, -96), 3, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(4896, -128), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(5248, -96), baked = True)
+        gen.generate_cloud(pygame.math.Vector2(5504, -128), 4, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(5792, -96), 3, baked = True)
+        gen.generate_cloud(pygame.math.Vector2(6432, -128), baked = True)
 
         # Create the Goombas.
         gen.generate_goomba(pygame.math.Vector2(704, -390))
@@ -208,6 +218,9 @@ def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section
         # Create the flagpole.
         gen.generate_flagpole(pygame.math.Vector2(6346, -106))
 
+        # Merge the colliders of the ground, blocks and pipes.
+        gen.merge_colliders()
+
         # Return the level data generated for this section.
         return data
     
@@ -247,6 +260,9 @@ def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section
         signs.movetype = engine.entity.MOVETYPE_NONE
         signs.load("lostlevels/assets/sprites/bsod_computer_signs.png", (576, 480), 1)
 
+        # Merge the colliders of the ground and pipes.
+        gen.merge_colliders()
+
         # Return the level data generated for this section.
         return data
     
@@ -7,6 +7,7 @@ import lostlevels.scenes
 import lostlevels.sprites
 
 from .. import levelgenerator
+from .. import manifest
 from .. import sample_hooks
 
 # Define the level data for this level's main section.
@@ -44,17 +45,13 @@ class Level12_main(levelgenerator.LevelData):
             self.big_goomba_spawned = True
 
             # Play a screaming sound effect.
-            screaming = self._engine.create_sound("lostlevels/assets/audio/objects/scream.ogg")
-            screaming.volume = 1
-            screaming.play()
+            self._engine.play_sfx("lostlevels/assets/audio/objects/scream.ogg", priority = 2)
 
         # Create a timer for creating a boulder when the player is within the destructible wall.
         if (not self.boulder_spawned and self._level.player.get_baseorigin().x > 3072
             and self._level.player.get_baseorigin().x < 3648):
             # Play the boulder sound effect.
-            boulder = self._engine.create_sound("lostlevels/assets/audio/objects/boulder.ogg")
-            boulder.volume = 1
-            boulder.play()
+            self._engine.play_sfx("lostlevels/assets/audio/objects/boulder.ogg", priority = 2)
 
             # Create a timer for creating a boulder after 0.5s.
             self._engine.create_timer(self.create_boulder, 0.5)
@@ -110,9 +107,7 @@ class Level12_underground(levelgenerator.LevelData):
             self.train_spawned = True
 
             # Play the 1996 Stock sound effect.
-            motors = self._engine.create_sound("lostlevels/assets/audio/objects/1996_stock.ogg")
-            motors.volume = 1
-            motors.play()
+            self._engine.play_sfx("lostlevels/assets/audio/objects/1996_stock.ogg", priority = 2)
 
         # If the train has spawned already, accelerate it until it reaches the end of the
         # scene, before it eventually gets deleted.
@@ -142,6 +137,16 @@ def boulder_hit(self, other, coltype, coldir):
 def get_preview():
     return "lostlevels/assets/levels/1_2_preview.png"
 
+# Return the assets used by this level, besides those used by every level.
+def get_assets():
+    return manifest.get_biome_assets("desert") + manifest.get_biome_assets("underground") + [
+        "lostlevels/assets/sprites/big_goomba.png",
+        "lostlevels/assets/sprites/1996_stock.png",
+        "lostlevels/assets/audio/objects/scream.ogg",
+        "lostlevels/assets/audio/objects/boulder.ogg",
+        "lostlevels/assets/audio/objects/1996_stock.ogg"
+    ]
+
 # Generate the level data for this level.
 def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section):
     # Is this the main section?
@@ -226,9 +231,7 @@ def load_leveldata(eng: engine.LLEngine, level: lostlevels.scenes.Level, section
                 return
             
             # Play the boulder sound effect.
-            boulder = self._engine.create_sound("lostlevels/assets/audio/objects/boulder.ogg")
-            boulder.volume = 1
-            boulder.play()
+            self._engine.play_sfx("lostlevels/assets/audio/objects/boulder.ogg", priority = 2)
             
             # Create a boulder and kill the player.
             boulder = self._engine.create_entity_by_class("rect", self)
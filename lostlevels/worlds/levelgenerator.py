@@ -7,6 +7,11 @@ import engine
 import lostlevels
 import lostlevels.sprites
 
+# Macros.
+BAKED_CHUNK_WIDTH = 512 # Maximum width of each chunk of a baked layer of tiles (px).
+MERGED_WIDTH      = 512 # Maximum width of each merged collider (px), as the level deletes
+                        # inactive entities wider than the screen before activating them.
+
 # Level data returned by a level.
 class LevelData():
     # Create a new set of level data.
@@ -65,8 +70,17 @@ class LevelGenerator():
         self.__level.backgroundmain.enabled = True
         self.__level.backgroundsecondary.enabled = True
 
-    # Generate ground tiles.
-    def generate_ground(self, offset, length = 1, height = 1, draw = True, spiked = False):
+        # Keep track of every static tile generated, alongside its original collision
+        # events, so that their colliders can be merged once the level is generated.
+        self.__static = []
+
+    # Generate ground tiles. Baked ground is drawn and collided with in chunks rather than
+    # tile by tile, and so it should only be used for ground that is never destroyed or
+    # moved tile by tile.
+    def generate_ground(self, offset, length = 1, height = 1, draw = True, spiked = False, 
+                        baked = False):
+        if baked and draw and not spiked:
+            return self.__generate_baked([(0, False)] * length, offset, height)
         return self.__generate_tiles("tile", 0, offset, length, height, draw, spiked)
     
     # Generate destructible blocks.
@@ -85,7 +99,11 @@ class LevelGenerator():
         return ents
     
     # Generate a small hill.
-    def generate_hill(self, offset, draw = True, spiked = False):
+    def generate_hill(self, offset, draw = True, spiked = False, baked = False):
+        if baked and draw and not spiked:
+            return self.__generate_baked([(3, False), (3, True)], offset, 
+                                         movetype = engine.entity.MOVETYPE_NONE,
+                                         before_entity = self.__engine.entity_head())
         ents = self.__generate_tiles("tile", 3, offset, draw = draw, spiked = spiked,
                                      before_entity = self.__engine.entity_head())
         ents.extend(self.__generate_tiles("tile", 3, offset + pygame.math.Vector2(32, 0), 
@@ -97,7 +115,11 @@ class LevelGenerator():
         return ents
     
     # Generate a bush.
-    def generate_bush(self, offset, length = 2, draw = True, spiked = False):
+    def generate_bush(self, offset, length = 2, draw = True, spiked = False, baked = False):
+        if baked and draw and not spiked and length >= 2:
+            return self.__generate_baked([(4, False)] + [(5, False)] * (length - 2) + [(4, True)],
+                                         offset, movetype = engine.entity.MOVETYPE_NONE,
+                                         before_entity = self.__engine.entity_head())
         ents = self.__generate_tiles("tile", 4, offset, before_entity = self.__engine.entity_head())
         if length > 2:
             ents.extend(self.__generate_tiles(
@@ -112,7 +134,11 @@ class LevelGenerator():
         return ents
     
     # Generate a cloud.
-    def generate_cloud(self, offset, length = 2, draw = True, spiked = False):
+    def generate_cloud(self, offset, length = 2, draw = True, spiked = False, baked = False):
+        if baked and draw and not spiked and length >= 2:
+            return self.__generate_baked([(6, False)] + [(7, False)] * (length - 2) + [(6, True)],
+                                         offset, movetype = engine.entity.MOVETYPE_NONE,
+                                         before_entity = self.__engine.entity_head())
         ents = self.__generate_tiles("tile", 6, offset, before_entity = self.__engine.entity_head())
         if length > 2:
             ents.extend(self.__generate_tiles(
@@ -143,7 +169,10 @@ class LevelGenerator():
         return self.__generate_tiles("tile", 14, offset, length, height, draw, spiked)
     
     # Generate void tiles. Collision will be off by default.
-    def generate_void(self, offset, length = 1, height = 1, draw = True, spiked = False):
+    def generate_void(self, offset, length = 1, height = 1, draw = True, spiked = False, baked = False):
+        if baked and draw and not spiked:
+            return self.__generate_baked([(15, False)] * length, offset, height,
+                                         engine.entity.MOVETYPE_NONE, self.__engine.entity_head())
         ents = self.__generate_tiles("tile", 15, offset, length, height, draw, spiked,
                                      before_entity = self.__engine.entity_head())
         for ent in ents:
@@ -232,6 +261,7 @@ class LevelGenerator():
             ents.append(tile2)
         
         # Return the tiles.
+        self.__track_static(ents)
         return ents
     
     # Generate a 2x2 section of a pipe with roots for other pipes.
@@ -263,6 +293,7 @@ class LevelGenerator():
             ents.append(tile2)
         
         # Return the tiles.
+        self.__track_static(ents)
         return ents
     
     # Generate the top of a pipe.
@@ -362,14 +393,65 @@ class LevelGenerator():
             powerup._engine.console.log(f"[Lost Levels]: player released power-up \"{classname}\"")
 
             # Play a sound to indicate that the power-up has been released.
-            sound = self_block._engine.create_sound("lostlevels/assets/audio/objects/powerup_release.ogg")
-            sound.volume = 1
-            sound.play()
+            self_block._engine.play_sfx("lostlevels/assets/audio/objects/powerup_release.ogg")
 
         # Configure the power-up block's events.
         block.get_event("release" if fixed else "release_fixed").set_func(lambda self: None)
         block.get_event("release_fixed" if fixed else "release").set_func(release_fixed)
 
+    # Merge the colliders of contiguous static tiles that behave identically into as few
+    # rectangles as possible. Each rectangle becomes a single hidden collider, whereas the
+    # tiles themselves are kept as visuals only. Tiles with custom collision events, such
+    # as destructible blocks, spiked tiles, troll ground and ropes, are left unmerged, as
+    # are tiles that have been moved, hidden or re-anchored. This must be called after the
+    # rest of the level has been generated, and only for sections where static tiles are
+    # never destroyed individually.
+    def merge_colliders(self):
+        # Split each mergeable tile into 32x32 cells, grouped by its friction and game
+        # flags. Cells are indexed from the top-left, going downwards.
+        groups = dict()
+        merged = []
+        for ent, collision, collisionfinal in self.__static:
+            if not self.__is_mergeable(ent, collision, collisionfinal):
+                continue
+            origin, hitbox = ent.get_baseorigin(), ent.get_hitbox()
+            cells = groups.setdefault((ent.friction, ent.game_flags), dict())
+            for y in range(int(-origin.y) // 32, int(-origin.y + hitbox.y) // 32):
+                for x in range(int(origin.x) // 32, int(origin.x + hitbox.x) // 32):
+                    cells[(x, y)] = ent
+            merged.append(ent)
+        self.__static = []
+
+        # Greedily cover the cells of each group with rectangles, by extending each one
+        # rightwards as far as possible, and then downwards for as long as every cell in
+        # the next row is free.
+        for (friction, game_flags), cells in groups.items():
+            covered = set()
+            for x, y in sorted(cells, key = lambda cell: (cell[1], cell[0])):
+                if (x, y) in covered:
+                    continue
+                width = 1
+                while (width < MERGED_WIDTH // 32 and (x + width, y) in cells 
+                       and (x + width, y) not in covered):
+                    width += 1
+                height = 1
+                while all((x + i, y + height) in cells and (x + i, y + height) not in covered
+                          for i in range(0, width)):
+                    height += 1
+                covered.update((x + i, y + j) for j in range(0, height) for i in range(0, width))
+
+                # Create the collider just before the top-left tile it covers.
+                collider = self.__engine.create_entity_by_class("rect", cells[(x, y)])
+                collider.draw = False
+                collider.set_hitbox(pygame.math.Vector2(width * 32, height * 32))
+                collider.set_baseorigin(pygame.math.Vector2(x * 32, -y * 32))
+                collider.friction = friction
+                collider.game_flags = game_flags
+
+        # The merged tiles are no longer collided with.
+        for ent in merged:
+            ent.movetype = engine.entity.MOVETYPE_NONE
+
     # Internal code for generating an array of tiles.
     def __generate_tiles(self, classname, index, offset, length = 1, height = 1, draw = True, spiked = False,
                          before_entity = None):
@@ -385,8 +467,60 @@ class LevelGenerator():
                         (lambda hit, name, returnValue, other, coltype, coldir: 
                             self.__create_spikes(hit, other)), True)
                 ents.append(ent)
+        self.__track_static(ents)
         return ents
     
+    # Internal code for generating a baked layer of tiles, given the tile index of each
+    # column and whether it is flipped. The tiles are pre-rendered into chunks of up to
+    # BAKED_CHUNK_WIDTH, each of which is a single entity with a hitbox covering the chunk.
+    def __generate_baked(self, columns, offset, height = 1, movetype = engine.entity.MOVETYPE_ANCHORED,
+                         before_entity = None):
+        # Load each distinct tile once.
+        path = f"lostlevels/assets/biomes/{self.__biome}/main.png"
+        textures = dict()
+        for index, flip in columns:
+            if (index, flip) not in textures:
+                texture = engine.entity.load_tile(self.__engine, path, (32, 32), index)
+                textures[(index, flip)] = pygame.transform.flip(texture, flip, False)
+
+        # Blit the tiles into each chunk, and create an entity for each chunk.
+        ents = []
+        step = BAKED_CHUNK_WIDTH // 32
+        for start in range(0, len(columns), step):
+            chunk = columns[start:start + step]
+            surface = pygame.Surface((len(chunk) * 32, height * 32), pygame.SRCALPHA)
+            for x, column in enumerate(chunk):
+                for y in range(0, height):
+                    surface.blit(textures[column], (x * 32, y * 32))
+            ent = self.__engine.create_entity_by_class("tile", before_entity)
+            ent.set_texture(surface)
+            ent.set_baseorigin(offset + pygame.math.Vector2(start * 32, 0))
+            ent.movetype = movetype
+            ents.append(ent)
+        self.__track_static(ents)
+        return ents
+
+    # Keep track of generated static tiles, alongside their original collision events.
+    def __track_static(self, ents):
+        for ent in ents:
+            self.__static.append((ent, ent.get_event("collision").get_func(),
+                                  ent.get_event("collisionfinal").get_func()))
+
+    # Check whether a static tile can have its collider merged, i.e. it is still an
+    # inactive, anchored and stationary tile aligned to the 32x32 grid, whose collision
+    # events haven't been replaced or detoured since it was generated.
+    def __is_mergeable(self, ent, collision, collisionfinal):
+        collision_event = ent.get_event("collision")
+        collisionfinal_event = ent.get_event("collisionfinal")
+        origin, hitbox = ent.get_baseorigin(), ent.get_hitbox()
+        return (not ent.active and not ent.deleted and ent.movetype == engine.entity.MOVETYPE_ANCHORED
+                and not ent.velocity and not ent.get_origindisp()
+                and collision_event.get_func() is collision and not collision_event.is_detoured()
+                and collisionfinal_event.get_func() is collisionfinal 
+                and not collisionfinal_event.is_detoured()
+                and origin.x % 32 == 0 and origin.y % 32 == 0
+                and hitbox.x % 32 == 0 and hitbox.y % 32 == 0)
+
     # Internal code for generating an array of sprites.
     def __generate_sprites(self, classname, offset, length = 1, height = 1, draw = True, spiked = False,
                            before_entity = None):
@@ -424,9 +558,7 @@ class LevelGenerator():
             self.__engine.delete_entity(ent)
 
             # Play a destruction sound.
-            sfx = self.__engine.create_sound("lostlevels/assets/audio/objects/destructible_hit.ogg")
-            sfx.volume = 1
-            sfx.play()
+            self.__engine.play_sfx("lostlevels/assets/audio/objects/destructible_hit.ogg")
 
             # Increment the score counter by 50.
             self.__level.get_save().header.m_uScore += 50
@@ -0,0 +1,62 @@
+"""The manifest of the assets used by Lost Levels' levels, which are preloaded whilst
+the loading level cutscene is shown, so that they are never loaded mid-gameplay.
+
+Each level module lists its own assets with get_assets(), alongside the biomes that
+it uses. Assets used by every level, such as the player and power-ups, are listed here."""
+
+import os
+
+# Assets used by every level.
+COMMON_ASSETS = [
+    # The status bar.
+    "lostlevels/assets/biomes/levelselection/coin.png",
+
+    # The player, objects and enemies.
+    "lostlevels/assets/sprites/player_small.png",
+    "lostlevels/assets/sprites/coin_big.png",
+    "lostlevels/assets/sprites/checkpoint.png",
+    "lostlevels/assets/sprites/flagpole.png",
+    "lostlevels/assets/sprites/flag.png",
+    "lostlevels/assets/sprites/goomba.png",
+    "lostlevels/assets/sprites/koopa.png",
+
+    # Power-ups.
+    "lostlevels/assets/sprites/glitched_powerup.png",
+    "lostlevels/assets/sprites/rocket_launcher.png",
+    "lostlevels/assets/sprites/rocket.png",
+    "lostlevels/assets/error.png",
+
+    # The player's audio.
+    "lostlevels/assets/audio/player/jump.ogg",
+    "lostlevels/assets/audio/player/death.ogg",
+    "lostlevels/assets/audio/player/denied.ogg",
+    "lostlevels/assets/audio/player/block_hit.ogg",
+    "lostlevels/assets/audio/player/enemy_stomp.ogg",
+    "lostlevels/assets/audio/player/koopa_kick.ogg",
+
+    # Object audio.
+    "lostlevels/assets/audio/objects/coin_hit.ogg",
+    "lostlevels/assets/audio/objects/destructible_hit.ogg",
+    "lostlevels/assets/audio/objects/pipe_enter.ogg",
+    "lostlevels/assets/audio/objects/powerup_release.ogg",
+    "lostlevels/assets/audio/objects/powerup_hit.ogg",
+    "lostlevels/assets/audio/objects/glitch_powerup.ogg",
+    "lostlevels/assets/audio/objects/rocket_shoot.ogg",
+    "lostlevels/assets/audio/objects/rocket_hit.ogg",
+    "lostlevels/assets/audio/objects/flagpole_count.ogg",
+    "lostlevels/assets/audio/objects/flagpole_victory.ogg"
+]
+
+# Return the assets of a biome: its tile sheets and background. Its music is streamed
+# instead, so it isn't preloaded.
+def get_biome_assets(biome):
+    assets = [f"lostlevels/assets/biomes/{biome}/{name}" 
+              for name in ("main.png", "broken.png", "powerup_box.png", "background.png")]
+    return [path for path in assets if os.path.isfile(path)]
+
+# Return all of the assets used by a level module, including its preview.
+def get_level_assets(levelmodule):
+    assets = COMMON_ASSETS + [levelmodule.get_preview()]
+    if hasattr(levelmodule, "get_assets"):
+        assets += levelmodule.get_assets()
+    return assets
\ No newline at end of file